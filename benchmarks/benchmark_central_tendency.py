@@ -0,0 +1,113 @@
+"""
+Benchmark of the central tendency and dispersion statistics: legacy repeated pandas/numpy reductions versus the
+single-sort, single-moments-pass kernel (calculate_column_statistics) now used by calculate_central_tendency and
+calculate_stats.
+
+Run from the repository root with: python -m benchmarks.benchmark_central_tendency
+
+Synthetic count matrices have the width of the 'combined' dataset (45 stereotypes), and calculate_stats is run on their
+row totals. Both implementations are checked to produce the same results. For frames longer than 1000 rows per column,
+pandas evaluates skewness and kurtosis column by column with scalar operations, which may differ in the last bit, so
+floating point values are compared with a relative tolerance of 1e-14.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from scipy.stats import skew, kurtosis
+
+from src.calculations.statistics_calculations_datasets import calculate_stats
+from src.calculations.statistics_calculations_stereotypes import calculate_central_tendency
+
+SIZES = [1_000, 10_000, 100_000]
+NUM_STEREOTYPES = 45
+
+
+def calculate_central_tendency_legacy(data: pd.DataFrame) -> pd.DataFrame:
+    mean = data.mean(axis=0)
+    median = data.median(axis=0)
+    mode = data.mode(axis=0).iloc[0] if not data.mode(axis=0).empty else np.nan
+    std = data.std(axis=0)
+    variance = data.var(axis=0)
+    skewness = data.skew(axis=0)
+    kurt = data.kurt(axis=0)
+    q1 = data.quantile(0.25, axis=0)
+    q3 = data.quantile(0.75, axis=0)
+    iqr = q3 - q1
+    max_value = data.max(axis=0)
+    min_value = data.min(axis=0)
+    range_value = max_value - min_value
+
+    non_zero_data = data.apply(lambda x: x[x > 0], axis=0)
+    min_non_zero = non_zero_data.min(axis=0)
+    range_non_zero = max_value - min_non_zero
+    total = data.sum(axis=0)
+
+    return pd.DataFrame(
+        {'Stereotype': data.columns, 'Total': total.values, 'Mean': mean.values, 'Median': median.values,
+         'Mode': mode.values, 'Standard Deviation': std.values, 'Variance': variance.values,
+         'Skewness': skewness.values, 'Kurtosis': kurt.values, 'Q1': q1.values, 'Q3': q3.values, 'IQR': iqr.values,
+         'Min': min_value.values, 'Max': max_value.values, 'Range': range_value.values,
+         'Min Non-Zero': min_non_zero.values, 'Range Non-Zero': range_non_zero.values})
+
+
+def calculate_stats_legacy(data):
+    stats = {'max': np.max(data), 'min': np.min(data)}
+    non_zero_data = data[data > 0]
+    stats['min_non_zero'] = np.min(non_zero_data) if len(non_zero_data) > 0 else 0
+    stats['range_non_zero'] = stats['max'] - stats['min_non_zero']
+    stats['range'] = stats['max'] - stats['min']
+    stats['mean'] = np.mean(data)
+    stats['mean_round'] = round(np.mean(data))
+    stats['median'] = np.median(data)
+    stats['mode'] = pd.Series(data).mode().iloc[0] if not pd.Series(data).mode().empty else np.nan
+    stats['std_dev'] = np.std(data)
+    stats['variance'] = np.var(data)
+    stats['q1'] = np.percentile(data, 25)
+    stats['q2'] = np.percentile(data, 50)
+    stats['q3'] = np.percentile(data, 75)
+    stats['iqr'] = stats['q3'] - stats['q1']
+    stats['skewness'] = skew(data)
+    stats['kurtosis'] = kurtosis(data)
+    return stats
+
+
+def generate_counts(num_models: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Sparse, skewed synthetic counts: each stereotype is present in a different fraction of the models."""
+    presence_rates = rng.uniform(0.01, 0.8, NUM_STEREOTYPES)
+    counts = rng.negative_binomial(1, 0.2, size=(num_models, NUM_STEREOTYPES)) * (
+            rng.random((num_models, NUM_STEREOTYPES)) < presence_rates)
+    return pd.DataFrame(np.asfortranarray(counts, dtype=np.int32),
+                        columns=[f"stereotype{i:02d}" for i in range(NUM_STEREOTYPES)])
+
+
+def run_benchmark(num_models: int) -> None:
+    data = generate_counts(num_models, np.random.default_rng(num_models))
+    totals = data.sum(axis=1)
+
+    start_time = time.perf_counter()
+    legacy_df = calculate_central_tendency_legacy(data)
+    legacy_stats = calculate_stats_legacy(totals)
+    legacy_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    kernel_df = calculate_central_tendency(data)
+    kernel_stats = calculate_stats(totals)
+    kernel_time = time.perf_counter() - start_time
+
+    assert legacy_df.dtypes.equals(kernel_df.dtypes), "Legacy and kernel statistics have different types."
+    for column in legacy_df.columns.drop('Stereotype'):
+        assert np.allclose(legacy_df[column], kernel_df[column], rtol=1e-14, atol=0, equal_nan=True), (
+            f"Legacy and kernel '{column}' are different.")
+    assert legacy_stats.keys() == kernel_stats.keys(), "Legacy and kernel statistics have different names."
+    assert np.allclose(list(legacy_stats.values()), list(kernel_stats.values()), rtol=1e-14, atol=0,
+                       equal_nan=True), "Legacy and kernel dataset statistics are different."
+
+    logger.info(f"{num_models:>7} models: legacy {legacy_time:7.3f} s, kernel {kernel_time:7.3f} s, "
+                f"speedup {legacy_time / kernel_time:6.1f}x")
+
+
+if __name__ == "__main__":
+    for size in SIZES:
+        run_benchmark(size)
@@ -0,0 +1,92 @@
+"""
+Benchmark of the memory used by ModelData instances: the legacy per-instance dictionaries (stereotype counts plus
+normalization maps) versus the compact __slots__ instances sharing the stereotype vocabularies.
+
+Run from the repository root with: python -m benchmarks.benchmark_model_data_memory
+
+Memory is measured with tracemalloc while creating the models and filling a few stereotype counts per model. The size
+of the gzipped pickle of all models is also reported.
+"""
+import gc
+import gzip
+import pickle
+import random
+import time
+import tracemalloc
+
+from loguru import logger
+
+from src.ModelData import ModelData, CLASS_VOCABULARY, RELATION_VOCABULARY
+
+NUM_MODELS = 100_000
+
+
+class LegacyModelData:
+    """Previous ModelData layout: each instance holds its own vocabularies, count dictionaries and normalizations."""
+
+    def __init__(self, name: str, year: int, is_classroom: bool, total_class: int, total_relation: int) -> None:
+        self.name = name
+        self.year = year
+        self.is_classroom = is_classroom
+        self.total_class_number = total_class
+        self.total_relation_number = total_relation
+        self.statistics = {}
+
+        self.class_stereotypes = {attr: 0 for attr in CLASS_VOCABULARY.names}
+        self.relation_stereotypes = {attr: 0 for attr in RELATION_VOCABULARY.names}
+
+        self.normalized_class_stereotypes = {
+            attr.strip().lower().replace("-", "").replace("_", "").replace(" ", ""): attr for attr in
+            list(CLASS_VOCABULARY.names)}
+        self.normalized_relation_stereotypes = {
+            attr.strip().lower().replace("-", "").replace("_", "").replace(" ", ""): attr for attr in
+            list(RELATION_VOCABULARY.names)}
+
+        self.invalid_class_stereotypes = {}
+        self.invalid_relation_stereotypes = {}
+
+
+def create_models(model_class, num_models: int) -> list:
+    rng = random.Random(num_models)
+    models = []
+    for i in range(num_models):
+        model = model_class(f"model{i:06d}", rng.randint(2005, 2024), False, 0, 0)
+        for stereotype in rng.sample(CLASS_VOCABULARY.names, 5):
+            model.class_stereotypes[stereotype] += rng.randint(1, 40)
+        for stereotype in rng.sample(RELATION_VOCABULARY.names, 5):
+            model.relation_stereotypes[stereotype] += rng.randint(1, 40)
+        models.append(model)
+    return models
+
+
+def measure(model_class, num_models: int) -> tuple[list, float, float]:
+    """Return the created models, the traced memory they use (in MB) and the creation time (in seconds)."""
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    models = create_models(model_class, num_models)
+    elapsed_time = time.perf_counter() - start_time
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return models, memory / 2 ** 20, elapsed_time
+
+
+def pickle_size(models: list) -> float:
+    """Size in MB of the gzipped pickle of the models."""
+    return len(gzip.compress(pickle.dumps(models))) / 2 ** 20
+
+
+if __name__ == "__main__":
+    legacy_models, legacy_memory, legacy_time = measure(LegacyModelData, NUM_MODELS)
+    legacy_pickle = pickle_size(legacy_models)
+    del legacy_models
+
+    compact_models, compact_memory, compact_time = measure(ModelData, NUM_MODELS)
+    compact_pickle = pickle_size(compact_models)
+
+    logger.info(f"{NUM_MODELS} models, legacy:  {legacy_memory:8.1f} MB in memory, {legacy_pickle:6.1f} MB pickled, "
+                f"created in {legacy_time:.2f} s")
+    logger.info(f"{NUM_MODELS} models, compact: {compact_memory:8.1f} MB in memory, {compact_pickle:6.1f} MB pickled, "
+                f"created in {compact_time:.2f} s")
+    logger.info(f"Memory reduced {legacy_memory / compact_memory:.1f}x, "
+                f"pickle reduced {legacy_pickle / compact_pickle:.1f}x")
@@ -0,0 +1,69 @@
+"""
+Benchmark of the pairwise stereotype metrics (Jaccard/Dice similarity, occurrence-wise and model-wise Spearman
+correlations and mutual information) of the six variants of a dataset: legacy calculation from each variant's own data
+versus slicing them from the PairwiseStereotypeMatrices calculated once over all the dataset's stereotypes.
+
+Run from the repository root with: python -m benchmarks.benchmark_pairwise_reuse
+
+Synthetic datasets have all the class and relation stereotypes (45 columns in the 'combined' variants). Both
+implementations are checked to produce the same DataFrames.
+"""
+import time
+from functools import partial
+
+import numpy as np
+from loguru import logger
+
+from src.Dataset import Dataset
+from src.ModelData import ModelData, CLASS_VOCABULARY, RELATION_VOCABULARY
+from src.calculations.statistics_calculations_stereotypes import StereotypeStatistics, PairwiseStereotypeMatrices, \
+    PAIRWISE_METRIC_MATRICES, extract_stereotype_data, get_variant_columns
+from src.calculations.statistics_scheduler import STEREOTYPE_VARIANTS
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def calculate_pairwise_metrics(dataset: Dataset, pairwise: PairwiseStereotypeMatrices = None) -> dict:
+    """Pairwise metrics of every variant, from their own data or sliced from the shared pairwise matrices."""
+    variants_metrics = {}
+    for variant, (stereotype_type, filter_type) in STEREOTYPE_VARIANTS.items():
+        columns = None if pairwise is None else get_variant_columns(dataset, stereotype_type, filter_type)
+        statistics = StereotypeStatistics(partial(extract_stereotype_data, dataset, stereotype_type, filter_type),
+                                          pairwise=pairwise, columns=columns)
+        variants_metrics[variant] = {metric_name: statistics[metric_name] for metric_name in PAIRWISE_METRIC_MATRICES}
+    return variants_metrics
+
+
+def generate_dataset(num_models: int, rng: np.random.Generator) -> Dataset:
+    """Sparse synthetic counts: each stereotype is present in a different fraction of the models."""
+    num_stereotypes = len(CLASS_VOCABULARY) + len(RELATION_VOCABULARY)
+    presence_rates = rng.uniform(0.01, 0.8, num_stereotypes)
+    counts = rng.integers(1, 40, size=(num_models, num_stereotypes)) * (rng.random((num_models, num_stereotypes))
+                                                                         < presence_rates)
+    models = [ModelData(f"model{i:06d}", 2020, False, 0, 0) for i in range(num_models)]
+    return Dataset("synthetic", models, stereotype_counts=np.asfortranarray(counts, dtype=np.int32))
+
+
+def run_benchmark(num_models: int) -> None:
+    dataset = generate_dataset(num_models, np.random.default_rng(num_models))
+
+    start_time = time.perf_counter()
+    legacy_metrics = calculate_pairwise_metrics(dataset)
+    legacy_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    shared_metrics = calculate_pairwise_metrics(dataset, PairwiseStereotypeMatrices(dataset.select_stereotype_counts))
+    shared_time = time.perf_counter() - start_time
+
+    for variant, metrics in legacy_metrics.items():
+        for metric_name, legacy_df in metrics.items():
+            assert legacy_df.equals(shared_metrics[variant][metric_name]), (
+                f"Legacy and shared '{metric_name}' of '{variant}' are different.")
+
+    logger.info(f"{num_models:>7} models: per variant {legacy_time:7.3f} s, shared {shared_time:7.3f} s, "
+                f"speedup {legacy_time / shared_time:6.1f}x")
+
+
+if __name__ == "__main__":
+    for size in SIZES:
+        run_benchmark(size)
@@ -0,0 +1,70 @@
+"""
+Benchmark of the pairwise Jaccard/Dice similarity measures: legacy per-pair set intersections versus the single boolean
+matrix product used by calculate_similarity_measures.
+
+Run from the repository root with: python -m benchmarks.benchmark_similarity_measures
+
+Synthetic count matrices have the width of the 'combined' dataset (45 stereotypes), so 990 pairs are compared. Both
+implementations are checked to produce the same DataFrame.
+"""
+import time
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.calculations.statistics_calculations_stereotypes import calculate_similarity_measures
+
+SIZES = [1_000, 10_000, 100_000]
+NUM_STEREOTYPES = 45
+
+
+def calculate_similarity_measures_legacy(data: pd.DataFrame) -> pd.DataFrame:
+    jaccard_similarity = {}
+    dice_similarity = {}
+
+    for (stereotype1, stereotype2) in combinations(data.columns, 2):
+        set1 = set(data[data[stereotype1] > 0].index)
+        set2 = set(data[data[stereotype2] > 0].index)
+
+        intersection = len(set1.intersection(set2))
+        union = len(set1.union(set2))
+
+        jaccard_similarity[(stereotype1, stereotype2)] = intersection / union if union != 0 else 0
+        dice_similarity[(stereotype1, stereotype2)] = (2 * intersection) / (len(set1) + len(set2)) if (len(set1) + len(
+            set2)) != 0 else 0
+
+    return pd.DataFrame(
+        {'Stereotype Pair': list(jaccard_similarity.keys()), 'Jaccard Similarity': list(jaccard_similarity.values()),
+         'Dice Coefficient': list(dice_similarity.values())})
+
+
+def generate_counts(num_models: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Sparse synthetic counts: each stereotype is present in a different fraction of the models."""
+    presence_rates = rng.uniform(0.01, 0.8, NUM_STEREOTYPES)
+    counts = rng.integers(1, 40, size=(num_models, NUM_STEREOTYPES)) * (rng.random((num_models, NUM_STEREOTYPES))
+                                                                         < presence_rates)
+    return pd.DataFrame(counts, columns=[f"stereotype{i:02d}" for i in range(NUM_STEREOTYPES)])
+
+
+def run_benchmark(num_models: int) -> None:
+    data = generate_counts(num_models, np.random.default_rng(num_models))
+
+    start_time = time.perf_counter()
+    legacy_df = calculate_similarity_measures_legacy(data)
+    legacy_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    vectorized_df = calculate_similarity_measures(data)
+    vectorized_time = time.perf_counter() - start_time
+
+    assert legacy_df.equals(vectorized_df), "Legacy and vectorized similarity measures are different."
+
+    logger.info(f"{num_models:>7} models: legacy {legacy_time:8.2f} s, vectorized {vectorized_time:7.4f} s, "
+                f"speedup {legacy_time / vectorized_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    for size in SIZES:
+        run_benchmark(size)
@@ -0,0 +1,93 @@
+"""
+Benchmark of the stereotype ingestion in step 1: legacy per-model CSV rescans (ModelData.count_stereotypes) versus the
+single-pass index (index_stereotypes_csv + ModelData.add_stereotype_counts).
+
+Run from the repository root with: python -m benchmarks.benchmark_stereotype_ingestion
+
+The legacy path is O(models x rows), so it is only timed on a sample of models and extrapolated linearly to the full
+catalog size. Both paths are checked to produce the same dictionaries on that sample.
+"""
+import csv
+import os
+import random
+import tempfile
+import time
+
+from loguru import logger
+
+from src.ModelData import ModelData, index_stereotypes_csv
+
+SIZES = [1_000, 10_000, 100_000]
+LEGACY_SAMPLE_SIZE = 20
+
+CLASS_STEREOTYPES = ["category", "collective", "datatype", "enumeration", "kind", "mixin", "mode", "phase", "quality",
+                     "quantity", "relator", "role", "roleMixin", "subkind", "type", "Kind", "sub_kind", "powertype"]
+RELATION_STEREOTYPES = ["characterization", "componentOf", "derivation", "formal", "material", "mediation", "memberOf",
+                        "subCollectionOf", "subQuantityOf", "constitute", "Mediation", "containment"]
+
+
+def generate_stereotypes_csv(file_path: str, model_ids: list[str], stereotypes: list[str], rng: random.Random) -> None:
+    """Write a synthetic consolidated stereotypes CSV with a few rows per model."""
+    with open(file_path, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["model_id", "stereotype", "count"])
+        for model_id in model_ids:
+            for stereotype in rng.sample(stereotypes, rng.randint(3, 10)):
+                writer.writerow([model_id, stereotype, rng.randint(1, 40)])
+
+
+def ingest_legacy(models: list[ModelData], class_csv: str, relation_csv: str) -> None:
+    for model in models:
+        model.count_stereotypes("class", class_csv)
+        model.count_stereotypes("relation", relation_csv)
+
+
+def ingest_indexed(models: list[ModelData], class_csv: str, relation_csv: str) -> None:
+    class_index = index_stereotypes_csv(class_csv)
+    relation_index = index_stereotypes_csv(relation_csv)
+    for model in models:
+        model.add_stereotype_counts("class", class_index.get(model.name, []))
+        model.add_stereotype_counts("relation", relation_index.get(model.name, []))
+
+
+def same_counts(model_a: ModelData, model_b: ModelData) -> bool:
+    return (model_a.class_stereotypes == model_b.class_stereotypes
+            and model_a.relation_stereotypes == model_b.relation_stereotypes
+            and model_a.invalid_class_stereotypes == model_b.invalid_class_stereotypes
+            and model_a.invalid_relation_stereotypes == model_b.invalid_relation_stereotypes)
+
+
+def run_benchmark(num_models: int, work_dir: str) -> None:
+    rng = random.Random(num_models)
+    model_ids = [f"model{i:06d}" for i in range(num_models)]
+
+    class_csv = os.path.join(work_dir, f"class_{num_models}.csv")
+    relation_csv = os.path.join(work_dir, f"relation_{num_models}.csv")
+    generate_stereotypes_csv(class_csv, model_ids, CLASS_STEREOTYPES, rng)
+    generate_stereotypes_csv(relation_csv, model_ids, RELATION_STEREOTYPES, rng)
+
+    # Indexed path over the whole catalog
+    indexed_models = [ModelData(model_id, 2020, False, 0, 0) for model_id in model_ids]
+    start_time = time.perf_counter()
+    ingest_indexed(indexed_models, class_csv, relation_csv)
+    indexed_time = time.perf_counter() - start_time
+
+    # Legacy path over a sample, extrapolated to the whole catalog
+    sample_indexes = rng.sample(range(num_models), min(LEGACY_SAMPLE_SIZE, num_models))
+    legacy_models = [ModelData(model_ids[i], 2020, False, 0, 0) for i in sample_indexes]
+    start_time = time.perf_counter()
+    ingest_legacy(legacy_models, class_csv, relation_csv)
+    legacy_time = (time.perf_counter() - start_time) * num_models / len(legacy_models)
+
+    assert all(same_counts(legacy, indexed_models[i]) for legacy, i in zip(legacy_models, sample_indexes)), \
+        "Legacy and indexed ingestion produced different stereotype counts."
+
+    logger.info(f"{num_models:>7} models: legacy {legacy_time:10.2f} s "
+                f"(extrapolated from {len(legacy_models)} models), indexed {indexed_time:7.2f} s, "
+                f"speedup {legacy_time / indexed_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in SIZES:
+            run_benchmark(size, temp_dir)
@@ -0,0 +1,119 @@
+"""
+Benchmark of the statistics tables of step 2 saved as CSV files (default) versus Parquet files (--table-format
+parquet): time to calculate and save all the tables of a synthetic dataset, and their total size on disk.
+
+Run from the repository root with: python -m benchmarks.benchmark_table_formats
+
+Requires pyarrow (the benchmark is skipped without it). Every Parquet table is read back and checked to hold the same
+values as its CSV counterpart, so both formats are known to round-trip the same tables.
+"""
+import importlib.util
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.Dataset import Dataset
+from src.ModelData import ModelData, CLASS_VOCABULARY, RELATION_VOCABULARY
+from src.step2_processing import calculate_and_save_datasets_statistics, \
+    calculate_and_save_datasets_stereotypes_statistics
+from src.utils import set_table_format
+
+SIZES = [1_000, 10_000]
+
+
+def generate_dataset(num_models: int) -> Dataset:
+    """Synthetic models with a few valid stereotypes, some unstereotyped elements and a few invalid stereotypes."""
+    rng = random.Random(num_models)
+    models = []
+    for i in range(num_models):
+        class_rows = [(stereotype, rng.randint(1, 40)) for stereotype in rng.sample(CLASS_VOCABULARY.names[:-2], 5)]
+        relation_rows = [(stereotype, rng.randint(1, 40)) for stereotype in
+                         rng.sample(RELATION_VOCABULARY.names[:-2], 5)]
+        if rng.random() < 0.1:
+            class_rows.append((f"custom{rng.randint(0, 9)}", rng.randint(1, 5)))
+        model = ModelData(f"model{i:06d}", rng.randint(2005, 2024), False,
+                          sum(count for _, count in class_rows) + rng.randint(0, 5),
+                          sum(count for _, count in relation_rows) + rng.randint(0, 5))
+        model.add_stereotype_counts('class', class_rows)
+        model.add_stereotype_counts('relation', relation_rows)
+        model.calculate_none()
+        models.append(model)
+    return Dataset("synthetic", models)
+
+
+def save_tables(dataset: Dataset, output_dir: str, table_format: str) -> float:
+    """Calculate and save all the statistics tables of the dataset, returning the elapsed time."""
+    set_table_format(table_format)
+    start_time = time.perf_counter()
+    calculate_and_save_datasets_statistics([dataset], output_dir)
+    calculate_and_save_datasets_stereotypes_statistics([dataset], output_dir)
+    return time.perf_counter() - start_time
+
+
+def get_tables(output_dir: str, extension: str) -> dict[str, str]:
+    """Paths of the tables with the given extension, by their path relative to output_dir without extension."""
+    tables = {}
+    for root, _, files in os.walk(output_dir):
+        for file in files:
+            if file.endswith(extension):
+                path = os.path.join(root, file)
+                tables[os.path.relpath(path, output_dir)[:-len(extension)]] = path
+    return tables
+
+
+def read_parquet_as_csv_table(path: str) -> pd.DataFrame:
+    """Read a Parquet table with the layout of its CSV counterpart: index as column, pairs as tuples, NaN for nulls."""
+    df = pd.read_parquet(path)
+    if not isinstance(df.index, pd.RangeIndex):
+        df = df.reset_index()
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].map(lambda value: str(tuple(value)) if isinstance(value, np.ndarray) else value)
+        elif isinstance(df[column].dtype, pd.api.extensions.ExtensionDtype):
+            df[column] = df[column].astype(object).where(df[column].notna(), np.nan)
+    return df
+
+
+def check_round_trip(csv_dir: str, parquet_dir: str) -> int:
+    """Check that every Parquet table holds the same values as its CSV counterpart, returning the number of tables."""
+    csv_tables = get_tables(csv_dir, ".csv")
+    parquet_tables = get_tables(parquet_dir, ".parquet")
+    assert csv_tables.keys() == parquet_tables.keys(), "CSV and Parquet runs saved different tables."
+
+    for table, csv_path in csv_tables.items():
+        csv_df = pd.read_csv(csv_path, sep=';' if 'invalid' in table else ',')
+        parquet_df = read_parquet_as_csv_table(parquet_tables[table])
+        # Some CSV tables are written with a fixed float precision
+        pd.testing.assert_frame_equal(csv_df, parquet_df, check_dtype=False, check_exact=False, rtol=1e-12,
+                                      obj=f"Table '{table}'")
+    return len(csv_tables)
+
+
+def get_size(output_dir: str, extension: str) -> float:
+    """Total size in MB of the tables with the given extension."""
+    return sum(os.path.getsize(path) for path in get_tables(output_dir, extension).values()) / 2 ** 20
+
+
+def run_benchmark(num_models: int) -> None:
+    with tempfile.TemporaryDirectory() as csv_dir, tempfile.TemporaryDirectory() as parquet_dir:
+        csv_time = save_tables(generate_dataset(num_models), csv_dir, "csv")
+        parquet_time = save_tables(generate_dataset(num_models), parquet_dir, "parquet")
+        num_tables = check_round_trip(csv_dir, parquet_dir)
+
+        logger.info(f"{num_models:>6} models, {num_tables} tables: CSV {csv_time:6.2f} s "
+                    f"{get_size(csv_dir, '.csv'):7.2f} MB, Parquet {parquet_time:6.2f} s "
+                    f"{get_size(parquet_dir, '.parquet'):7.2f} MB")
+
+
+if __name__ == "__main__":
+    if importlib.util.find_spec("pyarrow") is None:
+        logger.warning("pyarrow is not installed. Skipping the table formats benchmark.")
+    else:
+        logger.disable("src")  # Only the results of the benchmark are logged
+        for size in SIZES:
+            run_benchmark(size)
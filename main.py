@@ -1,33 +1,92 @@
 import os
 
-from src.directories_global import OUTPUT_DIR_02, OUTPUT_DIR_03, OUTPUT_DIR_01
-from src.step0_setup import initialize_output_directories, get_catalog_path
-from src.step1_input import load_data_from_catalog, calculate_models_data, create_and_save_specific_datasets_instances, \
-    query_data
+from src.directories_global import OUTPUT_DIR_02, OUTPUT_DIR_03, OUTPUT_DIR_01, STAGE_CACHE_DIR
+from src.stage_cache import StageCache
+from src.step0_setup import initialize_output_directories, get_catalog_path, get_number_of_workers, \
+    get_incremental_refresh, get_use_sparql_queries, get_use_stage_cache, get_table_format, get_stereotype_metrics
+from src.step1_input import iterate_models_data, count_models_data, create_and_save_specific_datasets_instances, \
+    refresh_catalog_data_incrementally, stream_catalog_data, load_data_from_catalog, query_data
 from src.step2_processing import calculate_and_save_datasets_statistics, \
     calculate_and_save_datasets_stereotypes_statistics
 from src.step3_output import generate_visualizations
-from src.utils import save_object, load_object
+from src.utils import save_object, set_table_format
+
+# Source files implementing each step, used to invalidate the cached results of a stage when its code changes
+STEP1_CODE = ["src/step1_input.py", "src/utils.py"]
+MODEL_DATA_CODE = ["src/step1_input.py", "src/ModelData.py", "src/Dataset.py", "src/dataset_storage.py",
+                   "src/snapshot.py"]
+STEP2_CODE = ["src/step2_processing.py", "src/Dataset.py", "src/dataset_storage.py", "src/ModelData.py",
+              "src/calculations", "src/utils.py"]
+STEP3_CODE = ["src/step3_output.py", "src/utils.py"]
+
+QUERIES_OUTPUTS = [os.path.join(OUTPUT_DIR_01, "query_count_number_classes_relations_consolidated.csv"),
+                   os.path.join(OUTPUT_DIR_01, "query_get_all_class_stereotypes_consolidated.csv"),
+                   os.path.join(OUTPUT_DIR_01, "query_get_all_relation_stereotypes_consolidated.csv")]
+
+
+def calculate_datasets(_):
+    """
+    Stream the models' data produced by the catalog stages to the datasets' snapshot. Its path is the result of the
+    stage (loaded by the next stages), so that the cached result does not hold the models' data.
+    """
+    return create_and_save_specific_datasets_instances(iterate_models_data(), count_models_data())
+
+
+def calculate_stereotypes_statistics(datasets, num_workers, metric_names):
+    """Calculate the requested stereotype statistics and save the updated datasets."""
+    datasets = calculate_and_save_datasets_stereotypes_statistics(datasets, OUTPUT_DIR_02, num_workers, metric_names)
+    save_object(datasets, OUTPUT_DIR_02, "datasets", "Updated datasets")
+    return datasets
+
 
 if __name__ == "__main__":
     # Step 0: Initial setup
     initialize_output_directories()
     catalog_path = get_catalog_path()
+    num_workers = get_number_of_workers()
+    incremental_refresh = get_incremental_refresh()
+    use_sparql = get_use_sparql_queries()
+    table_format = get_table_format()
+    metric_names = get_stereotype_metrics()
+    set_table_format(table_format)
+
+    # Each stage is only run when its inputs, its code, or an upstream stage changed since the cached run
+    pipeline = StageCache(STAGE_CACHE_DIR, enabled=get_use_stage_cache())
 
     # Step 1: Data input - load all models' data, execute queries and create dataset
-    all_models_data = load_data_from_catalog(catalog_path)
-    query_data(all_models_data)
-    all_models_data = calculate_models_data()
-    datasets = create_and_save_specific_datasets_instances(all_models_data)
+    if incremental_refresh:
+        pipeline.add_stage("catalog_data",
+                           lambda: refresh_catalog_data_incrementally(catalog_path, OUTPUT_DIR_01, num_workers),
+                           fingerprinted_paths=[os.path.join(catalog_path, "models")], code_paths=STEP1_CODE,
+                           output_paths=[os.path.join(OUTPUT_DIR_01, "models_data.csv"),
+                                         os.path.join(OUTPUT_DIR_01, "catalog_manifest.json")] + QUERIES_OUTPUTS)
+    elif use_sparql:
+        pipeline.add_stage("catalog_data",
+                           lambda: query_data(load_data_from_catalog(catalog_path), num_workers, use_sparql=True),
+                           input_paths=["queries"], fingerprinted_paths=[os.path.join(catalog_path, "models")],
+                           code_paths=STEP1_CODE,
+                           output_paths=[os.path.join(OUTPUT_DIR_01, "models_data.csv"),
+                                         os.path.join(OUTPUT_DIR_01, "loaded_models.object.gz")] + QUERIES_OUTPUTS)
+    else:
+        pipeline.add_stage("catalog_data", lambda: stream_catalog_data(catalog_path, OUTPUT_DIR_01, num_workers),
+                           fingerprinted_paths=[os.path.join(catalog_path, "models")], code_paths=STEP1_CODE,
+                           output_paths=[os.path.join(OUTPUT_DIR_01, "models_data.csv")] + QUERIES_OUTPUTS)
 
-    # datasets = load_object(os.path.join(OUTPUT_DIR_01, "datasets.object.gz"), "Datasets")
+    pipeline.add_stage("datasets", calculate_datasets, dependencies=["catalog_data"], code_paths=MODEL_DATA_CODE,
+                       output_paths=[os.path.join(OUTPUT_DIR_01, "datasets.snapshot")])
 
     # Step 2: Data processing - generate statistics
-    calculate_and_save_datasets_statistics(datasets, OUTPUT_DIR_02)
-    calculate_and_save_datasets_stereotypes_statistics(datasets, OUTPUT_DIR_02)
-    save_object(datasets, OUTPUT_DIR_02, "datasets", "Updated datasets")
-
-    # datasets = load_object(os.path.join(OUTPUT_DIR_02, "datasets.object.gz"), "Datasets")
+    pipeline.add_stage("datasets_statistics",
+                       lambda datasets: calculate_and_save_datasets_statistics(datasets, OUTPUT_DIR_02),
+                       dependencies=["datasets"], code_paths=STEP2_CODE, output_paths=[OUTPUT_DIR_02],
+                       options={"table_format": table_format})
+    pipeline.add_stage("stereotypes_statistics",
+                       lambda datasets: calculate_stereotypes_statistics(datasets, num_workers, metric_names),
+                       dependencies=["datasets_statistics"], code_paths=STEP2_CODE, output_paths=[OUTPUT_DIR_02],
+                       options={"table_format": table_format, "metrics": metric_names})
 
     # Step 3: Data output - visualizations
-    generate_visualizations(datasets, OUTPUT_DIR_03)
+    pipeline.add_stage("visualizations", lambda datasets: generate_visualizations(datasets, OUTPUT_DIR_03, num_workers),
+                       dependencies=["stereotypes_statistics"], code_paths=STEP3_CODE, output_paths=[OUTPUT_DIR_03])
+
+    pipeline.run("visualizations")
@@ -1,6 +1,8 @@
-import csv
+import itertools
 import math
 import os
+from functools import partial
+from typing import Optional
 
 import numpy as np
 import pandas as pd
@@ -10,15 +12,38 @@ from loguru import logger
 from src import ModelData
 from src.calculations.statistics_calculations_datasets import calculate_class_and_relation_metrics, calculate_stats, \
     calculate_ratios
-from src.calculations.statistics_calculations_stereotypes import calculate_stereotype_metrics
-from src.utils import append_unique_preserving_order, save_to_csv
+from src.calculations.statistics_calculations_stereotypes import STEREOTYPE_METRICS, StereotypeStatistics, \
+    extract_stereotype_data, PairwiseStereotypeMatrices, get_variant_columns, select_counts
+from src.calculations.statistics_scheduler import calculate_datasets_stereotype_metrics, STEREOTYPE_VARIANTS
+from src.dataset_storage import DatasetStorage, build_storage, COUNT_DTYPE
+from src.utils import append_unique_preserving_order, save_table
 
 
 class Dataset():
-    def __init__(self, name: str, models: list[ModelData]) -> None:
+    def __init__(self, name: str, models: list[ModelData] = None, stereotype_counts: np.ndarray = None,
+                 storage: DatasetStorage = None, rows: np.ndarray = None, rows_path: str = None) -> None:
 
         self.name: str = name
-        self.models: list[ModelData] = models
+
+        # Per-model data: count matrix, metadata columns and invalid stereotypes, built from the models or given (e.g.,
+        # memory-mapped from a snapshot). The models' ModelData are only built from it when first used (see models).
+        self._storage: DatasetStorage = storage if storage is not None else build_storage(models, stereotype_counts)
+        self._models: Optional[list[ModelData]] = models
+
+        # Ascending rows of the storage holding the dataset's models (None for all of them). Slices share the storage
+        # of their parent dataset and only keep their rows, which may be given as the .npy file they were saved to
+        # (see src/snapshot.py): they are then opened like the storage's arrays, and pickled as their file.
+        self._rows_path: Optional[str] = rows_path
+        self._rows: Optional[np.ndarray] = rows if rows_path is None else self._open_rows()
+
+        # Columns of the count matrix: all class stereotypes followed by all relation stereotypes, in the order of the
+        # shared vocabularies
+        class_names = list(ModelData.CLASS_VOCABULARY.names)
+        relation_names = list(ModelData.RELATION_VOCABULARY.names)
+        self.stereotype_types: np.ndarray = np.array(["class"] * len(class_names) + ["relation"] * len(relation_names))
+        self.stereotype_names: np.ndarray = np.array(class_names + relation_names, dtype=object)
+        self._type_columns: dict[str, slice] = {'class': slice(0, len(class_names)),
+                                                'relation': slice(len(class_names), len(self.stereotype_names))}
 
         self.num_classes: int = -1
         self.num_relations: int = -1
@@ -37,20 +62,182 @@ class Dataset():
         self.combined_statistics_raw = {}
         self.combined_statistics_clean = {}
 
+    def __getstate__(self) -> dict:
+        # ModelData are rebuilt from the storage when needed instead of being pickled, and rows saved to a file are
+        # opened again
+        excluded = {'_models', '_rows'} if self._rows_path is not None else {'_models'}
+        return {name: value for name, value in self.__dict__.items() if name not in excluded}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._models = None
+        if self._rows_path is not None:
+            self._rows = self._open_rows()
+
+    def _open_rows(self) -> np.ndarray:
+        return np.load(self._rows_path, mmap_mode=self._storage.mmap_mode)
+
+    @property
+    def models(self) -> list[ModelData]:
+        """ModelData of every model, built from the per-model data on first use (e.g., for the models' statistics)."""
+        if self._models is None:
+            self._models = self._storage.build_models(self._rows)
+        return self._models
+
+    @property
+    def storage(self) -> DatasetStorage:
+        return self._storage
+
+    @property
+    def rows(self) -> Optional[np.ndarray]:
+        return self._rows
+
+    @property
+    def rows_path(self) -> Optional[str]:
+        """File the rows are memory-mapped from, so workers can map it instead of copying them."""
+        return self._rows_path if self._storage.mmap_mode is not None else None
+
+    @property
+    def num_models(self) -> int:
+        return self._storage.num_models if self._rows is None else len(self._rows)
+
+    @property
+    def stereotype_counts(self) -> np.ndarray:
+        """
+        Model x stereotype count matrix of the dataset. Rows follow the models and columns hold all class stereotypes
+        followed by all relation stereotypes. It is stored column-major, as all statistics reduce over columns. For a
+        slice, this is a copy of its rows: use select_stereotype_counts or iterate_stereotype_counts to only read the
+        columns needed.
+        """
+        return self.select_stereotype_counts()
+
+    @property
+    def stereotype_counts_path(self) -> Optional[str]:
+        """File the count matrix is memory-mapped from (see src/snapshot.py), so workers can map it instead of copying
+        it."""
+        return self._storage.stereotype_counts_path
+
+    # Per-model attributes used to slice the dataset, following the rows of the count matrix
+    @property
+    def model_names(self) -> np.ndarray:
+        return self._get_model_column("model_names")
+
+    @property
+    def model_years(self) -> np.ndarray:
+        return self._get_model_column("model_years")
+
+    @property
+    def model_is_classroom(self) -> np.ndarray:
+        return self._get_model_column("model_is_classroom")
+
+    @property
+    def model_class_numbers(self) -> np.ndarray:
+        return self._get_model_column("model_class_numbers")
+
+    @property
+    def model_relation_numbers(self) -> np.ndarray:
+        return self._get_model_column("model_relation_numbers")
+
+    # Per-model class and relation counts (model names followed by one column per stereotype), created when accessed
+    # instead of being kept (and pickled) with the dataset
+    @property
+    def data_class(self) -> pd.DataFrame:
+        return self._create_dataframe_for_stereotypes("class_stereotypes")
+
+    @property
+    def data_relation(self) -> pd.DataFrame:
+        return self._create_dataframe_for_stereotypes("relation_stereotypes")
+
+    def _get_model_column(self, column_name: str) -> np.ndarray:
+        column = self._storage.columns[column_name]
+        return column if self._rows is None else column[self._rows]
+
+    def create_slice(self, name: str, mask: np.ndarray) -> "Dataset":
+        """
+        Create a dataset with the models selected by a boolean row mask (e.g., built with the *_mask methods). The
+        slice is a view of this dataset: it shares its storage and only keeps the selected rows of it, so neither the
+        models nor the count matrix are copied.
+        """
+        rows = np.flatnonzero(mask)
+        return Dataset(name, storage=self._storage, rows=rows if self._rows is None else self._rows[rows])
+
+    def slice_by(self, name: str, years: tuple = None, is_classroom: bool = None,
+                 class_numbers: tuple = None) -> "Dataset":
+        """
+        Create a dataset with the models matching all the given predicates. Ranges are (minimum, maximum) tuples, both
+        inclusive, and None leaves a bound (or the whole predicate) open.
+
+        :param name: Name of the new dataset.
+        :param years: Range of model years.
+        :param is_classroom: True for classroom models only, False for non-classroom models only.
+        :param class_numbers: Range of the models' total number of classes (model size band).
+        :return: Dataset with the selected models.
+        """
+        mask = np.ones(self.num_models, dtype=bool)
+        if years is not None:
+            mask &= self.year_mask(*years)
+        if is_classroom is not None:
+            mask &= self.model_is_classroom == is_classroom
+        if class_numbers is not None:
+            mask &= self.class_number_mask(*class_numbers)
+        return self.create_slice(name, mask)
+
+    def year_mask(self, first_year: int = None, last_year: int = None) -> np.ndarray:
+        """Boolean row mask of the models whose year is in the inclusive range (None for an open bound)."""
+        return _range_mask(self.model_years, first_year, last_year)
+
+    def class_number_mask(self, minimum: int = None, maximum: int = None) -> np.ndarray:
+        """Boolean row mask of the models whose total number of classes is in the inclusive range."""
+        return _range_mask(self.model_class_numbers, minimum, maximum)
+
+    def get_stereotype_counts(self, stereotype_type: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the count matrix for 'class', 'relation' or 'combined' stereotypes (a view, unless the dataset is a
+        slice) and its column names. In the combined case, 'none' and 'other' are suffixed with '_c' (class) or '_r'
+        (relation).
+        """
+        columns, names = self.get_stereotype_columns(stereotype_type)
+        return self.select_stereotype_counts(columns), names
+
+    def select_stereotype_counts(self, columns=slice(None)) -> np.ndarray:
+        """Return the given columns (a slice or positions) of the dataset's rows of the count matrix."""
+        return select_counts(self._storage.stereotype_counts, self._rows, columns)
+
+    def iterate_stereotype_counts(self, stereotype_type: str):
+        """
+        Yield consecutive blocks of rows of the count matrix for 'class', 'relation' or 'combined' stereotypes, which
+        reductions over the models use instead of selecting all the dataset's rows at once.
+        """
+        columns, _ = self.get_stereotype_columns(stereotype_type)
+        yield from self._storage.iterate_counts(self._rows, columns)
+
+    def get_stereotype_columns(self, stereotype_type: str) -> tuple[slice, np.ndarray]:
+        """Return the slice of count matrix columns of 'class', 'relation' or 'combined' stereotypes and their names."""
+        if stereotype_type in ['class', 'relation']:
+            columns = self._type_columns[stereotype_type]
+            return columns, self.stereotype_names[columns]
+        elif stereotype_type == 'combined':
+            suffixes = {'class': '_c', 'relation': '_r'}
+            names = np.array([f"{name}{suffixes[st_type]}" if name in ['none', 'other'] else name for st_type, name in
+                              zip(self.stereotype_types, self.stereotype_names)], dtype=object)
+            return slice(0, len(names)), names
+        else:
+            raise ValueError("Invalid stereotype_type. Must be 'class', 'relation', or 'combined'.")
+
     def save_dataset_general_data_csv(self, output_dir: str) -> None:
         output_dir = os.path.join(output_dir, self.name)
 
         # Create folder if it does not exist
         os.makedirs(output_dir, exist_ok=True)
 
-        # Prepare the data for the CSV
-        data = [[model.name, model.year, model.total_class_number, model.total_relation_number] for model in
-                self.models]
-        df = pd.DataFrame(data, columns=["model", "year", "total_class_number", "total_relation_number"])
+        # Prepare the data for the CSV from the per-model columns
+        df = pd.DataFrame({"model": self.model_names, "year": self.model_years,
+                           "total_class_number": self.model_class_numbers,
+                           "total_relation_number": self.model_relation_numbers})
 
         # Save to CSV using the common utility function
         filepath = os.path.join(output_dir, f'{self.name}_basic_data.csv')
-        save_to_csv(df, filepath, f"General data for dataset '{self.name}' successfully saved to {filepath}.")
+        save_table(df, filepath, f"General data for dataset '{self.name}' successfully saved to {filepath}.")
 
     def save_dataset_class_data_csv(self, output_dir: str) -> None:
         output_dir = os.path.join(output_dir, self.name)
@@ -58,17 +245,12 @@ class Dataset():
         # Create folder if it does not exist
         os.makedirs(output_dir, exist_ok=True)
 
-        # Extract all the stereotypes from the first model
-        stereotypes = list(self.models[0].class_stereotypes.keys())
-
         # Create a DataFrame for class data
-        data = [[model.name] + [model.class_stereotypes[st] for st in stereotypes] for model in self.models]
-        df = pd.DataFrame(data, columns=["model"] + stereotypes)
-        self.data_class = df
+        df = self.data_class
 
         # Save to CSV using the common utility function
         filepath = os.path.join(output_dir, f'{self.name}_class_data.csv')
-        save_to_csv(df, filepath, f"Class data for dataset '{self.name}' successfully saved to {filepath}.")
+        save_table(df, filepath, f"Class data for dataset '{self.name}' successfully saved to {filepath}.")
 
     def save_dataset_relation_data_csv(self, output_dir: str) -> None:
         output_dir = os.path.join(output_dir, self.name)
@@ -76,24 +258,19 @@ class Dataset():
         # Create folder if it does not exist
         os.makedirs(output_dir, exist_ok=True)
 
-        # Extract all the relation stereotypes from the first model
-        stereotypes = list(self.models[0].relation_stereotypes.keys())
-
         # Create a DataFrame for relation data
-        data = [[model.name] + [model.relation_stereotypes[st] for st in stereotypes] for model in self.models]
-        df = pd.DataFrame(data, columns=["model"] + stereotypes)
-        self.data_relation = df
+        df = self.data_relation
 
         # Save to CSV using the common utility function
         filepath = os.path.join(output_dir, f'{self.name}_relation_data.csv')
-        save_to_csv(df, filepath, f"Relation data for dataset '{self.name}' successfully saved to {filepath}.")
+        save_table(df, filepath, f"Relation data for dataset '{self.name}' successfully saved to {filepath}.")
 
     def calculate_dataset_statistics(self) -> None:
         """Calculates statistics and metrics for the dataset and stores them in self.statistics."""
 
-        # Step 1: Prepare the data for class and relation metrics
-        class_data = self._create_dataframe_for_stereotypes("class_stereotypes")
-        relation_data = self._create_dataframe_for_stereotypes("relation_stereotypes")
+        # Step 1: Prepare the data for class and relation metrics (per-model OntoUML, 'none' and 'other' counts)
+        class_data = self._create_dataframe_for_stereotype_groups("class")
+        relation_data = self._create_dataframe_for_stereotype_groups("relation")
 
         # Step 2: Calculate class and relation metrics
         class_metrics, class_total, class_stereotyped, class_non_stereotyped, class_ontouml, class_non_ontouml = calculate_class_and_relation_metrics(
@@ -142,23 +319,28 @@ class Dataset():
         if stereotype_type not in ['class_stereotypes', 'relation_stereotypes']:
             raise ValueError("Invalid stereotype_type. Must be 'class_stereotypes' or 'relation_stereotypes'.")
 
-        data = []
-        for model in self.models:
-            if stereotype_type == "class_stereotypes":
-                data.append(model.class_stereotypes)
-            else:
-                data.append(model.relation_stereotypes)
+        counts, stereotypes = self.get_stereotype_counts(stereotype_type.removesuffix("_stereotypes"))
 
-        df = pd.DataFrame(data)
-        df.insert(0, 'model', [model.name for model in self.models])  # Insert model names as the first column
+        df = pd.DataFrame(counts, columns=list(stereotypes))
+        df.insert(0, 'model', self.model_names)  # Insert model names as the first column
         return df
 
+    def _create_dataframe_for_stereotype_groups(self, stereotype_type: str) -> pd.DataFrame:
+        """
+        Helper function to create a DataFrame with the model names and the per-model sums of the OntoUML, 'none' and
+        'other' stereotypes of a type. Its columns after the model names add up to the same totals as all the type's
+        stereotypes, so the dataset metrics are calculated from it without copying the count matrix.
+        """
+        ontouml_counts, none_counts, other_counts = self._calculate_stereotype_group_counts(stereotype_type)
+        return pd.DataFrame({'model': self.model_names, 'ontouml': ontouml_counts,
+                             'none': none_counts.astype(COUNT_DTYPE), 'other': other_counts.astype(COUNT_DTYPE)})
+
     def calculate_models_statistics(self) -> None:
         """
         Calculate the statistics for all models in the dataset.
         """
 
-        # Ensure statistics are calculated for each model
+        # Ensure statistics are calculated for each model (building the models from the count matrix if needed)
         for model in self.models:
             model.calculate_statistics()
 
@@ -185,53 +367,74 @@ class Dataset():
 
         output_path = os.path.join(output_dir, f"{self.name}_models_statistics.csv")
 
-        # Open the CSV file for writing
-        with open(output_path, mode='w', newline='') as file:
-            writer = csv.writer(file)
-
-            # Write the header (model, dynamic keys)
-            writer.writerow(['model'] + all_keys)
-
-            # Write the statistics for each model
-            for model in self.models:
-                row = [model.name]  # Start the row with the model name
+        # One row per model (model, dynamic keys), with missing and NaN values as None
+        rows = []
+        for model in self.models:
+            row = [model.name]  # Start the row with the model name
 
-                # Check for each key, retrieve the value, handle NaN if applicable
-                for key in all_keys:
-                    value = model.statistics.get(key, 'N/A')  # Get the value or default to 'N/A'
+            # Check for each key, retrieve the value, handle NaN if applicable
+            for key in all_keys:
+                value = model.statistics.get(key)
 
-                    # Check if the value is a number and if it's NaN
-                    if isinstance(value, (int, float)) and math.isnan(value):
-                        row.append('N/A')
-                    else:
-                        row.append(value)
+                # Check if the value is a number and if it's NaN
+                if isinstance(value, (int, float)) and math.isnan(value):
+                    row.append(None)
+                else:
+                    row.append(value)
 
-                # Write the row to the CSV file
-                writer.writerow(row)
+            rows.append(row)
 
-        logger.success(f"Statistics for models in dataset '{self.name}' successfully saved in {output_path}.")
+        # Object columns keep each value as it is. In CSV files missing values are written as 'N/A' (with the line
+        # terminator of the csv module, as in previous versions of this file)
+        df = pd.DataFrame(rows, columns=['model'] + all_keys, dtype=object)
+        save_table(df, output_path,
+                   f"Statistics for models in dataset '{self.name}' successfully saved in {output_path}.", na_rep='N/A',
+                   lineterminator='\r\n')
 
-    def calculate_stereotype_statistics(self) -> None:
+    def calculate_stereotype_statistics(self, num_workers: int = 1, metric_names: list[str] = None) -> None:
         """
         Calculate stereotype statistics for class and relation stereotypes, both raw and clean,
         and store the results in the corresponding dictionaries.
         """
-        # Step 1: Calculate raw statistics (without cleaning 'none' and 'other') for class and relation stereotypes
-        self.class_statistics_raw = calculate_stereotype_metrics(self.models, 'class', filter_type=False)
-        self.relation_statistics_raw = calculate_stereotype_metrics(self.models, 'relation', filter_type=False)
-        self.combined_statistics_raw = calculate_stereotype_metrics(self.models, 'combined', filter_type=False)
+        # Raw statistics keep 'none' and 'other', clean statistics filter them out
+        datasets_statistics, datasets_pairwise = calculate_datasets_stereotype_metrics([self], num_workers,
+                                                                                       metric_names)
+        self.set_stereotype_statistics(datasets_statistics[0], datasets_pairwise[0])
+
+    def set_stereotype_statistics(self, variants_statistics: dict[str, dict],
+                                  pairwise: PairwiseStereotypeMatrices = None) -> None:
+        """
+        Store the statistics of each stereotype variant (e.g., 'class_raw') in the corresponding attribute, as lazy
+        StereotypeStatistics: the given metrics are kept, and any other metric is calculated when first accessed.
 
-        # Step 2: Calculate clean statistics (with filtering 'none' and 'other') for class and relation stereotypes
-        self.class_statistics_clean = calculate_stereotype_metrics(self.models, 'class', filter_type=True)
-        self.relation_statistics_clean = calculate_stereotype_metrics(self.models, 'relation', filter_type=True)
-        self.combined_statistics_clean = calculate_stereotype_metrics(self.models, 'combined', filter_type=True)
+        :param variants_statistics: Calculated statistics of each variant, by variant name.
+        :param pairwise: Pairwise matrices of the dataset already calculated with the statistics (e.g., by
+                         calculate_datasets_stereotype_metrics), reused by all variants. Defaults to empty ones.
+        """
+        # Pairwise metrics that were not calculated are sliced from matrices shared by all variants when accessed
+        if pairwise is None:
+            pairwise = PairwiseStereotypeMatrices(self.select_stereotype_counts)
+        statistics = {}
+        for variant, (stereotype_type, filter_type) in STEREOTYPE_VARIANTS.items():
+            data_loader = partial(extract_stereotype_data, self, stereotype_type, filter_type)
+            statistics[variant] = StereotypeStatistics(data_loader, variants_statistics[variant], pairwise,
+                                                       get_variant_columns(self, stereotype_type, filter_type))
+
+        self.class_statistics_raw = statistics['class_raw']
+        self.relation_statistics_raw = statistics['relation_raw']
+        self.combined_statistics_raw = statistics['combined_raw']
+
+        self.class_statistics_clean = statistics['class_clean']
+        self.relation_statistics_clean = statistics['relation_clean']
+        self.combined_statistics_clean = statistics['combined_clean']
 
         logger.success(f"Stereotype statistics calculated for dataset '{self.name}'.")
 
-    def save_stereotype_statistics(self, output_dir: str) -> None:
+    def save_stereotype_statistics(self, output_dir: str, metric_names: list[str] = None) -> None:
         """
-        Save all stereotype statistics (class/relation, raw/clean) to separate CSV files in different folders.
+        Save the stereotype statistics (class/relation, raw/clean) to separate CSV files in different folders.
         :param output_dir: Directory where the CSV files will be saved.
+        :param metric_names: Statistics to save, in the order of STEREOTYPE_METRICS. Defaults to all of them.
         """
         # Define subdirectories for class/relation and raw/clean data
         subdirs = {'class_raw': self.class_statistics_raw, 'relation_raw': self.relation_statistics_raw,
@@ -246,58 +449,41 @@ class Dataset():
             os.makedirs(output_subdir, exist_ok=True)
 
             # Save the statistics to CSV files
-            for stat_name, dataframe in statistics.items():
+            for stat_name in STEREOTYPE_METRICS:
+                if metric_names is not None and stat_name not in metric_names:
+                    continue
+                dataframe = statistics[stat_name]
                 stat_name_cleaned = stat_name.lower().replace(" ", "_")
                 filepath = os.path.join(output_subdir, f"{stat_name_cleaned}.csv")
-                save_to_csv(dataframe, filepath,
-                            f"Dataset {self.name}, case '{subdir}', statistic '{stat_name}' saved successfully in '{filepath}'.")
+                save_table(dataframe, filepath,
+                           f"Dataset {self.name}, case '{subdir}', statistic '{stat_name}' saved successfully in '{filepath}'.")
 
     def calculate_and_save_stereotypes_by_year(self, output_dir: str) -> pd.DataFrame:
-        # Create dictionaries to hold the sum of stereotypes per year for class and relation (occurrence-wise and model-wise)
-        yearly_data_class_ow = {}
-        yearly_data_relation_ow = {}
-        yearly_data_class_mw = {}
-        yearly_data_relation_mw = {}
-
-        cases = {'class': (self.data_class, yearly_data_class_ow, yearly_data_class_mw),
-                 'relation': (self.data_relation, yearly_data_relation_ow, yearly_data_relation_mw)}
-
-        # Loop through each model and accumulate the stereotype counts by year
-        for analysis, (content, yearly_data_ow, yearly_data_mw) in cases.items():
-            for model in self.models:
-                model_year = model.year
-
-                if model_year not in yearly_data_ow:
-                    yearly_data_ow[model_year] = np.zeros(len(content.columns) - 1,
-                                                          dtype=int)  # Initialize with zeros for occurrence-wise calculation
-                if model_year not in yearly_data_mw:
-                    yearly_data_mw[model_year] = np.zeros(len(content.columns) - 1,
-                                                          dtype=int)  # Initialize with zeros for model-wise calculation
-
-                # Fetch the row for the current model and ensure it matches the expected length
-                model_data = content.loc[content['model'] == model.name].iloc[0, 1:].astype(int).values
-
-                if len(model_data) == len(yearly_data_ow[model_year]):
-                    # Occurrence-wise: Sum the stereotype counts for each year
-                    yearly_data_ow[model_year] += model_data
-
-                    # Model-wise: Check where a stereotype occurs (binary approach)
-                    yearly_data_mw[model_year] += (model_data > 0).astype(int)
-                else:
-                    raise ValueError(f"Mismatch in number of columns for model {model.name} in {analysis} analysis.")
-
-            # Convert the dictionaries to DataFrames (both occurrence-wise and model-wise)
-            stereotypes = content.columns[1:]  # Get the stereotype names
-            df_yearly_ow = pd.DataFrame.from_dict(yearly_data_ow, orient='index', columns=stereotypes)
-            df_yearly_mw = pd.DataFrame.from_dict(yearly_data_mw, orient='index', columns=stereotypes)
-
-            # Set the 'year' as the index
-            df_yearly_ow.index.name = 'year'
-            df_yearly_mw.index.name = 'year'
-
-            # Sort the DataFrames by the 'year' index in ascending order
-            df_yearly_ow = df_yearly_ow.sort_index(ascending=True)
-            df_yearly_mw = df_yearly_mw.sort_index(ascending=True)
+        # Aggregate the count matrix by year (in ascending order), for class and relation (occurrence-wise and
+        # model-wise), one block of models at a time
+        years, year_indexes = np.unique(self.model_years, return_inverse=True)
+        for analysis in ['class', 'relation']:
+            _, stereotypes = self.get_stereotype_columns(analysis)
+            yearly_ow = np.zeros((len(years), len(stereotypes)), dtype=np.int64)
+            yearly_mw = np.zeros((len(years), len(stereotypes)), dtype=np.int64)
+
+            start = 0
+            for counts in self.iterate_stereotype_counts(analysis):
+                counts_years = year_indexes[start:start + len(counts)]
+
+                for column in range(len(stereotypes)):
+                    # Occurrence-wise: Sum the stereotype counts for each year (float sums are exact below 2 ** 53)
+                    yearly_ow[:, column] += np.bincount(counts_years, weights=counts[:, column],
+                                                        minlength=len(years)).astype(np.int64)
+
+                    # Model-wise: Count the models in which each stereotype occurs (binary approach)
+                    yearly_mw[:, column] += np.bincount(counts_years[counts[:, column] > 0], minlength=len(years))
+                start += len(counts)
+
+            # Set the 'year' as the index (occurrence-wise sums keep the type of the count matrix)
+            df_yearly_ow = pd.DataFrame(yearly_ow.astype(COUNT_DTYPE), index=pd.Index(years, name='year'),
+                                        columns=list(stereotypes))
+            df_yearly_mw = pd.DataFrame(yearly_mw, index=pd.Index(years, name='year'), columns=list(stereotypes))
 
             # Store the occurrence-wise and model-wise results in years_stereotypes_data
             self.years_stereotypes_data[f'{analysis}_ow'] = df_yearly_ow
@@ -329,23 +515,13 @@ class Dataset():
 
             # Save the DataFrame to a CSV file
             csv_path = os.path.join(output_dir_final, f'years_stereotypes_{key}.csv')
-            self.years_stereotypes_data[key].to_csv(csv_path)
-            logger.success(f"{key} stereotypes data saved to {csv_path}.")
+            save_table(self.years_stereotypes_data[key], csv_path, f"{key} stereotypes data saved to {csv_path}.",
+                       index=True)
 
     def calculate_and_save_models_by_year(self, output_dir: str):
-        # Initialize dictionaries to count the number of models per year
-        model_count = {}
-
-        # Loop through self.models to count models for each year based on whether they have class or relation data
-        for model in self.models:
-            model_year = model.year
-
-            if model_year not in model_count:
-                model_count[model_year] = 0
-            model_count[model_year] += 1  # Assuming all models have at least one stereotype of any type
-
-        # Convert the dictionaries into DataFrames
-        df_model_count = pd.DataFrame(list(model_count.items()), columns=['year', 'num_models'])
+        # Count the models of each year (assuming all models have at least one stereotype of any type)
+        years, num_models = np.unique(self.model_years, return_counts=True)
+        df_model_count = pd.DataFrame({'year': years, 'num_models': num_models})
 
         # Calculate the total number of models
         total_models = df_model_count['num_models'].sum()
@@ -365,8 +541,7 @@ class Dataset():
 
         # Save models per year data
         models_csv_path = os.path.join(output_dir_final, 'years_models_number.csv')
-        self.years_models_number.to_csv(models_csv_path, index=False)
-        logger.success(f"Models per year data saved to {models_csv_path}.")
+        save_table(self.years_models_number, models_csv_path, f"Models per year data saved to {models_csv_path}.")
 
     def _normalize_stereotypes_overall(self, case) -> None:
         df = self.years_stereotypes_data[case]
@@ -395,41 +570,18 @@ class Dataset():
         Save a CSV file that reports the number of class and relation stereotypes for each year, including ratio, cumulative,
         ontouml, none, and other class/relation columns, and their respective ratios and cumulative values.
         """
-        # Initialize a dictionary to hold the stereotype counts per year
-        year_data = {}
-
-        # Loop through each model and accumulate class and relation stereotypes by year
-        for model in self.models:
-            model_year = model.year
-
-            # Initialize the year entry if not present
-            if model_year not in year_data:
-                year_data[model_year] = {'num_class': 0, 'ontouml_class': 0, 'none_class': 0, 'other_class': 0,
-                                         'num_relation': 0, 'ontouml_relation': 0, 'none_relation': 0,
-                                         'other_relation': 0}
-
-            # Process class stereotypes
-            for stereotype, count in model.class_stereotypes.items():
-                year_data[model_year]['num_class'] += count
-                if stereotype == 'none':
-                    year_data[model_year]['none_class'] += count
-                elif stereotype == 'other':
-                    year_data[model_year]['other_class'] += count
-                else:
-                    year_data[model_year]['ontouml_class'] += count
-
-            # Process relation stereotypes
-            for stereotype, count in model.relation_stereotypes.items():
-                year_data[model_year]['num_relation'] += count
-                if stereotype == 'none':
-                    year_data[model_year]['none_relation'] += count
-                elif stereotype == 'other':
-                    year_data[model_year]['other_relation'] += count
-                else:
-                    year_data[model_year]['ontouml_relation'] += count
-
-        # Convert the dictionary to a DataFrame for easier CSV saving
-        df_year_data = pd.DataFrame.from_dict(year_data, orient='index').reset_index()
+        # Split the class and relation totals of each model into OntoUML, none and other using the count matrix
+        model_data = {}
+        for stereotype_type in ['class', 'relation']:
+            ontouml_count, none_count, other_count = self._calculate_stereotype_group_counts(stereotype_type)
+
+            model_data[f'num_{stereotype_type}'] = ontouml_count + none_count + other_count
+            model_data[f'ontouml_{stereotype_type}'] = ontouml_count
+            model_data[f'none_{stereotype_type}'] = none_count
+            model_data[f'other_{stereotype_type}'] = other_count
+
+        # Accumulate the per-model values by year
+        df_year_data = pd.DataFrame(model_data).groupby(self.model_years).sum().reset_index()
         df_year_data.columns = ['year', 'num_class', 'ontouml_class', 'none_class', 'other_class', 'num_relation',
                                 'ontouml_relation', 'none_relation', 'other_relation']
 
@@ -516,9 +668,7 @@ class Dataset():
 
         # Save the DataFrame to a CSV file
         csv_path = os.path.join(output_dir_final, 'stereotypes_count_by_year.csv')
-        df_year_data.to_csv(csv_path, index=False)
-
-        logger.success(f"Stereotypes count by year data saved to {csv_path}.")
+        save_table(df_year_data, csv_path, f"Stereotypes count by year data saved to {csv_path}.")
 
     def calculate_invalid_stereotypes_metrics(self) -> None:
         """
@@ -530,17 +680,18 @@ class Dataset():
         invalid_class_metrics = {}
         invalid_relation_metrics = {}
 
-        # Iterate over all models in the dataset
-        for model in self.models:
+        # Iterate over the models with invalid stereotypes, in the order of the dataset
+        for invalid_class_stereotypes, invalid_relation_stereotypes in self._storage.iterate_invalid_stereotypes(
+                self._rows):
             # Collect invalid class stereotypes
-            for stereotype, count in model.invalid_class_stereotypes.items():
+            for stereotype, count in invalid_class_stereotypes.items():
                 if stereotype not in invalid_class_metrics:
                     invalid_class_metrics[stereotype] = {'accumulated_frequency': 0, 'model_coverage': 0}
                 invalid_class_metrics[stereotype]['accumulated_frequency'] += count
                 invalid_class_metrics[stereotype]['model_coverage'] += 1  # Each model contributes once per stereotype
 
             # Collect invalid relation stereotypes
-            for stereotype, count in model.invalid_relation_stereotypes.items():
+            for stereotype, count in invalid_relation_stereotypes.items():
                 if stereotype not in invalid_relation_metrics:
                     invalid_relation_metrics[stereotype] = {'accumulated_frequency': 0, 'model_coverage': 0}
                 invalid_relation_metrics[stereotype]['accumulated_frequency'] += count
@@ -580,8 +731,8 @@ class Dataset():
                           invalid_class_metrics.items()]
             class_filepath = os.path.join(output_dir, f"{self.name}_invalid_class_stereotypes_metrics.csv")
             class_df = pd.DataFrame(class_data)
-            class_df.to_csv(class_filepath, index=False, sep=';', header=True)
-            logger.success(f"Invalid class stereotypes metrics saved successfully to {class_filepath}.")
+            save_table(class_df, class_filepath,
+                       f"Invalid class stereotypes metrics saved successfully to {class_filepath}.", sep=';')
         else:
             logger.info(f"No invalid class stereotypes found for dataset '{self.name}'.")
 
@@ -592,8 +743,8 @@ class Dataset():
                              invalid_relation_metrics.items()]
             relation_filepath = os.path.join(output_dir, f"{self.name}_invalid_relation_stereotypes_metrics.csv")
             relation_df = pd.DataFrame(relation_data)
-            relation_df.to_csv(relation_filepath, index=False, sep=';', header=True)
-            logger.success(f"Invalid relation stereotypes metrics saved successfully to {relation_filepath}.")
+            save_table(relation_df, relation_filepath,
+                       f"Invalid relation stereotypes metrics saved successfully to {relation_filepath}.", sep=';')
         else:
             logger.info(f"No invalid relation stereotypes found for dataset '{self.name}'.")
 
@@ -609,116 +760,71 @@ class Dataset():
             "relation": {}
         }
 
-        # Define groups and their conditions
-        def group_conditions(ontouml_count, none_count, other_count):
-            return {
-                "ontouml_and_other_and_none": ontouml_count > 0 and other_count > 0 and none_count > 0,
-                "ontouml_and_other_and_not_none": ontouml_count > 0 and other_count > 0 and none_count == 0,
-                "ontouml_and_not_other_and_none": ontouml_count > 0 and other_count == 0 and none_count > 0,
-                "ontouml_and_not_other_and_not_none": ontouml_count > 0 and other_count == 0 and none_count == 0,
-                "not_ontouml_and_other_and_none": ontouml_count == 0 and other_count > 0 and none_count > 0,
-                "not_ontouml_and_other_and_not_none": ontouml_count == 0 and other_count > 0 and none_count == 0,
-                "not_ontouml_and_not_other_and_none": ontouml_count == 0 and other_count == 0 and none_count > 0,
-                "not_ontouml_and_not_other_and_not_none": ontouml_count == 0 and other_count == 0 and none_count == 0,
-            }
-
         # Helper function to calculate AF, MC, their ratios, and all metrics
-        def calculate_metrics(models, stereotype_type):
-            # Initialize metrics dictionary
-            metrics = {
-                "af": {key: 0 for key in group_conditions(0, 0, 0)},
-                "mc": {key: 0 for key in group_conditions(0, 0, 0)},
-                "ratio_af": {},
-                "ratio_mc": {},
-                "all": {"ontouml": 0, "none": 0, "other": 0},  # Aggregated metrics
-            }
+        def calculate_metrics(stereotype_type):
+            # Split each model's total into OntoUML, none and other counts using the count matrix
+            ontouml_counts, none_counts, other_counts = self._calculate_stereotype_group_counts(stereotype_type)
+            total_counts = ontouml_counts + none_counts + other_counts
 
             # Total counts for ratios
-            total_stereotypes = sum(
-                sum(value for key, value in model.class_stereotypes.items())
-                if stereotype_type == "class"
-                else sum(value for key, value in model.relation_stereotypes.items())
-                for model in models
-            )
-            total_models = len(models)
-
-            # Iterate over models to calculate AF and MC
-            # Inside calculate_metrics
-            for model in models:
-                # Extract the stereotype dictionary based on the stereotype type
-                stereotypes = (
-                    model.class_stereotypes if stereotype_type == "class" else model.relation_stereotypes
-                )
+            total_stereotypes = int(total_counts.sum())
+            total_models = self.num_models
 
-                # Calculate the total number of stereotypes for this model
-                total_count = sum(stereotypes.values())
+            # Models without stereotypes are not in any group
+            has_stereotypes = total_counts > 0
+            has_group = {"ontouml": ontouml_counts > 0, "other": other_counts > 0, "none": none_counts > 0}
 
-                # Skip processing if there are no stereotypes
-                if total_count == 0:
-                    continue
-
-                # Aggregate counts for groups
-                ontouml_count = sum(value for key, value in stereotypes.items() if key not in ["none", "other"])
-                none_count = stereotypes["none"]
-                other_count = stereotypes["other"]
-
-                # Apply group conditions and update metrics
-                for condition, check in group_conditions(ontouml_count, none_count, other_count).items():
-                    if check:
-                        metrics["af"][condition] += ontouml_count + none_count + other_count
-                        metrics["mc"][condition] += 1
-
-                # Update "all" metrics
-                metrics["all"]["ontouml"] += ontouml_count
-                metrics["all"]["none"] += none_count
-                metrics["all"]["other"] += other_count
+            metrics = {"af": {}, "mc": {}, "ratio_af": {}, "ratio_mc": {}}
 
-            # Generate ratio keys for group conditions
-            for condition in metrics["af"]:
-                af_value = metrics["af"][condition]
-                mc_value = metrics["mc"][condition]
+            # Each group condition is a row mask combining the presence (or absence) of the three stereotype groups
+            for ontouml_present, other_present, none_present in itertools.product([True, False], repeat=3):
+                condition = "_and_".join(group if present else f"not_{group}" for group, present in
+                                         [("ontouml", ontouml_present), ("other", other_present),
+                                          ("none", none_present)])
+                mask = (has_stereotypes & (has_group["ontouml"] == ontouml_present)
+                        & (has_group["other"] == other_present) & (has_group["none"] == none_present))
 
-                metrics["ratio_af"][condition] = af_value / total_stereotypes if total_stereotypes > 0 else 0
-                metrics["ratio_mc"][condition] = mc_value / total_models if total_models > 0 else 0
+                metrics["af"][condition] = int(total_counts[mask].sum())
+                metrics["mc"][condition] = int(mask.sum())
 
             # Add "all" metrics (AF and MC)
-            metrics["af"]["all_ontouml"] = metrics["all"]["ontouml"]
-            metrics["af"]["all_none"] = metrics["all"]["none"]
-            metrics["af"]["all_other"] = metrics["all"]["other"]
-
-            metrics["mc"]["all_ontouml"] = sum(1 for model in models if sum(
-                value for key, value in
-                (model.class_stereotypes if stereotype_type == "class" else model.relation_stereotypes).items()
-                if key not in ["none", "other"]
-            ) > 0)
-            metrics["mc"]["all_none"] = sum(1 for model in models if (
-                model.class_stereotypes if stereotype_type == "class" else model.relation_stereotypes)["none"] > 0)
-            metrics["mc"]["all_other"] = sum(1 for model in models if (
-                model.class_stereotypes if stereotype_type == "class" else model.relation_stereotypes)["other"] > 0)
-
-            # Generate "all" ratios
-            metrics["ratio_af"]["all_ontouml"] = metrics["all"][
-                                                     "ontouml"] / total_stereotypes if total_stereotypes > 0 else 0
-            metrics["ratio_af"]["all_none"] = metrics["all"]["none"] / total_stereotypes if total_stereotypes > 0 else 0
-            metrics["ratio_af"]["all_other"] = metrics["all"][
-                                                   "other"] / total_stereotypes if total_stereotypes > 0 else 0
-
-            metrics["ratio_mc"]["all_ontouml"] = metrics["mc"]["all_ontouml"] / total_models if total_models > 0 else 0
-            metrics["ratio_mc"]["all_none"] = metrics["mc"]["all_none"] / total_models if total_models > 0 else 0
-            metrics["ratio_mc"]["all_other"] = metrics["mc"]["all_other"] / total_models if total_models > 0 else 0
-
-            # Remove the "all" key to avoid duplicate columns
-            del metrics["all"]
+            for group, group_counts in [("ontouml", ontouml_counts), ("none", none_counts), ("other", other_counts)]:
+                metrics["af"][f"all_{group}"] = int(group_counts.sum())
+                metrics["mc"][f"all_{group}"] = int(has_group[group].sum())
+
+            # Generate the ratios of every group condition and "all" metric
+            for key in metrics["af"]:
+                metrics["ratio_af"][key] = metrics["af"][key] / total_stereotypes if total_stereotypes > 0 else 0
+                metrics["ratio_mc"][key] = metrics["mc"][key] / total_models if total_models > 0 else 0
 
             return metrics
 
         # Calculate metrics for class and relation stereotypes
-        self.analysis2["class"] = calculate_metrics(self.models, "class")
-        self.analysis2["relation"] = calculate_metrics(self.models, "relation")
+        self.analysis2["class"] = calculate_metrics("class")
+        self.analysis2["relation"] = calculate_metrics("relation")
 
         # Log the results for debugging or confirmation
         logger.success("Analysis2 (AF, MC, Ratios, and All metrics) calculated and stored successfully.")
 
+    def _calculate_stereotype_group_counts(self, stereotype_type: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the per-model sums of the OntoUML, 'none' and 'other' stereotypes of the given type, with a single pass
+        over its columns of the count matrix, one block of models at a time.
+        """
+        _, stereotypes = self.get_stereotype_columns(stereotype_type)
+        group_columns = np.where(stereotypes == 'none', 1, np.where(stereotypes == 'other', 2, 0))
+
+        # Sum the columns of each group (int64, as the sums may exceed the count matrix type)
+        group_counts = np.zeros((self.num_models, 3), dtype=np.int64)
+        start = 0
+        for counts in self.iterate_stereotype_counts(stereotype_type):
+            block_group_counts = group_counts[start:start + len(counts)]
+            for column, group in enumerate(group_columns.tolist()):
+                block_group_counts[:, group] += counts[:, column]
+            start += len(counts)
+
+        return group_counts[:, 0], group_counts[:, 1], group_counts[:, 2]
+
     def save_analysis2_to_csv(self, output_dir: str) -> None:
         """
         Save the `analysis2` results to a CSV file with two rows: one for the header and one for the values.
@@ -754,23 +860,14 @@ class Dataset():
 
             for metric in ["af", "mc", "ratio_af", "ratio_mc"]:
                 for row in rows:
-                    # Get the value for the specific combination and metric
-                    value = metrics[metric].get(row, "N/A")  # Use "N/A" if the value is missing
-                    results[row].append(value)
-
-        # Write the results to a CSV file
-        with open(file_path, mode="w", newline="") as file:
-            writer = csv.writer(file)
-
-            # Write the header (columns)
-            writer.writerow(["combination"] + columns)
+                    # Get the value for the specific combination and metric (None if it is missing)
+                    results[row].append(metrics[metric].get(row))
 
-            # Write the rows
-            for row, values in results.items():
-                writer.writerow([row] + values)
-
-        # Log success message
-        logger.success(f"Analysis2 results saved in alternate format successfully to {file_path}.")
+        # Save the results, writing missing values as 'N/A' (and csv module line terminators) in CSV files
+        df = pd.DataFrame([[row] + values for row, values in results.items()], columns=["combination"] + columns,
+                          dtype=object)
+        save_table(df, file_path, f"Analysis2 results saved in alternate format successfully to {file_path}.",
+                   na_rep="N/A", lineterminator="\r\n")
 
 
     def general_validation(self) -> None:
@@ -785,18 +882,16 @@ class Dataset():
         for stereotype_type in ["class", "relation"]:
             metrics = self.analysis2[stereotype_type]
 
-            # Calculate expected total AF and MC dynamically
-            expected_af = sum(
-                model.total_class_number if stereotype_type == "class" else model.total_relation_number
-                for model in self.models
-            )
+            # Calculate expected total AF and MC from the per-model totals
+            model_numbers = self.model_class_numbers if stereotype_type == "class" else self.model_relation_numbers
+            expected_af = int(model_numbers.sum())
             total_af = sum(value for key, value in metrics["af"].items() if not key.startswith("all_"))
             assert math.isclose(total_af, expected_af, rel_tol=1e-5), (
                 f"Total AF for {stereotype_type} does not match. Found: {total_af}, Expected: {expected_af}."
             )
 
             # Calculate expected total MC
-            expected_mc = len(self.models)
+            expected_mc = self.num_models
             total_mc = sum(value for key, value in metrics["mc"].items() if not key.startswith("all_"))
             assert total_mc <= expected_mc, (
                 f"Total MC for {stereotype_type} exceeds the number of models. Found: {total_mc}, Expected: {expected_mc}."
@@ -838,4 +933,14 @@ class Dataset():
                 f"Sum of AF ratios for all_* in {stereotype_type} does not equal 1. Found: {total_ratio_af}."
             )
 
-        logger.success("All general validations passed successfully.")
\ No newline at end of file
+        logger.success("All general validations passed successfully.")
+
+
+def _range_mask(values: np.ndarray, minimum=None, maximum=None) -> np.ndarray:
+    """Boolean mask of the values in the inclusive range, where None leaves a bound open."""
+    mask = np.ones(len(values), dtype=bool)
+    if minimum is not None:
+        mask &= values >= minimum
+    if maximum is not None:
+        mask &= values <= maximum
+    return mask
@@ -1,9 +1,135 @@
 import csv
+import sys
+from array import array
+from collections import defaultdict
+from collections.abc import MutableMapping
+from typing import Optional
 
 from src.calculations.statistics_calculations_datasets import calculate_ratios
 
 
+class StereotypeVocabulary:
+    """
+    Ordered stereotype names of one type ('class' or 'relation'), shared by all models. Each name has a fixed column
+    index, which is also its position in the models' count arrays and in the datasets' count matrices.
+    """
+    __slots__ = ("stereotype_type", "names", "indexes")
+
+    def __init__(self, stereotype_type: str, names: list[str]) -> None:
+        self.stereotype_type: str = stereotype_type
+        self.names: tuple[str, ...] = tuple(sys.intern(name) for name in names)
+        self.indexes: dict[str, int] = {name: index for index, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __reduce__(self):
+        # Pickled by reference, so models do not carry a copy of the vocabulary
+        return get_stereotype_vocabulary, (self.stereotype_type,)
+
+
+CLASS_VOCABULARY = StereotypeVocabulary("class", [
+    "abstract", "category", "collective", "datatype", "enumeration", "event", "historicalRole", "historicalRoleMixin",
+    "kind", "mixin", "mode", "phase", "phaseMixin", "quality", "quantity", "relator", "role", "roleMixin", "situation",
+    "subkind", "type", "none", "other"])
+
+RELATION_VOCABULARY = StereotypeVocabulary("relation", [
+    "bringsAbout", "characterization", "comparative", "componentOf", "creation", "derivation", "externalDependence",
+    "formal", "historicalDependence", "instantiation", "manifestation", "material", "mediation", "memberOf",
+    "participation", "participational", "subCollectionOf", "subQuantityOf", "termination", "triggers", "none",
+    "other"])
+
+STEREOTYPE_VOCABULARIES = {"class": CLASS_VOCABULARY, "relation": RELATION_VOCABULARY}
+
+
+def get_stereotype_vocabulary(stereotype_type: str) -> StereotypeVocabulary:
+    if stereotype_type not in STEREOTYPE_VOCABULARIES:
+        raise ValueError("Invalid stereotype_type. Must be 'class' or 'relation'.")
+    return STEREOTYPE_VOCABULARIES[stereotype_type]
+
+
+def normalize_stereotype(stereotype: str) -> str:
+    """Normalize a stereotype name, ignoring case, surrounding spaces, hyphens, underscores and inner spaces."""
+    return stereotype.strip().lower().replace("-", "").replace("_", "").replace(" ", "")
+
+
+class StereotypeNormalizer:
+    """
+    Memoized resolution of raw stereotype strings (as found in the catalog) to the column indexes of the stereotype
+    vocabularies. Each distinct raw string is normalized only once per vocabulary; afterward it costs a single
+    dictionary lookup. Normalized names are interned. The normalizer only caches resolutions: the invalid stereotypes
+    found are reported by each call of ModelData.add_stereotype_counts, not accumulated here.
+    """
+
+    def __init__(self, vocabularies: dict[str, StereotypeVocabulary]) -> None:
+        # Per vocabulary: normalized name -> column index
+        self._normalized_indexes: dict[str, dict[str, int]] = {
+            stereotype_type: {normalize_stereotype(name): index for index, name in enumerate(vocabulary.names)}
+            for stereotype_type, vocabulary in vocabularies.items()}
+
+        # Per vocabulary: raw string -> (column index, or None if invalid; normalized name)
+        self._resolved: dict[str, dict[str, tuple[Optional[int], str]]] = {stereotype_type: {} for stereotype_type in
+                                                                          vocabularies}
+
+    def resolve(self, stereotype_type: str, stereotype: str) -> tuple[Optional[int], str]:
+        """Return the column index of a raw stereotype (None if it is invalid) and its normalized name."""
+        resolved = self._resolved[stereotype_type].get(stereotype)
+        if resolved is None:
+            resolved = self._resolve_new(stereotype_type, stereotype)
+        return resolved
+
+    def _resolve_new(self, stereotype_type: str, stereotype: str) -> tuple[Optional[int], str]:
+        normalized_stereotype = sys.intern(normalize_stereotype(stereotype))
+        index = self._normalized_indexes[stereotype_type].get(normalized_stereotype)
+        resolved = self._resolved[stereotype_type][stereotype] = (index, normalized_stereotype)
+        return resolved
+
+
+# Normalizer shared by all models, for both vocabularies
+STEREOTYPE_NORMALIZER = StereotypeNormalizer(STEREOTYPE_VOCABULARIES)
+
+
+class StereotypeCounts(MutableMapping):
+    """
+    Stereotype counts of one model, stored as an array('i') in the order of its vocabulary. Read and updated like a
+    dictionary from stereotype names to counts, but the set of names is fixed by the vocabulary.
+    """
+    __slots__ = ("vocabulary", "counts")
+
+    def __init__(self, vocabulary: StereotypeVocabulary, counts=None) -> None:
+        self.vocabulary: StereotypeVocabulary = vocabulary
+        self.counts: array = array('i', counts) if counts is not None else array('i', [0]) * len(vocabulary)
+
+    def __getitem__(self, stereotype: str) -> int:
+        return self.counts[self.vocabulary.indexes[stereotype]]
+
+    def __setitem__(self, stereotype: str, count: int) -> None:
+        self.counts[self.vocabulary.indexes[stereotype]] = count
+
+    def __delitem__(self, stereotype: str) -> None:
+        raise TypeError("Stereotypes cannot be removed from a model's counts.")
+
+    def __iter__(self):
+        return iter(self.vocabulary.names)
+
+    def __len__(self) -> int:
+        return len(self.vocabulary)
+
+    def __contains__(self, stereotype) -> bool:
+        return stereotype in self.vocabulary.indexes
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())})"
+
+    def __reduce__(self):
+        return StereotypeCounts, (self.vocabulary, self.counts)
+
+
 class ModelData:
+    __slots__ = ("name", "year", "is_classroom", "total_class_number", "total_relation_number", "statistics",
+                 "class_stereotypes", "relation_stereotypes", "invalid_class_stereotypes",
+                 "invalid_relation_stereotypes")
+
     def __init__(self, name: str, year: int, is_classroom: bool, total_class: int, total_relation: int) -> None:
 
         self.name: str = name
@@ -13,100 +139,82 @@ class ModelData:
         self.total_relation_number: int = total_relation
         self.statistics: dict = {}
 
-        # List of attributes stored in the 'stats' dictionary
-        self.class_stereotypes: list[str] = ["abstract", "category", "collective", "datatype", "enumeration", "event",
-                                             "historicalRole", "historicalRoleMixin", "kind", "mixin", "mode", "phase",
-                                             "phaseMixin", "quality", "quantity", "relator", "role", "roleMixin",
-                                             "situation", "subkind", "type", "none", "other"]
-
-        # List of attributes stored in the 'stats' dictionary
-        self.relation_stereotypes: list[str] = ["bringsAbout", "characterization", "comparative", "componentOf",
-                                                "creation", "derivation", "externalDependence", "formal",
-                                                "historicalDependence", "instantiation", "manifestation", "material",
-                                                "mediation", "memberOf", "participation", "participational",
-                                                "subCollectionOf", "subQuantityOf", "termination", "triggers", "none",
-                                                "other"]
-
-        # Initialize 'stats' dictionary with default value 0 for all attributes
-        self.class_stereotypes: dict[str, int] = {attr: 0 for attr in self.class_stereotypes}
-        self.relation_stereotypes: dict[str, int] = {attr: 0 for attr in self.relation_stereotypes}
-
-        # Create a mapping from normalized keys to original keys
-        self.normalized_class_stereotypes = {
-            attr.strip().lower().replace("-", "").replace("_", "").replace(" ", ""): attr
-            for attr in [
-                "abstract", "category", "collective", "datatype", "enumeration", "event",
-                "historicalRole", "historicalRoleMixin", "kind", "mixin", "mode", "phase",
-                "phaseMixin", "quality", "quantity", "relator", "role", "roleMixin",
-                "situation", "subkind", "type", "none", "other"
-            ]
-        }
-
-        self.normalized_relation_stereotypes = {
-            attr.strip().lower().replace("-", "").replace("_", "").replace(" ", ""): attr
-            for attr in [
-                "bringsAbout", "characterization", "comparative", "componentOf", "creation",
-                "derivation", "externalDependence", "formal", "historicalDependence", "instantiation",
-                "manifestation", "material", "mediation", "memberOf", "participation",
-                "participational", "subCollectionOf", "subQuantityOf", "termination", "triggers", "none",
-                "other"
-            ]
-        }
+        # Counts of each stereotype of the shared vocabularies, all starting at 0
+        self.class_stereotypes: StereotypeCounts = StereotypeCounts(CLASS_VOCABULARY)
+        self.relation_stereotypes: StereotypeCounts = StereotypeCounts(RELATION_VOCABULARY)
 
         # Separate dictionaries for invalid stereotypes and their counts
         self.invalid_class_stereotypes: dict[str, int] = {}
         self.invalid_relation_stereotypes: dict[str, int] = {}
 
+    def __getstate__(self) -> dict:
+        return {attribute: getattr(self, attribute) for attribute in self.__slots__}
+
+    def __setstate__(self, state: dict) -> None:
+        for attribute in self.__slots__:
+            setattr(self, attribute, state[attribute])
+
+        # Objects pickled before the shared vocabularies stored their counts as plain dictionaries
+        for attribute, vocabulary in [("class_stereotypes", CLASS_VOCABULARY),
+                                      ("relation_stereotypes", RELATION_VOCABULARY)]:
+            if isinstance(state[attribute], dict):
+                counts = [state[attribute][stereotype] for stereotype in vocabulary.names]
+                setattr(self, attribute, StereotypeCounts(vocabulary, counts))
+
     def count_stereotypes(self, stereotype_type: str, input_csv_path: str) -> None:
         """
         Count the stereotypes for the current model instance based on the provided CSV file.
         Tracks invalid stereotypes in separate dictionaries for class and relation stereotypes.
+
+        Note: this re-reads the whole CSV for every model. For whole catalogs prefer building an index once with
+        index_stereotypes_csv() and calling add_stereotype_counts() with each model's rows.
         """
 
-        # Choose the appropriate stereotypes dictionary and normalization map
+        # Read the CSV file containing stereotypes and counts, keeping only the current instance's rows
+        with open(input_csv_path, mode='r', newline='') as file:
+            reader = csv.DictReader(file)
+            rows = [(row["stereotype"], int(row["count"])) for row in reader if row["model_id"] == self.name]
+
+        self.add_stereotype_counts(stereotype_type, rows)
+
+    def add_stereotype_counts(self, stereotype_type: str, rows: list[tuple[str, int]]) -> dict[str, set[str]]:
+        """
+        Add (stereotype, count) rows belonging to the current model instance to its stereotype counts.
+        Tracks invalid stereotypes in separate dictionaries for class and relation stereotypes.
+
+        :return: The invalid stereotypes of the rows: normalized name -> raw spellings found.
+        """
+
+        # Choose the appropriate stereotypes counts and invalid stereotypes dictionary
         if stereotype_type == 'class':
-            stereotype_dict = self.class_stereotypes
-            normalization_map = self.normalized_class_stereotypes
+            counts = self.class_stereotypes.counts
             invalid_dict = self.invalid_class_stereotypes
         elif stereotype_type == 'relation':
-            stereotype_dict = self.relation_stereotypes
-            normalization_map = self.normalized_relation_stereotypes
+            counts = self.relation_stereotypes.counts
             invalid_dict = self.invalid_relation_stereotypes
         else:
             raise ValueError("Invalid stereotype_type. Must be 'class' or 'relation'.")
+        other_index = get_stereotype_vocabulary(stereotype_type).indexes["other"]
+        invalid_stereotypes = {}
 
-        # Read the CSV file containing stereotypes and counts
-        with open(input_csv_path, mode='r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                model_id = row["model_id"]
-                stereotype = row["stereotype"]
-                count = int(row["count"])
-
-                # Process the row only if the model_id matches the current instance's name
-                if model_id == self.name:
-                    # Normalize the stereotype from the CSV
-                    normalized_stereotype = (
-                        stereotype.strip()
-                        .lower()
-                        .replace("-", "")
-                        .replace("_", "")
-                        .replace(" ", "")
-                    )
-
-                    # Check if the normalized stereotype is valid
-                    if normalized_stereotype in normalization_map:
-                        # Use the normalization map to find the corresponding original stereotype
-                        original_stereotype = normalization_map[normalized_stereotype]
-                        stereotype_dict[original_stereotype] += count
-                    else:
-                        # Add or update the count for invalid stereotypes in the appropriate dictionary
-                        if normalized_stereotype in invalid_dict:
-                            invalid_dict[normalized_stereotype] += count
-                        else:
-                            # Add to list of invalid and also to 'other' count.
-                            invalid_dict[normalized_stereotype] = count
-                            stereotype_dict["other"] += count
+        for stereotype, count in rows:
+            # Resolve the stereotype from the CSV to its column (None if invalid) and normalized name
+            index, normalized_stereotype = STEREOTYPE_NORMALIZER.resolve(stereotype_type, stereotype)
+
+            if index is not None:
+                counts[index] += count
+            else:
+                invalid_stereotypes.setdefault(normalized_stereotype, set()).add(stereotype)
+
+                # Add or update the count for invalid stereotypes in the appropriate dictionary
+                if normalized_stereotype in invalid_dict:
+                    invalid_dict[normalized_stereotype] += count
+                else:
+                    # Add to list of invalid and also to 'other' count.
+                    invalid_dict[normalized_stereotype] = count
+                    counts[other_index] += count
+
+        return invalid_stereotypes
 
     def calculate_none(self) -> None:
         """
@@ -163,3 +271,18 @@ class ModelData:
 
         # Add the ratios to the statistics
         self.statistics.update(ratios)
+
+
+def index_stereotypes_csv(input_csv_path: str) -> dict[str, list[tuple[str, int]]]:
+    """
+    Read a consolidated stereotypes CSV (model_id, stereotype, count) once and group its rows by model_id.
+    The original row order is preserved inside each model's list.
+    """
+    index = defaultdict(list)
+
+    with open(input_csv_path, mode='r', newline='') as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            index[row["model_id"]].append((row["stereotype"], int(row["count"])))
+
+    return index
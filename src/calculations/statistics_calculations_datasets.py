@@ -1,49 +1,38 @@
 import numpy as np
-import pandas as pd
-from loguru import logger
-from scipy.stats import skew, kurtosis
+
+from src.calculations.statistics_kernel import calculate_column_statistics
 
 
 def calculate_stats(data):
+    # All statistics come from a single sort and moments pass (population variance and biased skewness and kurtosis)
+    column_statistics = calculate_column_statistics(np.asarray(data), ddof=0, bias=True)
+    statistic = {name: values[0] for name, values in column_statistics.items()}
+
     stats = {}
-    stats['max'] = np.max(data)
-    stats['min'] = np.min(data)
+    stats['max'] = statistic['max']
+    stats['min'] = statistic['min']
 
     # Handling for non-zero values
-    non_zero_data = data[data > 0]
-    if len(non_zero_data) > 0:
-        stats['min_non_zero'] = np.min(non_zero_data)
-        stats['range_non_zero'] = stats['max'] - stats['min_non_zero']
+    if not np.isnan(statistic['min_non_zero']):
+        stats['min_non_zero'] = statistic['min_non_zero'].astype(statistic['min'].dtype)
     else:
         # If there are no non-zero values, handle gracefully
         stats['min_non_zero'] = 0
-        stats['range_non_zero'] = 0
+    stats['range_non_zero'] = stats['max'] - stats['min_non_zero']
 
     stats['range'] = stats['max'] - stats['min']
-    stats['range_non_zero'] = stats['max'] - stats['min_non_zero']
-    stats['mean'] = np.mean(data)
-    stats['mean_round'] = round(np.mean(data))
-    stats['median'] = np.median(data)
-    stats['mode'] = pd.Series(data).mode().iloc[0] if not pd.Series(data).mode().empty else np.nan
-    stats['std_dev'] = np.std(data)
-    stats['variance'] = np.var(data)
-    stats['q1'] = np.percentile(data, 25)
-    stats['q2'] = np.percentile(data, 50)  # Same as median
-    assert stats['q2'] == stats['median'], f"Q2 should be the same as median."
-    stats['q3'] = np.percentile(data, 75)
+    stats['mean'] = statistic['mean']
+    stats['mean_round'] = round(statistic['mean'])
+    stats['median'] = statistic['median']
+    stats['mode'] = statistic['mode']
+    stats['std_dev'] = statistic['std']
+    stats['variance'] = statistic['variance']
+    stats['q1'] = statistic['q1']
+    stats['q2'] = statistic['median']  # Same as median
+    stats['q3'] = statistic['q3']
     stats['iqr'] = stats['q3'] - stats['q1']
-
-    try:
-        stats['skewness'] = skew(data)
-    except Exception as e:
-        stats['skewness'] = np.nan
-        logger.warning(f"Skewness calculation failed: {e}")
-
-    try:
-        stats['kurtosis'] = kurtosis(data)
-    except Exception as e:
-        stats['kurtosis'] = np.nan
-        logger.warning(f"Kurtosis calculation failed: {e}")
+    stats['skewness'] = statistic['skewness']
+    stats['kurtosis'] = statistic['kurtosis']
 
     return stats
 
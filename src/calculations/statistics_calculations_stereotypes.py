@@ -1,68 +1,127 @@
-from itertools import combinations
+import math
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial, cached_property
+from typing import NamedTuple, Callable, Optional
 
 import numpy as np
 import pandas as pd
-from sklearn.metrics import mutual_info_score
-from sklearn.metrics.cluster import entropy
+
+from src.calculations.statistics_kernel import calculate_column_statistics, apply_to_column_blocks, \
+    iterate_column_blocks, concatenate_column_blocks
+
+# Number of models processed at once by the metrics that build per-model temporaries (e.g., presence matrices), so that
+# their memory use does not grow with the number of models
+ROW_CHUNK_SIZE = 65536
+
+# Default fractions of the number of stereotypes whose coverage is calculated
+COVERAGE_PERCENTAGES = [0.10, 0.20, 0.30, 0.40, 0.50, 0.60, 0.70, 0.80, 0.90, 1.00]
 
 
 # Unified function to calculate statistics for both class and relation stereotypes
-def calculate_stereotype_metrics(models, stereotype_type: str, filter_type: bool) -> dict:
+def calculate_stereotype_metrics(dataset, stereotype_type: str, filter_type: bool) -> dict:
     """
     Calculate statistics for class or relation stereotypes based on the provided type and filter.
 
-    :param models: List of models.
+    :param dataset: Dataset whose stereotype count matrix is used.
     :param stereotype_type: 'class', 'relation', or 'combined' which type of stereotype to calculate for.
     :param filter_type: boolean that, when true, remove 'other' and 'none' columns.
     :return: Dictionary of calculated statistics.
     """
-    # Step 1: Extract the data (either class_stereotypes or relation_stereotypes)
-    data = extract_stereotype_data(models, stereotype_type, filter_type)
-
-    # Step 2: Calculate frequency analysis
-    frequency_analysis_df = calculate_frequency_analysis(data)
-
-    # Step 3: Calculate rank-frequency distribution
-    rank_frequency_df = calculate_rank_frequency_distribution(data.sum(axis=0))
-
-    # Step 4: Calculate group-wise rank-frequency distribution
-    rank_groupwise_frequency_df = calculate_groupwise_rank_frequency_distribution(data)
-
-    # Step 5: Calculate diversity measures
-    diversity_measures_df = calculate_diversity_measures(data)
-
-    # Step 6: Calculate central tendency and dispersion
-    central_tendency_df = calculate_central_tendency(data)
+    # Step 1: Prepare the lazy statistics of the data (either class_stereotypes or relation_stereotypes)
+    statistics = StereotypeStatistics(partial(extract_stereotype_data, dataset, stereotype_type, filter_type))
 
-    # Step 7: Calculate coverage metrics (occurrence-wise)
-    coverage_df = calculate_coverage(data)
+    # Step 2: Calculate every metric, sharing the intermediate results
+    return {metric_name: statistics[metric_name] for metric_name in STEREOTYPE_METRICS}
 
-    # Step 8: Calculate similarity measures (Jaccard and Dice)
-    similarity_measures_df = calculate_similarity_measures(data)
 
-    # Step 9: Calculate correlation and dependency (Spearman, Mutual Information)
-    spearman_correlation_o_df = calculate_spearman_correlation(data, threshold=0.01, case='occurrence')
-    spearman_correlation_m_df = calculate_spearman_correlation(data, threshold=0.1, case='model')
-
-    mutual_info_df = calculate_mutual_information(data)
+class StereotypeStatistics(Mapping):
+    """
+    Statistics of one stereotype variant (e.g., 'class_raw'), by metric name. Each metric of STEREOTYPE_METRICS is
+    only calculated when first accessed and then kept, and the intermediate results used by several metrics (column
+    totals, group frequencies, sorted frequencies and ranks) are calculated once and shared by them. When given the
+    PairwiseStereotypeMatrices of its dataset, the pairwise metrics are sliced from them instead of being recalculated.
 
-    # Combine all statistics into a dictionary
-    statistics = {'frequency_analysis': frequency_analysis_df, 'rank_frequency_distribution': rank_frequency_df,
-                  'rank_groupwise_frequency_distribution': rank_groupwise_frequency_df,
-                  'diversity_measures': diversity_measures_df, 'central_tendency_dispersion': central_tendency_df,
-                  'coverage_metrics': coverage_df, 'similarity_measures': similarity_measures_df,
-                  'spearman_correlation_occurrence_wise': spearman_correlation_o_df,
-                  'spearman_correlation_model_wise': spearman_correlation_m_df, 'mutual_information': mutual_info_df, }
+    Only the data loader, the pairwise matrices and the calculated metrics are pickled; the data and intermediate
+    results are recreated when needed.
+    """
 
-    return statistics
+    # Attributes recreated from the data loader when needed, instead of being pickled
+    _DERIVED_ATTRIBUTES = ('data', 'total_frequency', 'group_frequency', 'occurrence_ranking', 'groupwise_ranking',
+                           'spearman_engine')
+
+    def __init__(self, data_loader: Callable[[], pd.DataFrame], results: dict[str, object] = None,
+                 pairwise: "PairwiseStereotypeMatrices" = None, columns: np.ndarray = None) -> None:
+        """
+        :param data_loader: Function returning the DataFrame of stereotype counts of the variant.
+        :param results: Metrics already calculated (e.g., by worker processes), by metric name.
+        :param pairwise: Pairwise matrices of all the stereotypes of the dataset, shared with its other variants.
+        :param columns: Positions of the variant's stereotypes in the pairwise matrices (see get_variant_columns).
+        """
+        self._data_loader = data_loader
+        self._results: dict[str, object] = dict(results or {})
+        self._pairwise = pairwise
+        self._columns = columns
+
+    def __getitem__(self, metric_name: str) -> object:
+        if metric_name not in self._results:
+            if metric_name not in STEREOTYPE_METRICS:
+                raise KeyError(metric_name)
+            self._results[metric_name] = STEREOTYPE_METRICS[metric_name](self)
+        return self._results[metric_name]
+
+    def __iter__(self):
+        return iter(STEREOTYPE_METRICS)
+
+    def __len__(self) -> int:
+        return len(STEREOTYPE_METRICS)
+
+    def __getstate__(self) -> dict:
+        return {name: value for name, value in self.__dict__.items() if name not in self._DERIVED_ATTRIBUTES}
+
+    def is_calculated(self, metric_name: str) -> bool:
+        return metric_name in self._results
+
+    def get_pairwise_matrix(self, matrix_name: str) -> Optional[np.ndarray]:
+        """Pairwise matrix of the variant's stereotypes, sliced from the shared matrices (None if there are none)."""
+        if self._pairwise is None:
+            return None
+        return self._pairwise.get_matrix(matrix_name, self._columns)
+
+    @cached_property
+    def data(self) -> pd.DataFrame:
+        return self._data_loader()
+
+    @cached_property
+    def total_frequency(self) -> pd.Series:
+        return self.data.sum(axis=0)
+
+    @cached_property
+    def group_frequency(self) -> pd.Series:
+        return (self.data != 0).sum(axis=0)
+
+    @cached_property
+    def occurrence_ranking(self) -> "RankedFrequencies":
+        return rank_frequencies(self.total_frequency)
+
+    @cached_property
+    def groupwise_ranking(self) -> "RankedFrequencies":
+        return rank_frequencies(self.group_frequency)
+
+    @cached_property
+    def spearman_engine(self) -> "SpearmanCorrelationEngine":
+        if self._pairwise is None:
+            return SpearmanCorrelationEngine(self.data)
+        return SpearmanCorrelationEngine(self.data, lambda case: self.get_pairwise_matrix(f"spearman_{case}"))
 
 
 # Function to calculate frequency analysis
-def calculate_frequency_analysis(data: pd.DataFrame) -> pd.DataFrame:
+def calculate_frequency_analysis(data: pd.DataFrame, total_frequency: pd.Series = None,
+                                 group_frequency: pd.Series = None) -> pd.DataFrame:
     group_num = len(data)
-    total_frequency = data.sum(axis=0)
+    total_frequency = data.sum(axis=0) if total_frequency is None else total_frequency
     total_frequency_per_group = total_frequency / group_num
-    group_frequency = (data != 0).sum(axis=0)
+    group_frequency = (data != 0).sum(axis=0) if group_frequency is None else group_frequency
     ubiquity_index = group_frequency / group_num
     global_relative_frequency_occurrence = total_frequency / total_frequency.sum()
 
@@ -82,239 +141,611 @@ def calculate_frequency_analysis(data: pd.DataFrame) -> pd.DataFrame:
 
 
 # Function to calculate rank-frequency distribution
-def calculate_rank_frequency_distribution(data: pd.Series) -> pd.DataFrame:
-    total_frequency_sorted = data.sort_values(ascending=False)
-    total_occurrences = total_frequency_sorted.sum()
+def calculate_rank_frequency_distribution(data: pd.Series, ranking: "RankedFrequencies" = None) -> pd.DataFrame:
+    ranking = rank_frequencies(data) if ranking is None else ranking
+    cumulative_frequencies = ranking.cumulative_frequencies[1:]
 
     rank_frequency_df = pd.DataFrame(
-        {'Stereotype': total_frequency_sorted.index, 'Frequency': total_frequency_sorted.values,
-         'Rank': range(1, len(total_frequency_sorted) + 1), 'Cumulative Frequency': total_frequency_sorted.cumsum(),
-         'Cumulative Percentage': (total_frequency_sorted.cumsum() / total_occurrences) * 100})
+        {'Stereotype': ranking.stereotypes, 'Frequency': ranking.frequencies,
+         'Rank': range(1, len(ranking.frequencies) + 1), 'Cumulative Frequency': cumulative_frequencies,
+         'Cumulative Percentage': (cumulative_frequencies / ranking.total) * 100},
+        index=ranking.stereotypes)
 
     return rank_frequency_df
 
 
 # Function to calculate group-wise rank-frequency distribution
-def calculate_groupwise_rank_frequency_distribution(data: pd.DataFrame) -> pd.DataFrame:
-    group_frequency = (data != 0).sum(axis=0)
-    group_frequency_sorted = group_frequency.sort_values(ascending=False)
-    total_group_occurrences = group_frequency_sorted.sum()
+def calculate_groupwise_rank_frequency_distribution(data: pd.DataFrame,
+                                                    ranking: "RankedFrequencies" = None) -> pd.DataFrame:
+    ranking = rank_frequencies((data != 0).sum(axis=0)) if ranking is None else ranking
+    cumulative_frequencies = ranking.cumulative_frequencies[1:]
 
     rank_groupwise_frequency_df = pd.DataFrame(
-        {'Stereotype': group_frequency_sorted.index, 'Group-wise Frequency': group_frequency_sorted.values,
-         'Group-wise Rank': range(1, len(group_frequency_sorted) + 1),
-         'Cumulative Group-wise Frequency': group_frequency_sorted.cumsum(),
-         'Group-wise Cumulative Percentage': (group_frequency_sorted.cumsum() / total_group_occurrences) * 100})
+        {'Stereotype': ranking.stereotypes, 'Group-wise Frequency': ranking.frequencies,
+         'Group-wise Rank': range(1, len(ranking.frequencies) + 1),
+         'Cumulative Group-wise Frequency': cumulative_frequencies,
+         'Group-wise Cumulative Percentage': (cumulative_frequencies / ranking.total) * 100},
+        index=ranking.stereotypes)
 
     return rank_groupwise_frequency_df
 
 
+class RankedFrequencies(NamedTuple):
+    """
+    Stereotypes sorted by decreasing frequency with the prefix sums of their frequencies, from which the coverage of
+    the top k stereotypes is a single lookup.
+    """
+    stereotypes: pd.Index
+    frequencies: np.ndarray
+    # Sum of the k largest frequencies at position k (starting with 0 for k = 0)
+    cumulative_frequencies: np.ndarray
+    total: np.number
+
+    def calculate_coverage(self, top_k) -> np.ndarray:
+        """Fraction of the total frequency covered by the top k stereotypes, for each given k."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.cumulative_frequencies[np.asarray(top_k)] / self.total
+
+    def find_top_k(self, coverage) -> np.ndarray:
+        """Smallest number of top stereotypes that reaches each given coverage (fraction of the total frequency)."""
+        return np.searchsorted(self.cumulative_frequencies, np.asarray(coverage) * self.total, side='left')
+
+
+def rank_frequencies(frequencies: pd.Series) -> RankedFrequencies:
+    """Sort the frequencies of the stereotypes once, in decreasing order, and calculate their prefix sums."""
+    frequencies_sorted = frequencies.sort_values(ascending=False)
+    values = frequencies_sorted.to_numpy()
+    cumulative_frequencies = np.concatenate(([0], np.cumsum(values)))
+    return RankedFrequencies(frequencies_sorted.index, values, cumulative_frequencies, cumulative_frequencies[-1])
+
+
 # Function to calculate diversity measures (Shannon, Gini, Simpson)
-def calculate_diversity_measures(data: pd.DataFrame) -> pd.DataFrame:
-    shannon_entropy = data.apply(
-        lambda x: max(0, -np.sum((x / x.sum()) * np.log2(x / x.sum() + 1e-9)) if x.sum() > 0 else 0))
-    gini_coefficient = data.apply(
-        lambda x: (2.0 * np.sum(np.arange(1, len(x) + 1) * np.sort(x)) - (len(x) + 1) * x.sum()) / (
-                len(x) * x.sum()) if x.sum() != 0 else 0)
-    simpson_index = data.apply(lambda x: np.sum((x / x.sum()) ** 2) if x.sum() > 0 else 0)
-
-    diversity_measures_df = pd.DataFrame({'Stereotype': data.columns, 'Shannon Entropy': shannon_entropy.values,
-                                          'Gini Coefficient': gini_coefficient.values,
-                                          'Simpson Index': simpson_index.values})
+def calculate_diversity_measures(data: pd.DataFrame, weights: np.ndarray = None) -> pd.DataFrame:
+    """
+    Calculate the Shannon entropy, Gini coefficient and Simpson index of the distribution of each stereotype over the
+    models, all together in one vectorized pass per block of columns of the count matrix.
+
+    :param data: DataFrame of stereotype counts (models x stereotypes).
+    :param weights: Optional weight of each model, multiplying its counts (e.g., to weight models by relevance).
+    :return: DataFrame with one row per stereotype.
+    """
+    shannon_entropy, gini_coefficient, simpson_index = _calculate_diversity_indices(data.to_numpy(), weights)
+
+    diversity_measures_df = pd.DataFrame({'Stereotype': data.columns, 'Shannon Entropy': shannon_entropy,
+                                          'Gini Coefficient': gini_coefficient, 'Simpson Index': simpson_index})
 
     return diversity_measures_df
 
 
+def calculate_sliced_diversity_measures(storage, stereotypes: list[str], slices_rows: list[np.ndarray],
+                                        columns=slice(None), weights: np.ndarray = None) -> list[pd.DataFrame]:
+    """
+    Calculate the diversity measures of several slices of the same storage at once (e.g., year ranges or size bands).
+    Each block of columns of the storage's count matrix is read once (e.g., from its memory-mapped file) and the
+    indices of every slice are calculated from it, instead of selecting the columns again for each slice.
+
+    :param storage: DatasetStorage whose count matrix holds the models of all the slices.
+    :param stereotypes: Names of the selected columns.
+    :param slices_rows: Ascending rows of the storage of each slice (e.g., the rows of datasets sliced from it).
+    :param columns: Columns of the count matrix (a slice or positions), e.g., those of a variant.
+    :param weights: Optional weight of each model of the storage, multiplying its counts.
+    :return: DataFrame of diversity measures of each slice, in the order of slices_rows.
+    """
+    positions = np.arange(storage.stereotype_counts.shape[1])[columns]
+    slices_blocks_indices = [[] for _ in slices_rows]
+
+    for block in iterate_column_blocks(storage.num_models, len(positions)):
+        block_values = select_counts(storage.stereotype_counts, None, positions[block])
+        for blocks_indices, rows in zip(slices_blocks_indices, slices_rows):
+            blocks_indices.append(_calculate_diversity_indices(
+                block_values[rows], None if weights is None else np.asarray(weights)[rows]))
+
+    slices_measures = []
+    for blocks_indices in slices_blocks_indices:
+        shannon_entropy, gini_coefficient, simpson_index = concatenate_column_blocks(blocks_indices)
+        slices_measures.append(pd.DataFrame({'Stereotype': stereotypes, 'Shannon Entropy': shannon_entropy,
+                                             'Gini Coefficient': gini_coefficient, 'Simpson Index': simpson_index}))
+
+    return slices_measures
+
+
+def _calculate_diversity_indices(values: np.ndarray, weights: np.ndarray = None) -> tuple[np.ndarray, np.ndarray,
+                                                                                            np.ndarray]:
+    """
+    Shannon entropy, Gini coefficient and Simpson index of every column of a count matrix, processed in blocks of
+    columns (see apply_to_column_blocks).
+    """
+    return apply_to_column_blocks(_calculate_block_diversity_indices, values, weights)
+
+
+def _calculate_block_diversity_indices(values: np.ndarray, weights: np.ndarray = None) -> tuple[
+        np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Indices of _calculate_diversity_indices for every column of a block. Columns are normalized and sorted once, and
+    every index is a reduction along the rows, so columns without occurrences get 0 for all of them.
+    """
+    # Column-major, so that the reductions along the rows are over contiguous memory
+    if weights is not None:
+        values = values * np.asarray(weights)[:, np.newaxis]
+    values = np.asfortranarray(values)
+    num_rows = len(values)
+
+    totals = values.sum(axis=0)
+    has_occurrences = totals > 0
+
+    # Proportion of each column's total in each model (columns without occurrences are left as zeros)
+    proportions = np.zeros(values.shape, order='F')
+    np.divide(values, totals, out=proportions, where=has_occurrences)
+
+    shannon_entropy = -np.sum(proportions * np.log2(proportions + 1e-9), axis=0)
+    shannon_entropy = np.where(has_occurrences & (shannon_entropy > 0), shannon_entropy, 0.0)
+
+    simpson_index = np.where(has_occurrences, np.sum(proportions ** 2, axis=0), 0.0)
+
+    # Gini coefficient from the rank-weighted sum of each sorted column
+    ranks = np.arange(1, num_rows + 1)
+    ranked_totals = (ranks[:, np.newaxis] * np.sort(values, axis=0)).sum(axis=0)
+    gini_denominators = np.where(totals != 0, num_rows * totals, 1)
+    gini_coefficient = np.where(totals != 0, (2.0 * ranked_totals - (num_rows + 1) * totals) / gini_denominators, 0.0)
+
+    return shannon_entropy, gini_coefficient, simpson_index
+
+
 # Function to calculate central tendency and dispersion measures with additional metrics
 def calculate_central_tendency(data: pd.DataFrame) -> pd.DataFrame:
-    mean = data.mean(axis=0)
-    median = data.median(axis=0)
-    mode = data.mode(axis=0).iloc[0] if not data.mode(axis=0).empty else np.nan
-    std = data.std(axis=0)
-    variance = data.var(axis=0)
-    skewness = data.skew(axis=0)
-    kurtosis = data.kurt(axis=0)
-    q1 = data.quantile(0.25, axis=0)
-    q3 = data.quantile(0.75, axis=0)
-    iqr = q3 - q1
-    max_value = data.max(axis=0)
-    min_value = data.min(axis=0)
-    range_value = max_value - min_value
-
-    # Handling non-zero values
-    non_zero_data = data.apply(lambda x: x[x > 0], axis=0)
-    min_non_zero = non_zero_data.min(axis=0)
-    range_non_zero = max_value - min_non_zero
-    total = data.sum(axis=0)
+    statistics = calculate_column_statistics(data.to_numpy())
+
+    # As with DataFrame.mode, modes are only kept as integers when no column has several modes
+    mode = statistics['mode'] if (statistics['mode_count'] == 1).all() else statistics['mode'].astype(np.float64)
+    range_value = statistics['max'] - statistics['min']
+    range_non_zero = statistics['max'] - statistics['min_non_zero']
 
     central_tendency_df = pd.DataFrame(
-        {'Stereotype': data.columns, 'Total': total.values, 'Mean': mean.values, 'Median': median.values,
-         'Mode': mode.values, 'Standard Deviation': std.values, 'Variance': variance.values,
-         'Skewness': skewness.values, 'Kurtosis': kurtosis.values, 'Q1': q1.values, 'Q3': q3.values, 'IQR': iqr.values,
-         'Min': min_value.values, 'Max': max_value.values, 'Range': range_value.values,
-         'Min Non-Zero': min_non_zero.values, 'Range Non-Zero': range_non_zero.values})
+        {'Stereotype': data.columns, 'Total': statistics['total'], 'Mean': statistics['mean'],
+         'Median': statistics['median'], 'Mode': mode, 'Standard Deviation': statistics['std'],
+         'Variance': statistics['variance'], 'Skewness': statistics['skewness'], 'Kurtosis': statistics['kurtosis'],
+         'Q1': statistics['q1'], 'Q3': statistics['q3'], 'IQR': statistics['q3'] - statistics['q1'],
+         'Min': statistics['min'], 'Max': statistics['max'], 'Range': range_value,
+         'Min Non-Zero': statistics['min_non_zero'], 'Range Non-Zero': range_non_zero})
 
     return central_tendency_df
 
 
 # Function to calculate coverage metrics (occurrence-wise and group-wise)
-# Merged function to calculate both occurrence-wise and group-wise coverage metrics
-def calculate_coverage(data: pd.DataFrame) -> pd.DataFrame:
-    # Occurrence-wise data
-    total_occurrences = data.sum(axis=0).sum()
-
-    # Group-wise data
-    group_frequency = (data != 0).sum(axis=0)
-    total_groupwise_occurrences = group_frequency.sum()
-
-    # Define percentages to calculate
-    percentages = [0.10, 0.20, 0.30, 0.40, 0.50, 0.60, 0.70, 0.80, 0.90, 1.00]
-
-    # List to store coverage results
-    combined_coverage_list = []
-
-    for pct in percentages:
-        # Occurrence-wise top k stereotypes
-        top_k_occurrence = data.sum(axis=0).nlargest(int(len(data.columns) * pct))
-        coverage_occurrence = top_k_occurrence.sum() / total_occurrences
+def calculate_coverage(data: pd.DataFrame, percentages=COVERAGE_PERCENTAGES,
+                       occurrence_ranking: RankedFrequencies = None,
+                       groupwise_ranking: RankedFrequencies = None) -> pd.DataFrame:
+    """
+    Calculate the occurrence-wise and group-wise coverage of the top k stereotypes, with k being each percentage of the
+    number of stereotypes. Frequencies are sorted once, so the cost does not grow with the number of percentages.
 
-        # Group-wise top k stereotypes
-        top_k_groupwise = group_frequency.nlargest(int(len(group_frequency) * pct))
-        coverage_groupwise = top_k_groupwise.sum() / total_groupwise_occurrences
+    :param data: DataFrame of stereotype counts.
+    :param percentages: Fractions of the number of stereotypes to calculate the coverage for (e.g., 0.1 for the top
+                        10%), in any number and order.
+    :param occurrence_ranking: Ranked total frequencies of the data, if already calculated.
+    :param groupwise_ranking: Ranked group frequencies of the data, if already calculated.
+    :return: DataFrame with one row per percentage.
+    """
+    if occurrence_ranking is None:
+        occurrence_ranking = rank_frequencies(data.sum(axis=0))
+    if groupwise_ranking is None:
+        groupwise_ranking = rank_frequencies((data != 0).sum(axis=0))
 
-        # Append combined result for each percentage
-        combined_coverage_list.append(
-            {'Percentage': pct * 100, 'Top k Stereotypes (Occurrence-wise)': len(top_k_occurrence),
-             'Coverage (Occurrence-wise)': coverage_occurrence, 'Top k Stereotypes (Group-wise)': len(top_k_groupwise),
-             'Coverage (Group-wise)': coverage_groupwise})
+    percentages = np.asarray(percentages, dtype=np.float64)
+    # Percentages above 100% (or below 0%) cover all (or none) of the stereotypes
+    top_k = np.clip((len(data.columns) * percentages).astype(int), 0, len(data.columns))
 
-    # Convert the list to a DataFrame
-    combined_coverage_df = pd.DataFrame(combined_coverage_list)
+    combined_coverage_df = pd.DataFrame(
+        {'Percentage': percentages * 100, 'Top k Stereotypes (Occurrence-wise)': top_k,
+         'Coverage (Occurrence-wise)': occurrence_ranking.calculate_coverage(top_k),
+         'Top k Stereotypes (Group-wise)': top_k,
+         'Coverage (Group-wise)': groupwise_ranking.calculate_coverage(top_k)})
 
     return combined_coverage_df
 
 
 # Function to calculate similarity measures (Jaccard and Dice)
-def calculate_similarity_measures(data: pd.DataFrame) -> pd.DataFrame:
-    jaccard_similarity = {}
-    dice_similarity = {}
+def calculate_similarity_measures(data: pd.DataFrame, intersections: np.ndarray = None) -> pd.DataFrame:
+    """
+    Calculate the Jaccard similarity and Dice coefficient of every pair of stereotypes, based on the models in which
+    they are present. All pairwise intersections are obtained with a single product of the boolean presence matrix with
+    its transpose, and the unions and Dice denominators from its diagonal.
 
+    :param data: DataFrame of stereotype counts.
+    :param intersections: Presence intersections of the stereotypes of data, if already calculated.
+    :return: DataFrame with one row per pair of stereotypes.
+    """
     stereotypes = data.columns
+    if intersections is None:
+        intersections = calculate_presence_intersections(data.to_numpy())
+    models_per_stereotype = np.diag(intersections)
 
-    for (stereotype1, stereotype2) in combinations(stereotypes, 2):
-        set1 = set(data[data[stereotype1] > 0].index)
-        set2 = set(data[data[stereotype2] > 0].index)
+    # Pairs in the same order as combinations(stereotypes, 2)
+    first, second = np.triu_indices(len(stereotypes), k=1)
+    intersection = intersections[first, second]
+    sizes_sum = models_per_stereotype[first] + models_per_stereotype[second]
+    union = sizes_sum - intersection
 
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
-
-        jaccard_similarity[(stereotype1, stereotype2)] = intersection / union if union != 0 else 0
-        dice_similarity[(stereotype1, stereotype2)] = (2 * intersection) / (len(set1) + len(set2)) if (len(set1) + len(
-            set2)) != 0 else 0
+    jaccard_similarity = np.divide(intersection, union, out=np.zeros_like(intersection), where=union != 0)
+    dice_similarity = np.divide(2 * intersection, sizes_sum, out=np.zeros_like(intersection), where=sizes_sum != 0)
 
     similarity_measures_df = pd.DataFrame(
-        {'Stereotype Pair': list(jaccard_similarity.keys()), 'Jaccard Similarity': list(jaccard_similarity.values()),
-         'Dice Coefficient': list(dice_similarity.values())})
+        {'Stereotype Pair': [(stereotypes[i], stereotypes[j]) for i, j in zip(first, second)],
+         'Jaccard Similarity': jaccard_similarity, 'Dice Coefficient': dice_similarity})
 
     return similarity_measures_df
 
 
+def calculate_presence_intersections(values: np.ndarray) -> np.ndarray:
+    """
+    Number of models in which each pair of stereotypes (columns) is present, with the number of models of each
+    stereotype in the diagonal.
+    """
+    # Float presence matrices so the products run on BLAS; counts up to 2^53 are exact
+    intersections = np.zeros((values.shape[1], values.shape[1]))
+    for chunk_values in iterate_row_chunks(values):
+        presence = (chunk_values > 0).astype(np.float64)
+        intersections += presence.T @ presence
+
+    return intersections
+
+
 # Function to calculate Spearman Correlation with filter and log dropped elements
 def calculate_spearman_correlation(data: pd.DataFrame, threshold: float, case: str = 'occurrence') -> pd.DataFrame:
     """
     Calculate Spearman correlation with filtering based on occurrence or model-wise presence.
-    Also print the elements dropped due to the filtering threshold.
 
     :param data: DataFrame of stereotype counts.
     :param threshold: Minimum percentage of occurrences to retain (e.g., 0.1 means 10% threshold).
     :param case: 'occurrence' for occurrence-wise, 'model' for model-wise presence.
     :return: Spearman correlation DataFrame.
     """
-    if case == 'occurrence':
-        # Case (a): Filter based on total occurrences
-        total_occurrences = data.sum(axis=0)
-        threshold_value = total_occurrences.sum() * threshold  # Filtering based on percentage of total occurrences
-
-        # Determine which stereotypes will be dropped
-        total_occurrences[total_occurrences < threshold_value].index.tolist()
+    return SpearmanCorrelationEngine(data).calculate_correlation(threshold, case)
 
-        # Filter data
-        filtered_data = data.loc[:, total_occurrences >= threshold_value]
 
-    elif case == 'model':
-        # Case (b): Convert raw counts to binary (presence/absence) for model-wise correlation
-        presence_absence_data = (data > 0).astype(int)
-
-        # Count the number of models each stereotype appears in
-        model_occurrences = presence_absence_data.sum(axis=0)
+class SpearmanCorrelationEngine:
+    """
+    Spearman correlations of the stereotypes of a count matrix, for any filtering threshold. The count matrix (case
+    'occurrence') or its presence matrix (case 'model') is ranked only once, with average ranks for ties, and the
+    correlations of all stereotype pairs come from a single product of the centered ranks. As each stereotype's ranks do
+    not depend on the other stereotypes, filtering by a threshold only selects a subset of the rows and columns of this
+    matrix, so sweeping thresholds costs almost nothing.
+
+    Ranks are multiples of 0.5, so (up to about 200000 models) all sums of products are exact and the correlations are
+    equal to DataFrame.corr(method='spearman').
+    """
 
-        threshold_value = len(data) * threshold  # Filtering based on percentage of models
+    def __init__(self, data: pd.DataFrame, correlation_loader: Callable[[str], np.ndarray] = None) -> None:
+        """
+        :param data: DataFrame of stereotype counts.
+        :param correlation_loader: Function returning the correlation matrix of the stereotypes of data for a case, if
+                                   it is calculated elsewhere (e.g., sliced from PairwiseStereotypeMatrices).
+        """
+        self.stereotypes = data.columns
+        self._values = data.to_numpy()
+        self._correlation_loader = correlation_loader
+        self._correlation_matrices: dict[str, np.ndarray] = {}
+
+    def calculate_correlation(self, threshold: float, case: str = 'occurrence') -> pd.DataFrame:
+        """
+        Spearman correlation of the stereotypes retained by the threshold.
+
+        :param threshold: Minimum percentage of occurrences (case 'occurrence') or of models (case 'model') to retain.
+        :param case: 'occurrence' for occurrence-wise, 'model' for model-wise presence.
+        :return: Spearman correlation DataFrame.
+        """
+        if case == 'occurrence':
+            # Case (a): Filter based on total occurrences
+            total_occurrences = self._values.sum(axis=0, dtype=np.int64)
+            threshold_value = int(total_occurrences.sum()) * threshold
+            retained = total_occurrences >= threshold_value
+
+        elif case == 'model':
+            # Case (b): Filter based on the number of models each stereotype appears in
+            model_occurrences = np.count_nonzero(self._values > 0, axis=0)
+            threshold_value = len(self._values) * threshold
+            retained = model_occurrences >= threshold_value
+
+        else:
+            raise ValueError(f"Case argument '{case}' not identified. "
+                             f"Options are 'occurrence' for occurrence-wise, or 'model' for model-wise presence.")
+
+        columns = np.flatnonzero(retained)
+        correlation_matrix = self._get_correlation_matrix(case)[np.ix_(columns, columns)]
+
+        stereotypes = self.stereotypes[columns]
+        spearman_correlation = pd.DataFrame(correlation_matrix, index=pd.Index(stereotypes, name='Stereotype'),
+                                            columns=stereotypes)
+        spearman_correlation.reset_index(inplace=True)
+
+        return spearman_correlation
+
+    def sweep_thresholds(self, thresholds: list[float], case: str = 'occurrence') -> dict[float, pd.DataFrame]:
+        """Spearman correlation DataFrames for each of the given thresholds, reusing the same ranks and products."""
+        return {threshold: self.calculate_correlation(threshold, case) for threshold in thresholds}
+
+    def _get_correlation_matrix(self, case: str) -> np.ndarray:
+        """Correlations of all stereotype pairs (NaN for constant stereotypes), calculated when a case is first used."""
+        if case not in self._correlation_matrices:
+            if self._correlation_loader is not None:
+                self._correlation_matrices[case] = self._correlation_loader(case)
+            else:
+                self._correlation_matrices[case] = calculate_spearman_matrix(self._values, case)
+
+        return self._correlation_matrices[case]
+
+
+def calculate_spearman_matrix(values: np.ndarray, case: str = 'occurrence') -> np.ndarray:
+    """
+    Spearman correlations of all pairs of columns of a count matrix (case 'occurrence') or of its presence matrix (case
+    'model'), NaN for constant columns.
+    """
+    values = values if case == 'occurrence' else (values > 0)
+    centered_ranks = _rank_columns(values) - (len(values) + 1) / 2
 
-        # Determine which stereotypes will be dropped
-        model_occurrences[model_occurrences < threshold_value].index.tolist()
+    products = centered_ranks.T @ centered_ranks
+    squares = np.diag(products)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        divisors = np.sqrt(np.multiply.outer(squares, squares))
+        return np.where(divisors != 0, products / divisors, np.nan)
 
-        # Filter data
-        filtered_data = presence_absence_data.loc[:, model_occurrences >= threshold_value]
 
-    else:
-        raise ValueError(f"Case argument '{case}' not identified. "
-                         f"Options are 'occurrence' for occurrence-wise, or 'model' for model-wise presence.")
+def _rank_columns(values: np.ndarray) -> np.ndarray:
+    """Rank each column from 1, giving tied values the average of their ranks (as pandas' rank method 'average')."""
+    ranks = np.empty(values.shape, dtype=np.float64, order='F')
 
-    # Calculate Spearman correlation on the filtered data
-    spearman_correlation = filtered_data.corr(method='spearman')
-    spearman_correlation.index.name = 'Stereotype'
-    spearman_correlation.reset_index(inplace=True)
+    for column in range(values.shape[1]):
+        _, inverse, counts = np.unique(values[:, column], return_inverse=True, return_counts=True)
+        # Ranks before each distinct value plus the average of the ranks of its occurrences
+        average_ranks = (np.cumsum(counts) - counts) + (counts + 1) / 2
+        ranks[:, column] = average_ranks[inverse]
 
-    return spearman_correlation
+    return ranks
 
 
 # Function to calculate Mutual Information
-def calculate_mutual_information(data: pd.DataFrame) -> pd.DataFrame:
-    stereotypes = data.columns
-    mutual_info = pd.DataFrame(index=stereotypes, columns=stereotypes, dtype=float)
-
-    for stereotype1, stereotype2 in combinations(stereotypes, 2):
-        mi = mutual_info_score(data[stereotype1], data[stereotype2])
-        mutual_info.loc[stereotype1, stereotype2] = mi
-        mutual_info.loc[stereotype2, stereotype1] = mi
+def calculate_mutual_information(data: pd.DataFrame, num_workers: int = 1,
+                                 mutual_info_matrix: np.ndarray = None) -> pd.DataFrame:
+    """
+    Calculate the mutual information of every pair of stereotypes, with each stereotype's entropy in the diagonal.
+    Values are the same as sklearn's mutual_info_score and entropy, but each column is discretized only once and all the
+    joint histograms of a stereotype with the following ones are built with a single bincount.
 
-    for stereotype in stereotypes:
-        entropy_value = entropy(data[stereotype])
-        mutual_info.loc[stereotype, stereotype] = entropy_value
+    :param data: DataFrame of stereotype counts.
+    :param num_workers: Number of worker processes used to compute the rows of the matrix (for very wide datasets).
+    :param mutual_info_matrix: Mutual information matrix of the stereotypes of data, if already calculated.
+    :return: Mutual information DataFrame.
+    """
+    stereotypes = data.columns
+    if mutual_info_matrix is None:
+        mutual_info_matrix = calculate_mutual_information_matrix(data.to_numpy(), num_workers)
 
+    mutual_info = pd.DataFrame(mutual_info_matrix, index=stereotypes, columns=stereotypes)
     mutual_info.index.name = 'Stereotype'
     mutual_info.reset_index(inplace=True)
 
     return mutual_info
 
 
+def calculate_mutual_information_matrix(values: np.ndarray, num_workers: int = 1) -> np.ndarray:
+    """Mutual information of all pairs of columns of a count matrix, with each column's entropy in the diagonal."""
+    num_stereotypes = values.shape[1]
+
+    # Step 1: Discretize each stereotype's counts into consecutive integer codes
+    codes, cardinalities = _discretize_columns(values)
+
+    # Step 2: Compute the upper triangle row by row, optionally in parallel
+    if num_workers > 1 and num_stereotypes > 2:
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_set_mutual_information_codes,
+                                 initargs=(codes, cardinalities)) as executor:
+            rows = list(executor.map(_calculate_mutual_information_row, range(num_stereotypes)))
+    else:
+        rows = [_calculate_mutual_information_row(index, codes, cardinalities) for index in range(num_stereotypes)]
+
+    mutual_info_matrix = np.empty((num_stereotypes, num_stereotypes), dtype=float)
+    for index, (entropy_value, row_values) in enumerate(rows):
+        mutual_info_matrix[index, index] = entropy_value
+        mutual_info_matrix[index, index + 1:] = row_values
+        mutual_info_matrix[index + 1:, index] = row_values
+
+    return mutual_info_matrix
+
+
+def _discretize_columns(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Map each column's values to codes 0..k-1 in sorted value order, returning the codes and each column's k."""
+    codes = np.empty(values.shape, dtype=np.int32, order='F')
+    cardinalities = np.empty(values.shape[1], dtype=np.int64)
+    for column in range(values.shape[1]):
+        uniques, codes[:, column] = np.unique(values[:, column], return_inverse=True)
+        cardinalities[column] = len(uniques)
+    return codes, cardinalities
+
+
+# Codes shared with the mutual information workers, set once per process by the pool initializer
+_mutual_information_codes = None
+
+
+def _set_mutual_information_codes(codes: np.ndarray, cardinalities: np.ndarray) -> None:
+    global _mutual_information_codes
+    _mutual_information_codes = (codes, cardinalities)
+
+
+def _calculate_mutual_information_row(index: int, codes: np.ndarray = None,
+                                      cardinalities: np.ndarray = None) -> tuple[float, np.ndarray]:
+    """Return the entropy of stereotype index and its mutual information with each of the following stereotypes."""
+    if codes is None:
+        codes, cardinalities = _mutual_information_codes
+
+    entropy_value = _calculate_entropy(np.bincount(codes[:, index], minlength=cardinalities[index]))
+
+    # All joint histograms of this stereotype with the following ones, as consecutive blocks of one bincount
+    widths = cardinalities[index + 1:]
+    block_sizes = cardinalities[index] * widths
+    offsets = np.concatenate(([0], np.cumsum(block_sizes)))
+    joint_histograms = np.zeros(offsets[-1], dtype=np.int64)
+    for chunk_codes in iterate_row_chunks(codes):
+        joint_codes = chunk_codes[:, [index]] * widths + chunk_codes[:, index + 1:] + offsets[:-1]
+        joint_histograms += np.bincount(joint_codes.ravel(), minlength=offsets[-1])
+
+    row_values = np.empty(len(widths), dtype=float)
+    for position, width in enumerate(widths):
+        contingency = joint_histograms[offsets[position]:offsets[position + 1]].reshape(-1, width)
+        row_values[position] = _calculate_mutual_information_from_contingency(contingency)
+
+    return entropy_value, row_values
+
+
+def _calculate_mutual_information_from_contingency(contingency: np.ndarray) -> float:
+    """Mutual information of a dense contingency table, with the same operations as sklearn's mutual_info_score."""
+    nzx, nzy = np.nonzero(contingency)
+    nz_val = contingency[nzx, nzy]
+
+    contingency_sum = contingency.sum()
+    pi = contingency.sum(axis=1)
+    pj = contingency.sum(axis=0)
+
+    # A labelling with a single cluster has zero entropy, so zero mutual information
+    if pi.size == 1 or pj.size == 1:
+        return 0.0
+
+    log_contingency_nm = np.log(nz_val)
+    contingency_nm = nz_val / contingency_sum
+    outer = pi.take(nzx).astype(np.int64, copy=False) * pj.take(nzy).astype(np.int64, copy=False)
+    log_outer = -np.log(outer) + math.log(pi.sum()) + math.log(pj.sum())
+    mi = contingency_nm * (log_contingency_nm - math.log(contingency_sum)) + contingency_nm * log_outer
+    mi = np.where(np.abs(mi) < np.finfo(mi.dtype).eps, 0.0, mi)
+    return float(np.clip(mi.sum(), 0.0, None))
+
+
+def _calculate_entropy(value_counts: np.ndarray) -> float:
+    """Entropy of a labelling given its value counts, with the same operations as sklearn's entropy."""
+    if value_counts.sum() == 0:
+        return 1.0
+
+    pi = value_counts.astype(np.float64)
+    if pi.size == 1:
+        return 0.0
+
+    pi_sum = np.sum(pi)
+    return float(-np.sum((pi / pi_sum) * (np.log(pi) - math.log(pi_sum))))
+
+
+def iterate_row_chunks(values: np.ndarray, chunk_size: int = ROW_CHUNK_SIZE):
+    """Yield consecutive blocks of at most chunk_size rows of a matrix (views, also of memory-mapped matrices)."""
+    for start in range(0, max(len(values), 1), chunk_size):
+        yield values[start:start + chunk_size]
+
+
+def select_counts(counts: np.ndarray, rows: Optional[np.ndarray], columns=slice(None)) -> np.ndarray:
+    """
+    Return the given rows (all if None) and columns (a slice or positions) of a count matrix, column-major. Consecutive
+    columns of all rows are a view of the matrix (e.g., of a memory-mapped one); otherwise the selection is gathered one
+    column at a time, so no temporary larger than a column is created.
+    """
+    positions = np.arange(counts.shape[1])[columns]
+    if rows is None and len(positions) > 0 and (np.diff(positions) == 1).all():
+        return counts[:, positions[0]:positions[-1] + 1]
+
+    selected = np.empty((len(counts) if rows is None else len(rows), len(positions)), dtype=counts.dtype, order='F')
+    for index, position in enumerate(positions.tolist()):
+        column = counts[:, position]
+        selected[:, index] = column if rows is None else column[rows]
+    return selected
+
+
 # Function to extract stereotype data (works for both class and relation)
-def extract_stereotype_data(models, stereotype_type: str, filter_type: bool) -> pd.DataFrame:
-    if stereotype_type == 'class':
-        data = [model.class_stereotypes for model in models]
-        df = pd.DataFrame(data)
-    elif stereotype_type == 'relation':
-        data = [model.relation_stereotypes for model in models]
-        df = pd.DataFrame(data)
-    elif stereotype_type == 'combined':
-        data_c = [model.class_stereotypes for model in models]
-        data_r = [model.relation_stereotypes for model in models]
-
-        # Convert to DataFrames for renaming
-        df_c = pd.DataFrame(data_c)
-        df_r = pd.DataFrame(data_r)
-
-        # Rename 'other' and 'none' columns in df_c to 'other_c' and 'none_c'
-        df_c = df_c.rename(columns={'other': 'other_c', 'none': 'none_c'}, errors='ignore')
-
-        # Rename 'other' and 'none' columns in df_r to 'other_r' and 'none_r'
-        df_r = df_r.rename(columns={'other': 'other_r', 'none': 'none_r'}, errors='ignore')
-
-        # Concatenate the two dataframes along the column axis
-        df = pd.concat([df_c, df_r], axis=1)
-
-    # Remove 'other' and 'none' columns if filter_type is True
+def extract_stereotype_data(dataset, stereotype_type: str, filter_type: bool) -> pd.DataFrame:
+    # Select the variant's columns of the dataset's rows of the count matrix
+    positions, stereotypes = get_variant_stereotypes(dataset, stereotype_type, filter_type)
+    return pd.DataFrame(dataset.select_stereotype_counts(positions), columns=stereotypes)
+
+
+def build_stereotype_dataframe(counts: np.ndarray, stereotypes: list[str], rows: np.ndarray = None,
+                               columns=slice(None)) -> pd.DataFrame:
+    """Wrap the given rows (all by default) and columns of a count matrix in a DataFrame with the stereotypes' names."""
+    return pd.DataFrame(select_counts(counts, rows, columns), columns=stereotypes)
+
+
+def get_variant_stereotypes(dataset, stereotype_type: str, filter_type: bool) -> tuple[np.ndarray, list[str]]:
+    """
+    Positions in the dataset's count matrix of the columns of a stereotype variant and their names ('none' and 'other'
+    suffixed with _c and _r in the combined case), in the order of its DataFrame. Clean variants leave out the
+    FILTERED_STEREOTYPES.
+    """
+    columns, stereotypes = dataset.get_stereotype_columns(stereotype_type)
+    positions = np.arange(len(dataset.stereotype_names))[columns]
+
     if filter_type:
-        df = df.drop(columns=["other", "none", "other_c", "none_c", "other_r", "none_r"], errors='ignore')
+        kept = ~np.isin(stereotypes, FILTERED_STEREOTYPES)
+        positions, stereotypes = positions[kept], stereotypes[kept]
+
+    return positions, list(stereotypes)
+
+
+def get_variant_columns(dataset, stereotype_type: str, filter_type: bool) -> np.ndarray:
+    """Positions in the dataset's count matrix of the columns of a stereotype variant, in the order of its DataFrame."""
+    return get_variant_stereotypes(dataset, stereotype_type, filter_type)[0]
+
+
+class PairwiseStereotypeMatrices:
+    """
+    Pairwise matrices (see PAIRWISE_MATRICES) of all the stereotypes of a dataset's count matrix, shared by its
+    variants. Each entry only depends on the counts of its two stereotypes, and every variant's stereotypes are a subset
+    of the matrix columns, in the same order: 'clean' variants drop 'none' and 'other', and the 'class' and 'relation'
+    variants are the two blocks of 'combined'. So the pairwise metrics of all variants are sliced from matrices
+    calculated once, with the same values as when calculated for each variant.
+    """
 
-    return df
+    def __init__(self, counts_loader: Callable[[], np.ndarray], matrices: dict[str, np.ndarray] = None) -> None:
+        """
+        :param counts_loader: Function returning the count matrix with all the stereotypes of the dataset (models x
+                              stereotypes), only called to calculate a missing matrix.
+        :param matrices: Matrices already calculated (e.g., by worker processes), by name.
+        """
+        self._counts_loader = counts_loader
+        self._matrices: dict[str, np.ndarray] = dict(matrices or {})
+
+    def get_matrix(self, matrix_name: str, columns: np.ndarray = None) -> np.ndarray:
+        """Pairwise matrix of the given columns (all by default), calculated on its first use."""
+        if matrix_name not in self._matrices:
+            self._matrices[matrix_name] = PAIRWISE_MATRICES[matrix_name](self._counts_loader())
+
+        matrix = self._matrices[matrix_name]
+        return matrix if columns is None else matrix[np.ix_(columns, columns)]
+
+
+# Columns removed from the 'clean' variants
+FILTERED_STEREOTYPES = ["other", "none", "other_c", "none_c", "other_r", "none_r"]
+
+# Pairwise matrices shared by the variants of a dataset, by name, and the metric using each one
+PAIRWISE_MATRICES = {'presence_intersections': calculate_presence_intersections,
+                     'spearman_occurrence': partial(calculate_spearman_matrix, case='occurrence'),
+                     'spearman_model': partial(calculate_spearman_matrix, case='model'),
+                     'mutual_information': calculate_mutual_information_matrix}
+PAIRWISE_METRIC_MATRICES = {'similarity_measures': 'presence_intersections',
+                            'spearman_correlation_occurrence_wise': 'spearman_occurrence',
+                            'spearman_correlation_model_wise': 'spearman_model',
+                            'mutual_information': 'mutual_information'}
+
+# Metrics calculated for every stereotype variant, in the order they are stored and saved. Each one receives the
+# StereotypeStatistics of the variant, whose data and shared intermediate results it uses.
+STEREOTYPE_METRICS = {
+    'frequency_analysis': lambda statistics: calculate_frequency_analysis(
+        statistics.data, statistics.total_frequency, statistics.group_frequency),
+    'rank_frequency_distribution': lambda statistics: calculate_rank_frequency_distribution(
+        statistics.total_frequency, statistics.occurrence_ranking),
+    'rank_groupwise_frequency_distribution': lambda statistics: calculate_groupwise_rank_frequency_distribution(
+        statistics.data, statistics.groupwise_ranking),
+    'diversity_measures': lambda statistics: calculate_diversity_measures(statistics.data),
+    'central_tendency_dispersion': lambda statistics: calculate_central_tendency(statistics.data),
+    'coverage_metrics': lambda statistics: calculate_coverage(
+        statistics.data, occurrence_ranking=statistics.occurrence_ranking,
+        groupwise_ranking=statistics.groupwise_ranking),
+    'similarity_measures': lambda statistics: calculate_similarity_measures(
+        statistics.data, statistics.get_pairwise_matrix('presence_intersections')),
+    'spearman_correlation_occurrence_wise': lambda statistics: statistics.spearman_engine.calculate_correlation(
+        threshold=0.01, case='occurrence'),
+    'spearman_correlation_model_wise': lambda statistics: statistics.spearman_engine.calculate_correlation(
+        threshold=0.1, case='model'),
+    'mutual_information': lambda statistics: calculate_mutual_information(
+        statistics.data, mutual_info_matrix=statistics.get_pairwise_matrix('mutual_information'))}
@@ -0,0 +1,182 @@
+from typing import Callable, Iterator, Union
+
+import numpy as np
+
+# Absolute value below which pandas treats the moments of skewness and kurtosis as floating point noise
+MOMENT_ZERO_TOLERANCE = 1e-14
+
+# Number of values of a matrix processed at once by the column-wise kernels (e.g., 65,536 models x 8 columns). Columns
+# are processed in blocks of about this size, which bounds their per-value temporaries (sorted values, proportions,
+# powers of deviations) whatever the number of models, while keeping each block's reductions vectorized.
+COLUMN_BLOCK_VALUES = 2 ** 19
+
+
+def calculate_column_statistics(values: np.ndarray, ddof: int = 1, bias: bool = False) -> dict[str, np.ndarray]:
+    """
+    Calculate the central tendency and dispersion statistics of every column of a matrix (or of a 1D array, as a single
+    column). Each column is sorted once, and median, quartiles, min/max, non-zero minimum and mode are read from the
+    sorted values. Mean, variance, skewness and kurtosis come from a single pass of central moments. Columns are
+    processed in blocks (see apply_to_column_blocks).
+
+    Results are equal to the pandas reductions (ddof=1, bias=False, as in DataFrame.var/skew/kurt) or to the
+    numpy/scipy functions (ddof=0, bias=True, as in np.var and scipy.stats.skew/kurtosis) they replace.
+
+    :param values: Matrix of (non-negative) counts, models x columns.
+    :param ddof: Delta degrees of freedom of the variance and standard deviation.
+    :param bias: Whether skewness and kurtosis are the biased (population) estimates or the sample corrected ones.
+    :return: Dictionary from statistic name to an array with its value for each column. 'min_non_zero' is NaN for
+             columns without positive values, and 'mode' is the smallest of the 'mode_count' most frequent values.
+    """
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values.reshape(-1, 1)
+
+    return apply_to_column_blocks(_calculate_block_statistics, values, ddof, bias)
+
+
+def _calculate_block_statistics(values: np.ndarray, ddof: int, bias: bool) -> dict[str, np.ndarray]:
+    """Statistics of calculate_column_statistics for every column of a block, with one vectorized pass."""
+    # Column-major, so that every reduction along the rows is over contiguous memory
+    values = np.asfortranarray(values)
+    sorted_values = np.sort(values, axis=0)
+    num_rows, num_columns = sorted_values.shape
+
+    if num_rows == 0:
+        empty = np.full(num_columns, np.nan)
+        return {'total': np.zeros(num_columns, dtype=np.int64), 'mean': empty, 'median': empty, 'mode': empty,
+                'mode_count': np.zeros(num_columns, dtype=int), 'std': empty, 'variance': empty, 'skewness': empty,
+                'kurtosis': empty, 'q1': empty, 'q3': empty, 'min': empty, 'max': empty, 'min_non_zero': empty}
+
+    statistics = {'total': sorted_values.sum(axis=0, dtype=np.int64), 'min': sorted_values[0],
+                  'max': sorted_values[-1], 'median': _calculate_sorted_median(sorted_values),
+                  'q1': _calculate_sorted_quantile(sorted_values, 0.25),
+                  'q3': _calculate_sorted_quantile(sorted_values, 0.75)}
+    statistics['mode'], statistics['mode_count'] = _calculate_sorted_mode(sorted_values)
+
+    # The first positive value of each sorted column is its non-zero minimum
+    first_positive = np.minimum((sorted_values <= 0).sum(axis=0), num_rows - 1)
+    min_non_zero = sorted_values[first_positive, np.arange(num_columns)].astype(np.float64)
+    statistics['min_non_zero'] = np.where(min_non_zero > 0, min_non_zero, np.nan)
+
+    # Moments are summed in the original row order, as floating point sums depend on it
+    statistics.update(_calculate_moments(values, ddof, bias))
+
+    return statistics
+
+
+def iterate_column_blocks(num_rows: int, num_columns: int) -> Iterator[slice]:
+    """
+    Yield the slices of consecutive columns of a matrix processed together by the column-wise kernels: as many columns
+    as hold about COLUMN_BLOCK_VALUES values (at least one). A matrix without columns is a single empty block.
+    """
+    block_size = max(1, COLUMN_BLOCK_VALUES // max(num_rows, 1))
+    for start in range(0, max(num_columns, 1), block_size):
+        yield slice(start, start + block_size)
+
+
+def concatenate_column_blocks(blocks_results: list[Union[dict, tuple]]) -> Union[dict, tuple]:
+    """Concatenate the per-column results (dictionaries or tuples of arrays) of consecutive blocks of columns."""
+    if isinstance(blocks_results[0], dict):
+        return {name: np.concatenate([results[name] for results in blocks_results]) for name in blocks_results[0]}
+    return tuple(np.concatenate(arrays) for arrays in zip(*blocks_results))
+
+
+def apply_to_column_blocks(function: Callable, values: np.ndarray, *args) -> Union[dict, tuple]:
+    """
+    Apply a column-wise function (returning a dictionary or tuple of arrays with a value per column) to a matrix, one
+    block of columns at a time (see iterate_column_blocks), with the same results as applying it to the whole matrix.
+    Its temporaries are then bounded by the block size instead of by the size of the matrix (e.g., of a memory-mapped
+    matrix with more models than fit in memory).
+    """
+    return concatenate_column_blocks([function(values[:, block], *args)
+                                      for block in iterate_column_blocks(*values.shape)])
+
+
+def _calculate_sorted_median(sorted_values: np.ndarray) -> np.ndarray:
+    """Median of each sorted column, averaging the two middle values when the number of rows is even (as np.median)."""
+    num_rows = len(sorted_values)
+    middle = sorted_values[(num_rows - 1) // 2:num_rows // 2 + 1]
+    return middle.sum(axis=0, dtype=np.float64) / len(middle)
+
+
+def _calculate_sorted_quantile(sorted_values: np.ndarray, quantile: float) -> np.ndarray:
+    """Quantile of each sorted column with linear interpolation, computed as np.quantile's default method."""
+    num_rows = len(sorted_values)
+    virtual_index = (num_rows - 1) * quantile
+    previous_index = int(np.floor(virtual_index))
+    gamma = virtual_index - previous_index
+
+    below = sorted_values[previous_index]
+    above = sorted_values[min(previous_index + 1, num_rows - 1)]
+    difference = above - below
+
+    # Interpolate from the closest bound, as numpy does
+    if gamma >= 0.5:
+        return above - difference * (1 - gamma)
+    return below + difference * gamma
+
+
+def _calculate_sorted_mode(sorted_values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Smallest most frequent value of each sorted column and the number of values with that frequency."""
+    num_rows, num_columns = sorted_values.shape
+    modes = np.empty(num_columns, dtype=sorted_values.dtype)
+    mode_counts = np.empty(num_columns, dtype=int)
+
+    for column in range(num_columns):
+        column_values = sorted_values[:, column]
+
+        # Runs of equal values: their starts and lengths
+        run_starts = np.flatnonzero(np.concatenate(([True], column_values[1:] != column_values[:-1])))
+        run_lengths = np.diff(np.append(run_starts, num_rows))
+
+        longest_run = run_lengths.max()
+        modes[column] = column_values[run_starts[np.argmax(run_lengths)]]
+        mode_counts[column] = np.count_nonzero(run_lengths == longest_run)
+
+    return modes, mode_counts
+
+
+def _calculate_moments(values: np.ndarray, ddof: int, bias: bool) -> dict[str, np.ndarray]:
+    """Mean, variance, standard deviation, skewness and (excess) kurtosis of each column from its central moments."""
+    values = values.astype(np.float64)
+    count = np.float64(len(values))
+
+    # Sums of the deviations' powers, as pandas and scipy calculate them
+    mean = values.sum(axis=0) / count
+    deviations = values - mean
+    squared_deviations = deviations ** 2
+    sum_squares = squared_deviations.sum(axis=0)
+    sum_cubes = (squared_deviations * deviations).sum(axis=0)
+    sum_fourth_powers = (squared_deviations ** 2).sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = sum_squares / (count - ddof)
+        if count - ddof <= 0:
+            variance = np.full_like(mean, np.nan)
+
+        if bias:
+            # Biased estimates, as scipy.stats.skew and scipy.stats.kurtosis (NaN for constant columns)
+            moment2, moment3, moment4 = sum_squares / count, sum_cubes / count, sum_fourth_powers / count
+            constant = moment2 <= (np.finfo(np.float64).eps * mean) ** 2
+            skewness = np.where(constant, np.nan, moment3 / moment2 ** 1.5)
+            kurtosis = np.where(constant, np.nan, moment4 / moment2 ** 2.0) - 3
+        else:
+            # Sample corrected estimates, as pandas (0 for constant columns, NaN for too few rows)
+            skew_squares, skew_cubes = _zero_out_noise(sum_squares), _zero_out_noise(sum_cubes)
+            skewness = (count * (count - 1) ** 0.5 / (count - 2)) * (skew_cubes / skew_squares ** 1.5)
+            skewness = np.where(skew_squares == 0, 0, skewness)
+            if count < 3:
+                skewness[:] = np.nan
+
+            adjustment = 3 * (count - 1) ** 2 / ((count - 2) * (count - 3))
+            numerator = _zero_out_noise(count * (count + 1) * (count - 1) * sum_fourth_powers)
+            denominator = _zero_out_noise((count - 2) * (count - 3) * sum_squares ** 2)
+            kurtosis = np.where(denominator == 0, 0, numerator / denominator - adjustment)
+            if count < 4:
+                kurtosis[:] = np.nan
+
+    return {'mean': mean, 'variance': variance, 'std': np.sqrt(variance), 'skewness': skewness, 'kurtosis': kurtosis}
+
+
+def _zero_out_noise(values: np.ndarray) -> np.ndarray:
+    return np.where(np.abs(values) < MOMENT_ZERO_TOLERANCE, 0, values)
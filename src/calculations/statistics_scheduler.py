@@ -0,0 +1,285 @@
+import os
+import time
+from collections import defaultdict
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+from loguru import logger
+
+from src.calculations.statistics_calculations_stereotypes import STEREOTYPE_METRICS, StereotypeStatistics, \
+    build_stereotype_dataframe, PAIRWISE_METRIC_MATRICES, PairwiseStereotypeMatrices, extract_stereotype_data, \
+    get_variant_columns, get_variant_stereotypes, select_counts
+
+# Stereotype variants calculated for every dataset: variant name -> (stereotype type, filter 'none' and 'other')
+STEREOTYPE_VARIANTS = {'class_raw': ('class', False), 'relation_raw': ('relation', False),
+                       'combined_raw': ('combined', False), 'class_clean': ('class', True),
+                       'relation_clean': ('relation', True), 'combined_clean': ('combined', True)}
+
+
+class SharedMatrix(NamedTuple):
+    """
+    Reference to a count matrix (or to the rows of a dataset) placed in shared memory, which workers can read without
+    copying it.
+    """
+    name: str
+    shape: tuple[int, int]
+    dtype: str
+
+
+class MappedMatrix(NamedTuple):
+    """
+    Reference to a count matrix (or to the rows of a dataset) saved in a .npy file, which workers memory-map instead of
+    copying it.
+    """
+    path: str
+
+
+def calculate_datasets_stereotype_metrics(datasets: list, num_workers: int = 1, metric_names: list[str] = None) -> \
+        tuple[list[dict[str, dict]], list[PairwiseStereotypeMatrices]]:
+    """
+    Calculate the requested stereotype metrics of every variant of the given datasets. With num_workers greater than 1,
+    each (dataset, variant, metric) is an independent task run on a process pool, and each count matrix is placed once
+    in shared memory (or memory-mapped from its file, for datasets loaded from a snapshot), from where the workers read
+    it without copying. Datasets sliced from the same dataset share its count matrix, and their tasks only receive
+    their rows of it. Sequentially, all metrics of a variant are calculated together, sharing their intermediate
+    results.
+
+    Pairwise metrics (see PAIRWISE_METRIC_MATRICES) are not calculated per variant: their matrices are calculated once
+    per dataset over all its stereotypes (one task per dataset and matrix), and each variant's results are sliced from
+    them.
+
+    :param datasets: Datasets whose stereotype count matrices are used.
+    :param num_workers: Number of worker processes.
+    :param metric_names: Metrics to calculate, among STEREOTYPE_METRICS. Defaults to all of them.
+    :return: For each dataset, a dictionary from variant name (e.g., 'class_raw') to its dictionary of statistics, with
+             the metrics in the order of STEREOTYPE_METRICS; and, for each dataset, its PairwiseStereotypeMatrices with
+             the matrices already calculated, from which other pairwise metrics can be sliced later.
+    :raises ValueError: If a requested metric is not in STEREOTYPE_METRICS.
+    """
+    start_time = time.perf_counter()
+    unknown_metrics = set(metric_names or []) - set(STEREOTYPE_METRICS)
+    if unknown_metrics:
+        raise ValueError(f"Unknown stereotype metrics: {', '.join(sorted(unknown_metrics))}.")
+    metric_names = [metric_name for metric_name in STEREOTYPE_METRICS if metric_names is None or
+                    metric_name in metric_names]
+    shared_blocks = []
+
+    try:
+        # Step 1: Define the matrix and the rows read by each dataset's tasks (shared memory only when using worker
+        # processes), placing each count matrix once, whatever the number of datasets sliced from it
+        if num_workers > 1:
+            storage_matrices = {}
+            matrices = []
+            rows = []
+            for dataset in datasets:
+                if id(dataset.storage) not in storage_matrices:
+                    if dataset.stereotype_counts_path:
+                        storage_matrices[id(dataset.storage)] = MappedMatrix(dataset.stereotype_counts_path)
+                    else:
+                        shared_block, shared_matrix = _share_matrix(dataset.storage.stereotype_counts)
+                        shared_blocks.append(shared_block)
+                        storage_matrices[id(dataset.storage)] = shared_matrix
+                matrices.append(storage_matrices[id(dataset.storage)])
+
+                if dataset.rows is None:
+                    rows.append(None)
+                elif dataset.rows_path:
+                    rows.append(MappedMatrix(dataset.rows_path))
+                else:
+                    shared_block, shared_rows = _share_matrix(dataset.rows)
+                    shared_blocks.append(shared_block)
+                    rows.append(shared_rows)
+        else:
+            matrices = [dataset.storage.stereotype_counts for dataset in datasets]
+            rows = [dataset.rows for dataset in datasets]
+
+        # Step 2: Create one task per dataset, variant and metric (or per dataset and variant, when sequential), and
+        # one task per dataset and pairwise matrix (or per dataset, when sequential)
+        variant_metrics = [metric_name for metric_name in metric_names if metric_name not in PAIRWISE_METRIC_MATRICES]
+        pairwise_metrics = [metric_name for metric_name in metric_names if metric_name in PAIRWISE_METRIC_MATRICES]
+        metric_groups = _group_tasks(variant_metrics, num_workers)
+        matrix_groups = _group_tasks([PAIRWISE_METRIC_MATRICES[metric_name] for metric_name in pairwise_metrics],
+                                     num_workers)
+
+        task_keys = []
+        tasks = []
+        pairwise_task_keys = []
+        pairwise_tasks = []
+        for dataset_index, dataset in enumerate(datasets):
+            for variant, (stereotype_type, filter_type) in STEREOTYPE_VARIANTS.items():
+                columns, names = get_variant_stereotypes(dataset, stereotype_type, filter_type)
+                for metric_group in metric_groups:
+                    task_keys.append((dataset_index, variant))
+                    tasks.append((matrices[dataset_index], rows[dataset_index], columns, names, metric_group))
+            for matrix_group in matrix_groups:
+                pairwise_task_keys.append(dataset_index)
+                pairwise_tasks.append((matrices[dataset_index], rows[dataset_index], matrix_group))
+
+        # Step 3: Run the tasks
+        if num_workers > 1:
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                outcomes = executor.map(_run_metric_task, tasks)
+                pairwise_outcomes = executor.map(_run_pairwise_task, pairwise_tasks)
+                outcomes, pairwise_outcomes = list(outcomes), list(pairwise_outcomes)
+        else:
+            outcomes = [_run_metric_task(task) for task in tasks]
+            pairwise_outcomes = [_run_pairwise_task(task) for task in pairwise_tasks]
+    finally:
+        for shared_block in shared_blocks:
+            shared_block.close()
+            shared_block.unlink()
+
+    # Step 4: Gather the results in the same dictionaries as calculate_stereotype_metrics
+    datasets_statistics = [{variant: {} for variant in STEREOTYPE_VARIANTS} for _ in datasets]
+    metric_times = defaultdict(float)
+    for (dataset_index, variant), (metric_outcomes, worker_pid) in zip(task_keys, outcomes):
+        for metric_name, (result, elapsed_time) in metric_outcomes.items():
+            datasets_statistics[dataset_index][variant][metric_name] = result
+            metric_times[metric_name] += elapsed_time
+            logger.debug(f"Dataset '{datasets[dataset_index].name}', case '{variant}', statistic '{metric_name}' "
+                         f"calculated in {elapsed_time * 1000:.2f} ms by process {worker_pid}.")
+
+    # Step 5: Slice the pairwise metrics of every variant from the matrices of its dataset
+    datasets_matrices = [{} for _ in datasets]
+    matrix_metrics = {matrix_name: metric_name for metric_name, matrix_name in PAIRWISE_METRIC_MATRICES.items()}
+    for dataset_index, (matrix_outcomes, worker_pid) in zip(pairwise_task_keys, pairwise_outcomes):
+        for matrix_name, (matrix, elapsed_time) in matrix_outcomes.items():
+            datasets_matrices[dataset_index][matrix_name] = matrix
+            metric_times[matrix_metrics[matrix_name]] += elapsed_time
+            logger.debug(f"Dataset '{datasets[dataset_index].name}', pairwise matrix '{matrix_name}' calculated in "
+                         f"{elapsed_time * 1000:.2f} ms by process {worker_pid}.")
+
+    datasets_pairwise = [PairwiseStereotypeMatrices(dataset.select_stereotype_counts, matrices) for dataset, matrices
+                         in zip(datasets, datasets_matrices)]
+    if pairwise_metrics:
+        for dataset, pairwise, variants_statistics in zip(datasets, datasets_pairwise, datasets_statistics):
+            for variant, (stereotype_type, filter_type) in STEREOTYPE_VARIANTS.items():
+                statistics = StereotypeStatistics(
+                    partial(extract_stereotype_data, dataset, stereotype_type, filter_type), pairwise=pairwise,
+                    columns=get_variant_columns(dataset, stereotype_type, filter_type))
+                for metric_name in pairwise_metrics:
+                    start_time_metric = time.perf_counter()
+                    variants_statistics[variant][metric_name] = statistics[metric_name]
+                    metric_times[metric_name] += time.perf_counter() - start_time_metric
+
+    # Results in the order of STEREOTYPE_METRICS, whatever the order the tasks finished in
+    for variants_statistics in datasets_statistics:
+        for variant, statistics in variants_statistics.items():
+            variants_statistics[variant] = {metric_name: statistics[metric_name] for metric_name in metric_names}
+
+    _log_metric_times(metric_times, len(tasks) + len(pairwise_tasks), num_workers, time.perf_counter() - start_time)
+
+    return datasets_statistics, datasets_pairwise
+
+
+def _group_tasks(names: list[str], num_workers: int) -> list[list[str]]:
+    """Split metrics (or matrices) into one task each when using worker processes, or a single task otherwise."""
+    if not names:
+        return []
+    return [[name] for name in names] if num_workers > 1 else [names]
+
+
+def _share_matrix(matrix: np.ndarray) -> tuple[shared_memory.SharedMemory, SharedMatrix]:
+    """
+    Copy a count matrix (or the rows of a dataset) to a new shared memory block, column-major like the datasets' count
+    matrices.
+    """
+    shared_block = shared_memory.SharedMemory(create=True, size=max(1, matrix.nbytes))
+    shared_array = np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=shared_block.buf, order='F')
+    shared_array[:] = matrix
+    return shared_block, SharedMatrix(shared_block.name, matrix.shape, matrix.dtype.str)
+
+
+def _attach_matrix(matrix: Union[np.ndarray, SharedMatrix, MappedMatrix, None]) -> tuple[
+        Optional[np.ndarray], Optional[shared_memory.SharedMemory]]:
+    """
+    Return the count matrix (or rows) of a task and, if it was attached from shared memory, its block, which must be
+    closed with _detach_matrix once the task is done (the block is registered in the resource tracker shared with the
+    parent process, which unlinks it).
+    """
+    if matrix is None or isinstance(matrix, np.ndarray):
+        return matrix, None
+
+    if isinstance(matrix, MappedMatrix):
+        return np.load(matrix.path, mmap_mode='r'), None
+
+    shared_block = shared_memory.SharedMemory(name=matrix.name)
+    return np.ndarray(matrix.shape, dtype=np.dtype(matrix.dtype), buffer=shared_block.buf, order='F'), shared_block
+
+
+def _detach_matrix(shared_block: Optional[shared_memory.SharedMemory]) -> None:
+    """Close the shared memory block attached by _attach_matrix, once no array of the task references it."""
+    if shared_block is not None:
+        shared_block.close()
+
+
+def _run_metric_task(task: tuple) -> tuple[dict[str, tuple[object, float]], int]:
+    """
+    Worker function: calculate metrics of one stereotype variant, returning each one with its calculation time, and the
+    process id. Building the data and the shared intermediate results is timed with the first metric that uses them.
+    """
+    matrix, rows, columns, names, metric_names = task
+
+    counts, shared_block = _attach_matrix(matrix)
+    rows, rows_shared_block = _attach_matrix(rows)
+    try:
+        metric_outcomes = _calculate_metrics(StereotypeStatistics(
+            partial(build_stereotype_dataframe, counts, names, rows, columns)), metric_names)
+    finally:
+        del counts, rows
+        _detach_matrix(shared_block)
+        _detach_matrix(rows_shared_block)
+
+    return metric_outcomes, os.getpid()
+
+
+def _run_pairwise_task(task: tuple) -> tuple[dict[str, tuple[np.ndarray, float]], int]:
+    """
+    Worker function: calculate pairwise matrices over all the stereotypes of a dataset, returning each one with its
+    calculation time, and the process id.
+    """
+    matrix, rows, matrix_names = task
+
+    counts, shared_block = _attach_matrix(matrix)
+    rows, rows_shared_block = _attach_matrix(rows)
+    try:
+        matrix_outcomes = _calculate_pairwise_matrices(
+            PairwiseStereotypeMatrices(partial(select_counts, counts, rows)), matrix_names)
+    finally:
+        del counts, rows
+        _detach_matrix(shared_block)
+        _detach_matrix(rows_shared_block)
+
+    return matrix_outcomes, os.getpid()
+
+
+def _calculate_metrics(statistics: StereotypeStatistics, metric_names: list[str]) -> dict[str, tuple[object, float]]:
+    """Calculate metrics of a variant, each one with its calculation time."""
+    metric_outcomes = {}
+    for metric_name in metric_names:
+        start_time = time.perf_counter()
+        result = statistics[metric_name]
+        metric_outcomes[metric_name] = (result, time.perf_counter() - start_time)
+    return metric_outcomes
+
+
+def _calculate_pairwise_matrices(pairwise: PairwiseStereotypeMatrices,
+                                 matrix_names: list[str]) -> dict[str, tuple[np.ndarray, float]]:
+    """Calculate pairwise matrices of a dataset, each one with its calculation time."""
+    matrix_outcomes = {}
+    for matrix_name in matrix_names:
+        start_time = time.perf_counter()
+        result = pairwise.get_matrix(matrix_name)
+        matrix_outcomes[matrix_name] = (result, time.perf_counter() - start_time)
+    return matrix_outcomes
+
+
+def _log_metric_times(metric_times: dict[str, float], num_tasks: int, num_workers: int, elapsed_time: float) -> None:
+    total_time = sum(metric_times.values())
+    metrics_summary = ", ".join(f"{metric_name} {metric_time:.2f} s" for metric_name, metric_time in
+                                sorted(metric_times.items(), key=lambda item: item[1], reverse=True))
+    logger.info(f"{num_tasks} stereotype statistics tasks calculated in {elapsed_time:.2f} s using {num_workers} "
+                f"worker(s) ({total_time:.2f} s of task time: {metrics_summary}).")
@@ -0,0 +1,263 @@
+import json
+import os
+import tempfile
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from src.ModelData import ModelData, StereotypeCounts, CLASS_VOCABULARY, RELATION_VOCABULARY
+from src.calculations.statistics_calculations_stereotypes import ROW_CHUNK_SIZE, iterate_row_chunks, select_counts
+
+# Type of the model x stereotype counts. 32 bits halve the size of the matrix (in memory and on disk) and are far above
+# the number of elements of any model.
+COUNT_DTYPE = np.int32
+
+# Per-model metadata columns, one array each: column name -> (ModelData attribute, dtype). Names are kept as objects in
+# memory and saved as fixed-width strings, which can be memory-mapped.
+MODEL_COLUMNS = {"model_names": ("name", str), "model_years": ("year", np.int64),
+                 "model_is_classroom": ("is_classroom", np.bool_),
+                 "model_class_numbers": ("total_class_number", np.int64),
+                 "model_relation_numbers": ("total_relation_number", np.int64)}
+
+# Files of a storage directory, besides one .npy file per model column
+STEREOTYPE_COUNTS_FILE = "stereotype_counts.npy"
+INVALID_STEREOTYPES_FILE = "invalid_stereotypes.jsonl"
+
+
+class DatasetStorage:
+    """
+    Per-model data of a dataset: the model x stereotype count matrix (column-major, with all class stereotypes followed
+    by all relation stereotypes), the metadata columns of MODEL_COLUMNS, and the invalid stereotypes of the models that
+    have any. All of them follow the same row order. A storage is shared by a dataset and its slices, which select
+    their rows of it (see Dataset.create_slice).
+
+    A storage is either held in memory or opened from a directory (see save_storage and open_storage), whose arrays are
+    memory-mapped and whose invalid stereotypes are only read when first used. A storage opened from a directory is
+    pickled as its directory, and opened again when unpickled.
+    """
+
+    def __init__(self, stereotype_counts: np.ndarray, columns: dict[str, np.ndarray],
+                 invalid_stereotypes: dict[int, tuple[dict, dict]] = None, directory: str = None,
+                 mmap_mode: Optional[str] = None) -> None:
+        """
+        :param stereotype_counts: Model x stereotype count matrix.
+        :param columns: Array of each metadata column, by name (see MODEL_COLUMNS).
+        :param invalid_stereotypes: Invalid class and relation stereotypes (name -> count) of the models that have any,
+                                    by row. None to read them from the directory when first used.
+        :param directory: Directory the storage was opened from, if any.
+        :param mmap_mode: Mode its arrays were memory-mapped with (None if they were read into memory).
+        """
+        self.stereotype_counts: np.ndarray = stereotype_counts
+        self.columns: dict[str, np.ndarray] = columns
+        self.directory: Optional[str] = directory
+        self.mmap_mode: Optional[str] = mmap_mode
+        self._invalid_stereotypes = invalid_stereotypes
+
+    def __getstate__(self) -> dict:
+        if self.directory is not None:
+            return {"directory": self.directory, "mmap_mode": self.mmap_mode}
+        return self.__dict__
+
+    def __setstate__(self, state: dict) -> None:
+        if "stereotype_counts" not in state:
+            state = open_storage(state["directory"], state["mmap_mode"]).__dict__
+        self.__dict__.update(state)
+
+    @property
+    def num_models(self) -> int:
+        return len(self.stereotype_counts)
+
+    @property
+    def stereotype_counts_path(self) -> Optional[str]:
+        """File the count matrix is memory-mapped from, so workers can map it instead of copying it."""
+        if self.directory is None or self.mmap_mode is None:
+            return None
+        return os.path.join(self.directory, STEREOTYPE_COUNTS_FILE)
+
+    def get_invalid_stereotypes(self) -> dict[int, tuple[dict, dict]]:
+        """Invalid class and relation stereotypes of the models that have any, by row (in row order)."""
+        if self._invalid_stereotypes is None:
+            self._invalid_stereotypes = load_invalid_stereotypes(self.directory)
+        return self._invalid_stereotypes
+
+    def iterate_invalid_stereotypes(self, rows: np.ndarray = None) -> Iterator[tuple[dict, dict]]:
+        """
+        Yield the invalid class and relation stereotypes of the models that have any, in row order, among the given
+        rows (ascending; all if None).
+        """
+        invalid_stereotypes = self.get_invalid_stereotypes()
+        if rows is None:
+            yield from invalid_stereotypes.values()
+            return
+
+        invalid_rows = np.fromiter(invalid_stereotypes, dtype=np.int64, count=len(invalid_stereotypes))
+        for row in invalid_rows[np.isin(invalid_rows, rows)].tolist():
+            yield invalid_stereotypes[row]
+
+    def iterate_counts(self, rows: np.ndarray = None, columns=slice(None)) -> Iterator[np.ndarray]:
+        """
+        Yield consecutive blocks of at most ROW_CHUNK_SIZE of the given rows (all if None) and columns (a slice or
+        positions) of the count matrix, so that reductions over the models never copy the whole selection.
+        """
+        if rows is None:
+            for chunk in iterate_row_chunks(self.stereotype_counts):
+                yield select_counts(chunk, None, columns)
+        else:
+            for chunk_rows in iterate_row_chunks(rows):
+                yield select_counts(self.stereotype_counts, chunk_rows, columns)
+
+    def build_models(self, rows: np.ndarray = None) -> list[ModelData]:
+        """Build the ModelData of the given rows (all if None) from the metadata columns and the count matrix."""
+        invalid_stereotypes = self.get_invalid_stereotypes()
+        num_class_columns = len(CLASS_VOCABULARY)
+        columns = [(self.columns[column_name] if rows is None else self.columns[column_name][rows]).tolist()
+                   for column_name in MODEL_COLUMNS]
+        storage_rows = range(self.num_models) if rows is None else rows.tolist()
+
+        models = []
+        for chunk in self.iterate_counts(rows):
+            for counts_row in np.asarray(chunk).tolist():
+                index = len(models)
+                row = storage_rows[index]
+                model = ModelData(*(column[index] for column in columns))
+                model.class_stereotypes = StereotypeCounts(CLASS_VOCABULARY, counts_row[:num_class_columns])
+                model.relation_stereotypes = StereotypeCounts(RELATION_VOCABULARY, counts_row[num_class_columns:])
+                if row in invalid_stereotypes:
+                    model.invalid_class_stereotypes = dict(invalid_stereotypes[row][0])
+                    model.invalid_relation_stereotypes = dict(invalid_stereotypes[row][1])
+                models.append(model)
+
+        return models
+
+
+def build_storage(models: list[ModelData], stereotype_counts: np.ndarray = None) -> DatasetStorage:
+    """
+    Build an in-memory storage from the models' data. The count matrix is filled from their stereotype counts, unless
+    it is given (e.g., when its rows are already known).
+    """
+    columns = {column_name: np.array([getattr(model, attribute) for model in models],
+                                     dtype=object if dtype is str else dtype)
+               for column_name, (attribute, dtype) in MODEL_COLUMNS.items()}
+
+    if stereotype_counts is not None:
+        counts = np.asfortranarray(stereotype_counts, dtype=COUNT_DTYPE)
+    else:
+        num_class_columns = len(CLASS_VOCABULARY)
+        counts = np.zeros((len(models), num_class_columns + len(RELATION_VOCABULARY)), dtype=COUNT_DTYPE, order='F')
+        for row, model in enumerate(models):
+            counts[row, :num_class_columns] = model.class_stereotypes.counts
+            counts[row, num_class_columns:] = model.relation_stereotypes.counts
+
+    invalid_stereotypes = {row: (model.invalid_class_stereotypes, model.invalid_relation_stereotypes)
+                           for row, model in enumerate(models)
+                           if model.invalid_class_stereotypes or model.invalid_relation_stereotypes}
+
+    return DatasetStorage(counts, columns, invalid_stereotypes)
+
+
+def save_storage(storage: DatasetStorage, directory: str) -> None:
+    """
+    Save a storage to a directory: one uncompressed .npy file per array, saved as it is in memory so that it can be
+    memory-mapped, and the invalid stereotypes as JSON lines ({"row", "class", "relation"}, only for the models that
+    have any).
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    np.save(os.path.join(directory, STEREOTYPE_COUNTS_FILE), storage.stereotype_counts)
+    for column_name, (_, dtype) in MODEL_COLUMNS.items():
+        np.save(_get_column_path(directory, column_name), np.asarray(storage.columns[column_name], dtype=dtype))
+
+    with open(os.path.join(directory, INVALID_STEREOTYPES_FILE), "w", encoding="utf-8") as file:
+        for row, (invalid_class, invalid_relation) in storage.get_invalid_stereotypes().items():
+            _write_invalid_stereotypes(file, row, invalid_class, invalid_relation)
+
+
+def write_storage(models: Iterable[ModelData], num_models: int, directory: str,
+                  mmap_mode: Optional[str] = "r") -> DatasetStorage:
+    """
+    Write the models' data to a storage directory with the layout of save_storage as the models are produced, one
+    block of ROW_CHUNK_SIZE models at a time, and open it (see open_storage). The arrays are written in place in their
+    memory-mapped files, so neither the models nor the count matrix are ever held in memory at once.
+
+    :param models: Models' data, in row order (e.g., a generator).
+    :param num_models: Number of models produced, which sizes the arrays.
+    :raises ValueError: If a different number of models is produced.
+    """
+    os.makedirs(directory, exist_ok=True)
+    num_class_columns = len(CLASS_VOCABULARY)
+
+    counts = np.lib.format.open_memmap(os.path.join(directory, STEREOTYPE_COUNTS_FILE), mode="w+", dtype=COUNT_DTYPE,
+                                       shape=(num_models, num_class_columns + len(RELATION_VOCABULARY)),
+                                       fortran_order=True)
+    columns = {column_name: np.lib.format.open_memmap(_get_column_path(directory, column_name), mode="w+", dtype=dtype,
+                                                      shape=(num_models,))
+               for column_name, (_, dtype) in MODEL_COLUMNS.items() if dtype is not str}
+
+    # The width of the names array is only known at the end, so names are kept in a temporary file until then
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as names_file, \
+            open(os.path.join(directory, INVALID_STEREOTYPES_FILE), "w", encoding="utf-8") as invalid_file:
+        row = 0
+        name_length = 1
+        models = iter(models)
+        while block := list(islice(models, ROW_CHUNK_SIZE)):
+            if row + len(block) > num_models:
+                raise ValueError(f"More than the {num_models} expected models were produced.")
+            block_rows = slice(row, row + len(block))
+
+            counts[block_rows, :num_class_columns] = [model.class_stereotypes.counts for model in block]
+            counts[block_rows, num_class_columns:] = [model.relation_stereotypes.counts for model in block]
+            for column_name, column in columns.items():
+                column[block_rows] = [getattr(model, MODEL_COLUMNS[column_name][0]) for model in block]
+
+            for model in block:
+                names_file.write(json.dumps(model.name) + "\n")
+                name_length = max(name_length, len(model.name))
+                if model.invalid_class_stereotypes or model.invalid_relation_stereotypes:
+                    _write_invalid_stereotypes(invalid_file, row, model.invalid_class_stereotypes,
+                                               model.invalid_relation_stereotypes)
+                row += 1
+
+        if row != num_models:
+            raise ValueError(f"{row} models were produced, but {num_models} were expected.")
+
+        names = np.lib.format.open_memmap(_get_column_path(directory, "model_names"), mode="w+",
+                                          dtype=f"<U{name_length}", shape=(num_models,))
+        names_file.seek(0)
+        for start in range(0, num_models, ROW_CHUNK_SIZE):
+            block = [json.loads(line) for line in islice(names_file, ROW_CHUNK_SIZE)]
+            names[start:start + len(block)] = block
+
+    for array in [counts, names, *columns.values()]:
+        array.flush()
+
+    return open_storage(directory, mmap_mode)
+
+
+def open_storage(directory: str, mmap_mode: Optional[str] = "r") -> DatasetStorage:
+    """
+    Open a storage saved with save_storage. Its arrays are memory-mapped (read-only by default; mmap_mode=None reads
+    them into memory), so their pages are only read when used, and its invalid stereotypes are read when first used.
+    """
+    counts = np.load(os.path.join(directory, STEREOTYPE_COUNTS_FILE), mmap_mode=mmap_mode)
+    columns = {column_name: np.load(_get_column_path(directory, column_name), mmap_mode=mmap_mode)
+               for column_name in MODEL_COLUMNS}
+    return DatasetStorage(counts, columns, directory=directory, mmap_mode=mmap_mode)
+
+
+def load_invalid_stereotypes(directory: str) -> dict[int, tuple[dict, dict]]:
+    """Read the invalid stereotypes saved in a storage directory, by row."""
+    invalid_stereotypes = {}
+    with open(os.path.join(directory, INVALID_STEREOTYPES_FILE), encoding="utf-8") as file:
+        for line in file:
+            entry = json.loads(line)
+            invalid_stereotypes[entry["row"]] = (entry["class"], entry["relation"])
+    return invalid_stereotypes
+
+
+def _get_column_path(directory: str, column_name: str) -> str:
+    return os.path.join(directory, f"{column_name}.npy")
+
+
+def _write_invalid_stereotypes(file, row: int, invalid_class: dict, invalid_relation: dict) -> None:
+    file.write(json.dumps({"row": row, "class": invalid_class, "relation": invalid_relation}) + "\n")
@@ -0,0 +1,143 @@
+import json
+import os
+import shutil
+from typing import Callable, Iterable
+
+import numpy as np
+from loguru import logger
+
+from src.Dataset import Dataset
+from src.ModelData import ModelData, CLASS_VOCABULARY, RELATION_VOCABULARY
+from src.dataset_storage import DatasetStorage, save_storage, open_storage, write_storage
+
+# Version of the snapshot layout. Snapshots written with another version are rejected instead of misread.
+SNAPSHOT_SCHEMA_VERSION = 4
+SNAPSHOT_EXTENSION = ".snapshot"
+SNAPSHOT_MANIFEST = "manifest.json"
+
+# Storage directory the models' data is written to by stream_datasets_snapshot
+STREAMED_STORAGE_DIR = "storage_0"
+
+
+def save_datasets_snapshot(datasets: list[Dataset], output_dir: str, output_file_name: str,
+                           output_description: str = None) -> str:
+    """
+    Save datasets as a snapshot directory: a JSON manifest (schema version, stereotype columns and datasets' names)
+    plus, for each storage of the datasets, a storage directory (see save_storage) with uncompressed .npy files of its
+    count matrix (column-major int32) and per-model metadata, and its models' invalid stereotypes. A storage shared by
+    several datasets (e.g., a dataset and its slices) is saved once, and each slice saves its rows of it. Arrays are
+    saved as they are in memory, so they can be memory-mapped when loaded.
+
+    Only the models' data is saved, not the statistics calculated in step 2.
+
+    :return: Path of the snapshot directory.
+    """
+    snapshot_path = _create_snapshot_directory(output_dir, output_file_name)
+    _save_datasets(datasets, snapshot_path)
+
+    logger.success(f"{output_description or 'Datasets'} successfully saved as {snapshot_path}.")
+
+    return snapshot_path
+
+
+def stream_datasets_snapshot(models: Iterable[ModelData], num_models: int,
+                             create_datasets: Callable[[DatasetStorage], list[Dataset]], output_dir: str,
+                             output_file_name: str, output_description: str = None) -> str:
+    """
+    Save datasets as a snapshot directory (see save_datasets_snapshot) without holding their models' data in memory:
+    the models are written to the snapshot's storage as they are produced (see write_storage), and the datasets are
+    then created over the memory-mapped storage (e.g., as slices of the dataset of all its models).
+
+    :param models: Models' data, in row order (e.g., a generator).
+    :param num_models: Number of models produced.
+    :param create_datasets: Function creating the datasets to save from the storage of all the models.
+    :return: Path of the snapshot directory.
+    """
+    snapshot_path = _create_snapshot_directory(output_dir, output_file_name)
+    storage = write_storage(models, num_models, os.path.join(snapshot_path, STREAMED_STORAGE_DIR))
+    _save_datasets(create_datasets(storage), snapshot_path, {id(storage): STREAMED_STORAGE_DIR})
+
+    logger.success(f"{output_description or 'Datasets'} successfully saved as {snapshot_path}.")
+
+    return snapshot_path
+
+
+def _create_snapshot_directory(output_dir: str, output_file_name: str) -> str:
+    snapshot_path = os.path.join(output_dir, f"{output_file_name}{SNAPSHOT_EXTENSION}")
+
+    # Replace any previous snapshot, whose datasets may differ
+    shutil.rmtree(snapshot_path, ignore_errors=True)
+    os.makedirs(snapshot_path)
+
+    return snapshot_path
+
+
+def _save_datasets(datasets: list[Dataset], snapshot_path: str, storage_dirs: dict[int, str] = None) -> None:
+    """
+    Save the storages of the datasets that are not saved yet (storage_dirs holds the directories of those already in
+    the snapshot, by storage id), the rows of the slices and the manifest.
+    """
+    storage_dirs = dict(storage_dirs or {})
+    manifest = {"schema_version": SNAPSHOT_SCHEMA_VERSION, "stereotype_types": [], "stereotype_names": [],
+                "datasets": []}
+    for index, dataset in enumerate(datasets):
+        if id(dataset.storage) not in storage_dirs:
+            storage_dirs[id(dataset.storage)] = f"storage_{len(storage_dirs)}"
+            save_storage(dataset.storage, os.path.join(snapshot_path, storage_dirs[id(dataset.storage)]))
+
+        rows_file = None
+        if dataset.rows is not None:
+            rows_file = f"dataset_{index}_rows.npy"
+            np.save(os.path.join(snapshot_path, rows_file), dataset.rows)
+
+        manifest["stereotype_types"] = dataset.stereotype_types.tolist()
+        manifest["stereotype_names"] = dataset.stereotype_names.tolist()
+        manifest["datasets"].append({"name": dataset.name, "storage": storage_dirs[id(dataset.storage)],
+                                     "rows": rows_file, "num_models": dataset.num_models})
+
+    # The manifest is written last, so an interrupted save does not leave a loadable snapshot
+    with open(os.path.join(snapshot_path, SNAPSHOT_MANIFEST), "w", encoding="utf-8") as file:
+        json.dump(manifest, file)
+
+
+def is_snapshot(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, SNAPSHOT_MANIFEST))
+
+
+def load_datasets_snapshot(snapshot_path: str, mmap_mode: str = "r") -> list[Dataset]:
+    """
+    Load the datasets of a snapshot by opening their files: count matrices, per-model metadata and slices' rows are
+    memory-mapped (read-only by default; mmap_mode=None reads them into memory) and used by the datasets as they are,
+    datasets saved from the same storage share it again, and the models' ModelData are only built if needed. Pages are
+    only read when used, so matrices larger than the available memory can be analyzed.
+
+    :raises ValueError: If the snapshot was written with another schema version or another stereotype vocabulary.
+    """
+    with open(os.path.join(snapshot_path, SNAPSHOT_MANIFEST), encoding="utf-8") as file:
+        manifest = json.load(file)
+
+    if manifest.get("schema_version") != SNAPSHOT_SCHEMA_VERSION:
+        raise ValueError(f"Snapshot {snapshot_path} has schema version {manifest.get('schema_version')}, "
+                         f"but version {SNAPSHOT_SCHEMA_VERSION} is required. Recreate it by running step 1 again.")
+
+    # The count matrix columns must follow the current stereotype vocabularies
+    if manifest["datasets"] and (
+            manifest["stereotype_names"] != list(CLASS_VOCABULARY.names + RELATION_VOCABULARY.names)
+            or manifest["stereotype_types"].count("class") != len(CLASS_VOCABULARY)):
+        raise ValueError(f"Snapshot {snapshot_path} was saved with a different stereotype vocabulary. Recreate it by "
+                         f"running step 1 again.")
+
+    storages = {}
+    datasets = []
+    for dataset_entry in manifest["datasets"]:
+        storage_dir = dataset_entry["storage"]
+        if storage_dir not in storages:
+            storages[storage_dir] = open_storage(os.path.join(snapshot_path, storage_dir), mmap_mode)
+
+        rows_path = None
+        if dataset_entry["rows"] is not None:
+            rows_path = os.path.join(snapshot_path, dataset_entry["rows"])
+
+        datasets.append(Dataset(dataset_entry["name"], storage=storages[storage_dir], rows_path=rows_path))
+
+    return datasets
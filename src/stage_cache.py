@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import shutil
+from typing import Callable, Optional
+
+from loguru import logger
+
+from src.utils import compute_path_hash, compute_path_fingerprint, save_object, load_object
+
+
+class StageCache:
+    """
+    Content-addressed cache for the stages of the pipeline.
+
+    Each stage declares the stages it depends on (whose results are passed to its function, in order), the external
+    input paths it reads, the source files implementing it, the options changing its outputs, and the output paths it
+    writes. The key of a stage is a hash of its name, of the content of its code and input paths, of its options, and of
+    the keys of its dependencies, so a change anywhere upstream changes the keys of all downstream stages. Large inputs
+    (e.g., the catalog's models) can instead be declared as fingerprinted paths, keyed by the names, sizes and
+    modification times of their files without reading them.
+
+    When a stage is run and an entry with its key exists, its output files are restored and its pickled result is
+    returned without running it, and without running or loading its dependencies. As the result may reference their
+    output files (e.g., datasets memory-mapped from a snapshot), the missing output files of the dependencies' entries
+    are restored too. Otherwise, the dependencies are obtained first, the stage is run, and its result and output files
+    are stored as the new entry of the stage.
+
+    Several stages may write to the same output directory, so the output files of a stage are the files under its
+    output paths that were created or modified while it ran. They are listed in the entry, and the files listed in the
+    previous entry of a stage are removed before it is run or restored, so no stale outputs are left behind.
+    """
+
+    def __init__(self, cache_dir: str, enabled: bool = True) -> None:
+        self.cache_dir: str = cache_dir
+        self.enabled: bool = enabled
+        self.stages: dict[str, dict] = {}
+
+        self._keys: dict[str, str] = {}
+        self._results: dict[str, object] = {}
+
+    def add_stage(self, name: str, function: Callable, dependencies: Optional[list[str]] = None,
+                  input_paths: Optional[list[str]] = None, code_paths: Optional[list[str]] = None,
+                  output_paths: Optional[list[str]] = None, options: Optional[dict] = None,
+                  fingerprinted_paths: Optional[list[str]] = None) -> None:
+        """Declare a stage of the pipeline. Its dependencies must have been declared before."""
+        dependencies = dependencies or []
+        for dependency in dependencies:
+            if dependency not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on undeclared stage '{dependency}'.")
+
+        self.stages[name] = {"function": function, "dependencies": dependencies, "input_paths": input_paths or [],
+                             "code_paths": code_paths or [], "output_paths": output_paths or [],
+                             "options": options or {}, "fingerprinted_paths": fingerprinted_paths or []}
+
+    def get_key(self, name: str) -> str:
+        """Compute (once) the content-addressed key of a stage."""
+        if name not in self._keys:
+            stage = self.stages[name]
+            stage_hash = hashlib.sha256(name.encode("utf-8"))
+
+            # Only the Python sources of code directories, not their __pycache__ files
+            for path in stage["code_paths"]:
+                stage_hash.update(path.encode("utf-8"))
+                stage_hash.update(compute_path_hash(path, "*.py").encode("utf-8"))
+
+            for path in stage["input_paths"]:
+                stage_hash.update(path.encode("utf-8"))
+                stage_hash.update(compute_path_hash(path).encode("utf-8"))
+
+            for path in stage["fingerprinted_paths"]:
+                stage_hash.update(path.encode("utf-8"))
+                stage_hash.update(compute_path_fingerprint(path).encode("utf-8"))
+
+            for option, value in sorted(stage["options"].items()):
+                stage_hash.update(f"{option}={value!r}".encode("utf-8"))
+
+            for dependency in stage["dependencies"]:
+                stage_hash.update(self.get_key(dependency).encode("utf-8"))
+
+            self._keys[name] = stage_hash.hexdigest()
+
+        return self._keys[name]
+
+    def run(self, name: str) -> object:
+        """Return the result of a stage, from the cache if it is up to date or by running it (and its dependencies)."""
+        if name in self._results:
+            return self._results[name]
+
+        stage = self.stages[name]
+        entry_dir = os.path.join(self.cache_dir, name, self.get_key(name))
+        result_path = os.path.join(entry_dir, "result.object.gz")
+        outputs_path = os.path.join(entry_dir, "outputs.json")
+
+        if self.enabled and os.path.exists(result_path) and os.path.exists(outputs_path):
+            logger.info(f"Stage '{name}' is up to date. Reusing its cached results.")
+            self._remove_previous_outputs(name)
+            self._restore_outputs(entry_dir)
+            self._restore_dependencies_outputs(name)
+            result = load_object(result_path, f"cached result of stage '{name}'")
+        else:
+            dependencies_results = [self.run(dependency) for dependency in stage["dependencies"]]
+            logger.info(f"Running stage '{name}'.")
+            self._remove_previous_outputs(name)
+            files_before = self._get_output_files(stage)
+            result = stage["function"](*dependencies_results)
+            written_files = [file_path for file_path, file_stat in self._get_output_files(stage).items()
+                             if files_before.get(file_path) != file_stat]
+            self._save_entry(name, entry_dir, result, written_files)
+
+        self._results[name] = result
+        return result
+
+    @staticmethod
+    def _get_output_files(stage: dict) -> dict[str, tuple]:
+        """Return the files under the output paths of a stage, with the stat fields that change when one is written."""
+        file_paths = []
+        for output_path in stage["output_paths"]:
+            if os.path.isfile(output_path):
+                file_paths.append(output_path)
+            for root, _, files in os.walk(output_path):
+                file_paths.extend(os.path.join(root, file) for file in files)
+
+        output_files = {}
+        for file_path in file_paths:
+            file_stat = os.stat(file_path)
+            output_files[file_path] = (file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+        return output_files
+
+    def _remove_previous_outputs(self, name: str) -> None:
+        """Remove the output files listed in the previous entries of a stage."""
+        stage_dir = os.path.join(self.cache_dir, name)
+        if not os.path.isdir(stage_dir):
+            return
+
+        for key in os.listdir(stage_dir):
+            outputs_path = os.path.join(stage_dir, key, "outputs.json")
+            if not os.path.exists(outputs_path):
+                continue
+            with open(outputs_path, mode='r', encoding="utf-8") as file:
+                for file_path in json.load(file):
+                    if os.path.isfile(file_path):
+                        os.remove(file_path)
+
+    def _save_entry(self, name: str, entry_dir: str, result: object, written_files: list[str]) -> None:
+        """Store the result and the output files of a stage, replacing its previous entry."""
+        shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+        for index, file_path in enumerate(written_files):
+            cached_path = os.path.join(entry_dir, "outputs", str(index))
+            os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+            shutil.copy2(file_path, cached_path)
+
+        save_object(result, entry_dir, "result", f"Cached result of stage '{name}'")
+
+        # Written last, so an interrupted entry is never considered complete
+        with open(os.path.join(entry_dir, "outputs.json"), mode='w', encoding="utf-8") as file:
+            json.dump(written_files, file)
+
+    def _restore_dependencies_outputs(self, name: str) -> None:
+        """Restore the missing output files of the (transitive) dependencies of a stage with an up-to-date entry."""
+        for dependency in self.stages[name]["dependencies"]:
+            entry_dir = os.path.join(self.cache_dir, dependency, self.get_key(dependency))
+            if os.path.exists(os.path.join(entry_dir, "outputs.json")):
+                self._restore_outputs(entry_dir, missing_only=True)
+            self._restore_dependencies_outputs(dependency)
+
+    @staticmethod
+    def _restore_outputs(entry_dir: str, missing_only: bool = False) -> None:
+        """Copy the cached output files of a stage (only those that are missing, if requested) back to their paths."""
+        with open(os.path.join(entry_dir, "outputs.json"), mode='r', encoding="utf-8") as file:
+            written_files = json.load(file)
+
+        for index, file_path in enumerate(written_files):
+            if missing_only and os.path.exists(file_path):
+                continue
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            shutil.copy2(os.path.join(entry_dir, "outputs", str(index)), file_path)
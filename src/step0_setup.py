@@ -4,6 +4,8 @@ import os
 from loguru import logger
 
 from src.directories_global import BASE_OUTPUT_DIR, OUTPUT_DIR_01, OUTPUT_DIR_02, OUTPUT_DIR_03, CATALOG_PATH
+from src.calculations.statistics_calculations_stereotypes import STEREOTYPE_METRICS
+from src.utils import TABLE_FORMATS
 
 
 def initialize_output_directories():
@@ -19,10 +21,25 @@ def initialize_output_directories():
 
 
 def create_parser():
-    """Creates and returns an argument parser for the catalog path."""
+    """Creates and returns an argument parser for the catalog path and the number of workers."""
     parser = argparse.ArgumentParser(description="Receives OntoUML models path.")
     parser.add_argument("catalog_path", nargs="?", default=CATALOG_PATH,
                         help=f"Path to the input data source directory. Defaults to '{CATALOG_PATH}' if not provided.")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Number of worker processes used to load and query the models, to calculate the "
+                             "stereotype statistics, and to render the figures. Defaults to 1 (sequential).")
+    catalog_mode = parser.add_mutually_exclusive_group()
+    catalog_mode.add_argument("-i", "--incremental", action="store_true",
+                              help="Only load and query the models that changed since the previous run.")
+    catalog_mode.add_argument("--sparql", action="store_true",
+                              help="Load the whole catalog and execute the SPARQL queries in the 'queries' folder "
+                                   "instead of the single-pass stereotype extraction.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Run all stages, ignoring the results cached by previous runs.")
+    parser.add_argument("-f", "--table-format", choices=TABLE_FORMATS, default="csv",
+                        help="Format of the statistics tables. Defaults to 'csv'. 'parquet' requires pyarrow.")
+    parser.add_argument("-m", "--metrics", nargs="+", choices=list(STEREOTYPE_METRICS), default=None, metavar="METRIC",
+                        help="Stereotype statistics calculated and saved for each dataset. Defaults to all of them.")
     return parser
 
 
@@ -35,3 +52,51 @@ def get_catalog_path():
     # logger.info(f"Using catalog path: {catalog_path}")
 
     return catalog_path
+
+
+def get_number_of_workers():
+    """Parses the number of worker processes from command-line arguments."""
+    parser = create_parser()
+    args = parser.parse_args()
+
+    return max(1, args.workers)
+
+
+def get_incremental_refresh():
+    """Parses from command-line arguments whether the catalog data must be refreshed incrementally."""
+    parser = create_parser()
+    args = parser.parse_args()
+
+    return args.incremental
+
+
+def get_use_sparql_queries():
+    """Parses from command-line arguments whether the SPARQL queries must be executed on the loaded catalog."""
+    parser = create_parser()
+    args = parser.parse_args()
+
+    return args.sparql
+
+
+def get_use_stage_cache():
+    """Parses from command-line arguments whether cached stage results can be reused."""
+    parser = create_parser()
+    args = parser.parse_args()
+
+    return not args.no_cache
+
+
+def get_table_format():
+    """Parses the format of the statistics tables from command-line arguments."""
+    parser = create_parser()
+    args = parser.parse_args()
+
+    return args.table_format
+
+
+def get_stereotype_metrics():
+    """Parses the stereotype statistics to calculate from command-line arguments (None for all of them)."""
+    parser = create_parser()
+    args = parser.parse_args()
+
+    return args.metrics
@@ -1,15 +1,29 @@
 import csv
+import json
 import os
 import time
-from typing import Union
+from collections import defaultdict, Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat, islice
+from pathlib import Path
+from typing import Union, Iterator, Iterable
 
 from loguru import logger
 from ontouml_models_lib import OntologyRepresentationStyle, OntologyDevelopmentContext, Model, Query, Catalog
+from rdflib import RDF, Namespace, URIRef
+from rdflib.namespace import split_uri
 
 from src.Dataset import Dataset
-from src.ModelData import ModelData
+from src.ModelData import ModelData, index_stereotypes_csv
+from src.dataset_storage import DatasetStorage
 from src.directories_global import OUTPUT_DIR_01
-from src.utils import save_object, load_object
+from src.snapshot import stream_datasets_snapshot
+from src.utils import save_object, load_object, compute_path_hash
+
+ONTOUML = Namespace("https://w3id.org/ontouml#")
+
+# Version of the catalog manifest format used by refresh_catalog_data_incrementally
+CATALOG_MANIFEST_VERSION = 1
 
 
 def load_data_from_catalog(catalog_path):
@@ -20,15 +34,20 @@ def load_data_from_catalog(catalog_path):
     return all_models
 
 
-def query_data(all_models):
-    """Query class and relation stereotypes data for all models."""
-    query_models(all_models, "queries", OUTPUT_DIR_01)
+def query_data(all_models, num_workers: int = 1, use_sparql: bool = False):
+    """
+    Query class and relation stereotypes data for all models. By default, the fused single-pass extraction is used;
+    if use_sparql is True, the SPARQL queries in the 'queries' folder are executed instead.
+    """
+    if use_sparql:
+        query_models(all_models, "queries", OUTPUT_DIR_01, num_workers)
+    else:
+        extract_models_stereotypes(all_models, OUTPUT_DIR_01, num_workers)
 
 
-def instantiate_models_from_csv(input_models_data_csv_path: str, input_number_stereotypes_csv_path: str) -> list[
+def instantiate_models_from_csv(input_models_data_csv_path: str, input_number_stereotypes_csv_path: str) -> Iterator[
     ModelData]:
-    models_list = []
-
+    """Yield the ModelData of each row of the models' data CSV, in its order, with its class and relation totals."""
     # Step 1: Read the from input_number_class_relation_csv to map model_id to count_class and count_relation
     class_relation_data = {}
     with open(input_number_stereotypes_csv_path, mode='r', newline='') as file2:
@@ -52,41 +71,67 @@ def instantiate_models_from_csv(input_models_data_csv_path: str, input_number_st
             total_relation = class_relation_data[name]["count_relation"]
 
             # Instantiate ModelData with merged data
-            model_data = ModelData(name, year, is_classroom, total_class, total_relation)
-            models_list.append(model_data)
+            yield ModelData(name, year, is_classroom, total_class, total_relation)
 
-    return models_list
 
+def count_models_data() -> int:
+    """Number of models in the models' data CSV, i.e., of models produced by iterate_models_data."""
+    with open(os.path.join(OUTPUT_DIR_01, "models_data.csv"), mode='r', newline='') as file:
+        return sum(1 for _ in csv.DictReader(file))
 
-def calculate_models_data():
+
+def calculate_models_data() -> list[ModelData]:
     """Load model data and count stereotypes for each model."""
-    models_list = instantiate_models_from_csv(os.path.join(OUTPUT_DIR_01, "models_data.csv"),
+    return list(iterate_models_data())
+
+
+def iterate_models_data() -> Iterator[ModelData]:
+    """
+    Load model data and count stereotypes for each model, yielding each model once counted, so that models can be
+    written out without being all held in memory.
+    """
+    models_data = instantiate_models_from_csv(os.path.join(OUTPUT_DIR_01, "models_data.csv"),
                                               os.path.join(OUTPUT_DIR_01,
                                                            "query_count_number_classes_relations_consolidated.csv"))
 
     class_csv = os.path.join(OUTPUT_DIR_01, "query_get_all_class_stereotypes_consolidated.csv")
     relation_csv = os.path.join(OUTPUT_DIR_01, "query_get_all_relation_stereotypes_consolidated.csv")
 
-    # Count stereotypes and calculate 'none' for each model
-    for model in models_list:
-        model.count_stereotypes("class", class_csv)
-        model.count_stereotypes("relation", relation_csv)
+    # Read each consolidated CSV only once, grouping its rows by model_id
+    class_index = index_stereotypes_csv(class_csv)
+    relation_index = index_stereotypes_csv(relation_csv)
+
+    # Count stereotypes and calculate 'none' for each model, merging the invalid stereotypes found in its rows
+    invalid_stereotypes = {"class": {}, "relation": {}}
+    for model in models_data:
+        for stereotype_type, stereotypes_index in (("class", class_index), ("relation", relation_index)):
+            model_invalid_stereotypes = model.add_stereotype_counts(stereotype_type,
+                                                                    stereotypes_index.get(model.name, []))
+            for normalized_stereotype, spellings in model_invalid_stereotypes.items():
+                invalid_stereotypes[stereotype_type].setdefault(normalized_stereotype, set()).update(spellings)
         model.calculate_none()
+        yield model
 
-    return models_list
-
-
-def create_and_save_specific_datasets_instances(models_list):
-    """Create datasets based on classroom and non-classroom models."""
+    for stereotype_type, type_invalid_stereotypes in invalid_stereotypes.items():
+        if type_invalid_stereotypes:
+            logger.info(f"{len(type_invalid_stereotypes)} invalid {stereotype_type} stereotypes counted as 'other': "
+                        f"{', '.join(sorted(type_invalid_stereotypes))}.")
 
-    datasets = []
 
-    ontouml_non_classroom = [model for model in models_list if not model.is_classroom]
-    datasets.append(Dataset("ontouml_non_classroom", ontouml_non_classroom))
+def create_and_save_specific_datasets_instances(models_data: Iterable[ModelData], num_models: int) -> str:
+    """
+    Create datasets based on classroom and non-classroom models and save them as a snapshot, returning its path (see
+    load_datasets_snapshot). The models' data is written to the snapshot as it is produced, so it is never held in
+    memory at once.
+    """
+    return stream_datasets_snapshot(models_data, num_models, create_specific_datasets, OUTPUT_DIR_01, "datasets",
+                                    "List of datasets instances")
 
-    save_object(datasets, OUTPUT_DIR_01, "datasets", "List of datasets instances")
 
-    return datasets
+def create_specific_datasets(storage: DatasetStorage) -> list[Dataset]:
+    """Create the datasets over the storage of all models: each dataset is a slice of the one of all models."""
+    ontouml = Dataset("ontouml", storage=storage)
+    return [ontouml.slice_by("ontouml_non_classroom", is_classroom=False)]
 
 
 def load_and_save_catalog_models(input_catalog_path: str, output_dir: str):
@@ -105,21 +150,29 @@ def generate_list_models_data_csv(input_models_list, output_file_path):
     input_models_list = load_object(input_models_list, "list of models")
 
     # Normalizing RELEASE DATE, creating IS_CLASSROOM attribute, and preparing data to be saved
-    models_data = []
-    for model in input_models_list:
+    models_data = [model_data for model_data in map(get_model_data_row, input_models_list) if model_data]
+
+    save_models_data_csv(models_data, output_file_path)
 
-        # IMPORTANT: Only OntoUML models. UFO-only models are discarded.
-        if OntologyRepresentationStyle.ONTOUML_STYLE not in model.representationStyle:
-            continue
 
-        model.modified = model.issued if not model.modified else model.modified
-        model.is_classroom = True if (
-                OntologyDevelopmentContext.CLASSROOM in model.context
-                and OntologyDevelopmentContext.RESEARCH not in model.context
-                and OntologyDevelopmentContext.INDUSTRY not in model.context
-        ) else False
-        models_data.append((model.id, model.modified, model.is_classroom))
+def get_model_data_row(model: Model) -> Union[tuple, None]:
+    """Return the (model, year, is_classroom) row of a model, or None if it is not an OntoUML model."""
 
+    # IMPORTANT: Only OntoUML models. UFO-only models are discarded.
+    if OntologyRepresentationStyle.ONTOUML_STYLE not in model.representationStyle:
+        return None
+
+    model.modified = model.issued if not model.modified else model.modified
+    model.is_classroom = True if (
+            OntologyDevelopmentContext.CLASSROOM in model.context
+            and OntologyDevelopmentContext.RESEARCH not in model.context
+            and OntologyDevelopmentContext.INDUSTRY not in model.context
+    ) else False
+    return model.id, model.modified, model.is_classroom
+
+
+def save_models_data_csv(models_data: list[tuple], output_file_path: str) -> None:
+    """Save the (model, year, is_classroom) rows of the models to a CSV file."""
     # Generating CSV output
     header = ['model', 'year', 'is_classroom']
 
@@ -136,7 +189,11 @@ def generate_list_models_data_csv(input_models_list, output_file_path):
     logger.success(f"Models' data successfully saved in {output_file_path}.")
 
 
-def query_models(models_to_query: Union[list[Model], str], queries_dir: str, output_dir: str):
+def query_models(models_to_query: Union[list[Model], str], queries_dir: str, output_dir: str, num_workers: int = 1):
+    """
+    Execute all queries in queries_dir on all models, saving one consolidated CSV per query in output_dir.
+    When num_workers is greater than 1, the models are distributed over a pool of worker processes.
+    """
     # Load models from file, if necessary
 
     models_to_query = load_object(models_to_query, "models to query")
@@ -144,9 +201,325 @@ def query_models(models_to_query: Union[list[Model], str], queries_dir: str, out
     # Load and execute queries on the filtered models
     queries = Query.load_queries(queries_dir)
 
+    if num_workers > 1:
+        query_models_in_parallel(models_to_query, queries, output_dir, num_workers)
+        return
+
     for query in queries:
         start_time = time.perf_counter()
         query.execute_on_models(models_to_query, output_dir)
         end_time = time.perf_counter()
         elapsed_time_ms = (end_time - start_time) * 1000
         logger.info(f"Query {query.name} took {elapsed_time_ms:.2f} ms to perform.")
+
+
+def query_models_in_parallel(models_to_query: list[Model], queries: list[Query], output_dir: str,
+                             num_workers: int) -> None:
+    """
+    Execute the queries on the models using a process pool. Each task runs every query on one model, so each model
+    graph is sent to a worker only once. Results are merged in the original model order, producing the same
+    consolidated CSVs as the sequential execution.
+    """
+    start_time = time.perf_counter()
+
+    chunk_size = max(1, len(models_to_query) // (num_workers * 4))
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        models_results = list(executor.map(_execute_queries_on_model, models_to_query, repeat(queries),
+                                           repeat(output_dir), chunksize=chunk_size))
+
+    # Merge the per-model results, in model order, into one consolidated result list per query
+    workers_metrics = defaultdict(lambda: {"executions": 0, "elapsed_time": 0.0})
+    for query_index, query in enumerate(queries):
+        consolidated_results = []
+        for model_id, queries_results, worker_id, elapsed_times in models_results:
+            for res in queries_results[query_index]:
+                res_with_model_id = {"model_id": model_id}  # Add model's ID as the first column
+                res_with_model_id.update(res)
+                consolidated_results.append(res_with_model_id)
+
+            workers_metrics[worker_id]["executions"] += 1
+            workers_metrics[worker_id]["elapsed_time"] += elapsed_times[query_index]
+
+        # Same writer used by Query.execute_on_models, so the files are identical to the sequential ones
+        query._save_results(consolidated_results, Path(output_dir), suffix="consolidated")
+
+    # Report the throughput of each worker
+    for worker_id, metrics in sorted(workers_metrics.items()):
+        throughput = metrics["executions"] / metrics["elapsed_time"] if metrics["elapsed_time"] > 0 else 0
+        logger.info(f"Worker {worker_id} performed {metrics['executions']} query executions in "
+                    f"{metrics['elapsed_time'] * 1000:.2f} ms ({throughput:.2f} executions/s).")
+
+    elapsed_time_ms = (time.perf_counter() - start_time) * 1000
+    logger.info(f"Queries took {elapsed_time_ms:.2f} ms to perform on {len(models_to_query)} models "
+                f"using {num_workers} workers.")
+
+
+def _execute_queries_on_model(model: Model, queries: list[Query], output_dir: str) -> tuple:
+    """Worker function: execute all queries on a single model, returning the results and the time spent on each."""
+    queries_results = []
+    elapsed_times = []
+
+    for query in queries:
+        start_time = time.perf_counter()
+        queries_results.append(model.execute_query(query, output_dir, save_results=False))
+        elapsed_times.append(time.perf_counter() - start_time)
+
+    return model.id, queries_results, os.getpid(), elapsed_times
+
+
+def extract_models_stereotypes(models_to_extract: Union[list[Model], str], output_dir: str,
+                               num_workers: int = 1) -> None:
+    """
+    Collect, in a single scan of each model graph, the results of the three queries in the 'queries' folder (number of
+    classes and relations, class stereotypes and relation stereotypes) and save them to the same consolidated CSVs.
+    When num_workers is greater than 1, the models are distributed over a pool of worker processes.
+    """
+    models_to_extract = load_object(models_to_extract, "models to extract")
+
+    start_time = time.perf_counter()
+
+    if num_workers > 1:
+        chunk_size = max(1, len(models_to_extract) // (num_workers * 4))
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            models_results = list(executor.map(_extract_model_stereotypes, models_to_extract, chunksize=chunk_size))
+    else:
+        models_results = [_extract_model_stereotypes(model) for model in models_to_extract]
+
+    # Consolidate the results of all models, in model order
+    count_rows, class_rows, relation_rows = [], [], []
+    for model_count_row, model_class_rows, model_relation_rows in models_results:
+        if model_count_row:
+            count_rows.append(model_count_row)
+        class_rows.extend(model_class_rows)
+        relation_rows.extend(model_relation_rows)
+
+    save_consolidated_results(count_rows,
+                              os.path.join(output_dir, "query_count_number_classes_relations_consolidated.csv"))
+    save_consolidated_results(class_rows, os.path.join(output_dir, "query_get_all_class_stereotypes_consolidated.csv"))
+    save_consolidated_results(relation_rows,
+                              os.path.join(output_dir, "query_get_all_relation_stereotypes_consolidated.csv"))
+
+    elapsed_time_ms = (time.perf_counter() - start_time) * 1000
+    logger.info(f"Stereotypes extraction took {elapsed_time_ms:.2f} ms to perform on {len(models_to_extract)} models.")
+
+
+def _extract_model_stereotypes(model: Model) -> tuple[Union[dict, None], list[dict], list[dict]]:
+    """
+    Extract from a single model graph the rows that the three queries in the 'queries' folder would return.
+    Only the rdf:type and ontouml:stereotype triples are visited, through the graph's predicate indexes.
+    As with a failed query execution, a model whose extraction fails is logged and returns no rows.
+    """
+    graph = model.model_graph
+
+    try:
+        # Classes and relations of the model
+        classes = set(graph.subjects(RDF.type, ONTOUML.Class))
+        relations = set(graph.subjects(RDF.type, ONTOUML.Relation))
+
+        # Stereotype histograms of classes and relations
+        class_stereotypes = Counter()
+        relation_stereotypes = Counter()
+        for element, stereotype in graph.subject_objects(ONTOUML.stereotype):
+            stereotype = split_uri(stereotype)[1] if isinstance(stereotype, URIRef) else str(stereotype)
+            if element in classes:
+                class_stereotypes[stereotype] += 1
+            if element in relations:
+                relation_stereotypes[stereotype] += 1
+    except Exception:
+        logger.exception(f"Stereotypes extraction failed on {model.id}.")
+        return None, [], []
+
+    count_row = {"model_id": model.id, "count_class": len(classes), "count_relation": len(relations)}
+
+    # Stereotypes ordered by descending count, as in the queries
+    class_rows = [{"model_id": model.id, "stereotype": stereotype, "count": count} for stereotype, count in
+                  class_stereotypes.most_common()]
+    relation_rows = [{"model_id": model.id, "stereotype": stereotype, "count": count} for stereotype, count in
+                     relation_stereotypes.most_common()]
+
+    return count_row, class_rows, relation_rows
+
+
+def save_consolidated_results(results: list[dict], output_file_path: str) -> None:
+    """Save consolidated results to a CSV file in the same format used for the queries' results."""
+    if not results:
+        return  # No results to save
+
+    with open(output_file_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=results[0].keys())
+        writer.writeheader()
+        writer.writerows(results)
+
+    logger.success(f"Consolidated results saved to {output_file_path}.")
+
+
+def refresh_catalog_data_incrementally(input_catalog_path: str, output_dir: str, num_workers: int = 1) -> None:
+    """
+    Incremental alternative to load_data_from_catalog followed by query_data. A manifest in output_dir records, for
+    each model, the content hash of its source files together with its models_data.csv row and its extracted query
+    results. Only new or modified models are parsed and extracted; the cached results of unchanged models are reused
+    and removed models are dropped. The same models_data.csv and consolidated CSVs are then written, from which
+    iterate_models_data rebuilds the ModelData instances.
+    """
+    start_time = time.perf_counter()
+
+    manifest_path = os.path.join(output_dir, "catalog_manifest.json")
+    manifest = load_catalog_manifest(manifest_path)
+
+    # Identify new and modified models by the hash of their source files
+    models_folders = get_catalog_models_folders(input_catalog_path)
+    models_hashes = {folder.name: compute_path_hash(folder) for folder in models_folders}
+    changed_folders = [folder for folder in models_folders
+                       if manifest.get(folder.name, {}).get("hash") != models_hashes[folder.name]]
+
+    # Load and extract only the changed models
+    changed_results = iterate_catalog_extractions(changed_folders, num_workers)
+
+    for folder, result in zip(changed_folders, changed_results):
+        if result is None:
+            # Not recorded, so that the model is loaded again in the next refresh
+            manifest.pop(folder.name, None)
+            continue
+        model_data, count_row, class_rows, relation_rows = result
+        manifest[folder.name] = {"hash": models_hashes[folder.name], "model_data": model_data,
+                                 "count_row": count_row, "class_rows": class_rows, "relation_rows": relation_rows}
+
+    # Drop models that are no longer in the catalog or failed to load and keep the catalog order
+    manifest = {folder.name: manifest[folder.name] for folder in models_folders if folder.name in manifest}
+
+    # Write the same outputs generated by the full refresh
+    models_data = [tuple(entry["model_data"]) for entry in manifest.values() if entry["model_data"]]
+    save_models_data_csv(models_data, os.path.join(output_dir, "models_data.csv"))
+
+    save_consolidated_results([entry["count_row"] for entry in manifest.values() if entry["count_row"]],
+                              os.path.join(output_dir, "query_count_number_classes_relations_consolidated.csv"))
+    save_consolidated_results([row for entry in manifest.values() for row in entry["class_rows"]],
+                              os.path.join(output_dir, "query_get_all_class_stereotypes_consolidated.csv"))
+    save_consolidated_results([row for entry in manifest.values() for row in entry["relation_rows"]],
+                              os.path.join(output_dir, "query_get_all_relation_stereotypes_consolidated.csv"))
+
+    save_catalog_manifest(manifest, manifest_path)
+
+    elapsed_time_ms = (time.perf_counter() - start_time) * 1000
+    logger.info(f"Incremental refresh took {elapsed_time_ms:.2f} ms: {len(changed_folders)} of {len(models_folders)} "
+                f"models loaded and extracted.")
+
+
+def stream_catalog_data(input_catalog_path: str, output_dir: str, num_workers: int = 1,
+                        max_pending: int = 64) -> None:
+    """
+    Streaming alternative to load_data_from_catalog followed by query_data that never holds the whole catalog in
+    memory. Models are loaded one at a time (one per worker when num_workers is greater than 1), their models_data.csv
+    row and extracted query results are written to the output CSVs right away, and each model graph is released
+    before the next model is loaded. The generated CSVs are the same as in the in-memory path.
+
+    Peak memory does not grow with the catalog size: it is bounded by num_workers model graphs being loaded at the same
+    time plus the extracted rows of at most max_pending models waiting to be written.
+    """
+    start_time = time.perf_counter()
+
+    models_folders = get_catalog_models_folders(input_catalog_path)
+
+    with open(os.path.join(output_dir, "models_data.csv"), 'w', newline='') as models_file, \
+            open(os.path.join(output_dir, "query_count_number_classes_relations_consolidated.csv"), "w", newline="",
+                 encoding="utf-8") as count_file, \
+            open(os.path.join(output_dir, "query_get_all_class_stereotypes_consolidated.csv"), "w", newline="",
+                 encoding="utf-8") as class_file, \
+            open(os.path.join(output_dir, "query_get_all_relation_stereotypes_consolidated.csv"), "w", newline="",
+                 encoding="utf-8") as relation_file:
+
+        models_writer = csv.writer(models_file)
+        models_writer.writerow(['model', 'year', 'is_classroom'])
+        count_writer = csv.DictWriter(count_file, fieldnames=["model_id", "count_class", "count_relation"])
+        count_writer.writeheader()
+        class_writer = csv.DictWriter(class_file, fieldnames=["model_id", "stereotype", "count"])
+        class_writer.writeheader()
+        relation_writer = csv.DictWriter(relation_file, fieldnames=["model_id", "stereotype", "count"])
+        relation_writer.writeheader()
+
+        for result in iterate_catalog_extractions(models_folders, num_workers, max_pending):
+            if result is None:
+                continue  # Model failed to load, already logged
+            model_data, count_row, class_rows, relation_rows = result
+            if model_data:
+                models_writer.writerow(model_data)
+            if count_row:
+                count_writer.writerow(count_row)
+            class_writer.writerows(class_rows)
+            relation_writer.writerows(relation_rows)
+
+    elapsed_time_ms = (time.perf_counter() - start_time) * 1000
+    logger.success(f"Models' data and consolidated results of {len(models_folders)} models streamed to {output_dir} "
+                   f"in {elapsed_time_ms:.2f} ms.")
+
+
+def get_catalog_models_folders(input_catalog_path: str) -> list[Path]:
+    """Return the folders of the catalog's models, in the same order used by Catalog."""
+    models_path = Path(input_catalog_path) / "models"
+    return [folder for folder in models_path.iterdir() if folder.is_dir()]
+
+
+def iterate_catalog_extractions(models_folders: list[Path], num_workers: int = 1,
+                                max_pending: int = 64) -> Iterator[Union[tuple, None]]:
+    """
+    Yield, in order, the models_data row and extracted query results of each model folder (None if it failed to
+    load). Each model is loaded, extracted and released inside _load_and_extract_model, so at most one model graph per
+    worker is alive. With workers, at most max_pending folders are in flight: a new folder is submitted as each result
+    is yielded, so the workers never wait for a whole batch and finished results never accumulate.
+    """
+    if num_workers <= 1:
+        for model_folder in models_folders:
+            yield _load_and_extract_model(model_folder)
+        return
+
+    folders_iterator = iter(models_folders)
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        pending = deque(executor.submit(_load_and_extract_model, model_folder)
+                        for model_folder in islice(folders_iterator, max(max_pending, num_workers)))
+        while pending:
+            result = pending.popleft().result()
+            model_folder = next(folders_iterator, None)
+            if model_folder is not None:
+                pending.append(executor.submit(_load_and_extract_model, model_folder))
+            yield result
+
+
+def _load_and_extract_model(model_folder: Path) -> Union[tuple, None]:
+    """
+    Worker function: load a single model from its folder and extract its models_data row and query results.
+    A model that fails to load is logged and skipped, returning None.
+    """
+    try:
+        model = Model(model_folder)
+    except Exception:
+        logger.exception(f"Failed to load model from {model_folder}, skipping it.")
+        return None
+    count_row, class_rows, relation_rows = _extract_model_stereotypes(model)
+    return get_model_data_row(model), count_row, class_rows, relation_rows
+
+
+def load_catalog_manifest(manifest_path: str) -> dict:
+    """Load the catalog manifest, returning an empty one if it does not exist or has an incompatible version."""
+    if not os.path.exists(manifest_path):
+        return {}
+
+    try:
+        with open(manifest_path, mode='r', encoding="utf-8") as file:
+            content = json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Failed to load catalog manifest from {manifest_path}, performing a full refresh: {e}")
+        return {}
+
+    if content.get("version") != CATALOG_MANIFEST_VERSION:
+        logger.warning(f"Catalog manifest {manifest_path} has an incompatible version, performing a full refresh.")
+        return {}
+
+    return content["models"]
+
+
+def save_catalog_manifest(manifest: dict, manifest_path: str) -> None:
+    """Save the catalog manifest as JSON."""
+    with open(manifest_path, mode='w', encoding="utf-8") as file:
+        json.dump({"version": CATALOG_MANIFEST_VERSION, "models": manifest}, file)
+
+    logger.success(f"Catalog manifest successfully saved in {manifest_path}.")
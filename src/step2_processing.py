@@ -1,3 +1,4 @@
+from src.calculations.statistics_scheduler import calculate_datasets_stereotype_metrics
 from src.utils import load_object
 
 
@@ -14,6 +15,8 @@ def calculate_and_save_datasets_statistics(datasets, output_dir):
         dataset.calculate_and_save_models_by_year(output_dir)
         dataset.save_stereotypes_count_by_year(output_dir)
 
+    return datasets
+
 
 def save_dataset_info(dataset, output_dir):
     dataset.save_dataset_general_data_csv(output_dir)
@@ -21,14 +24,20 @@ def save_dataset_info(dataset, output_dir):
     dataset.save_dataset_relation_data_csv(output_dir)
 
 
-def calculate_and_save_datasets_stereotypes_statistics(datasets, output_dir):
+def calculate_and_save_datasets_stereotypes_statistics(datasets, output_dir, num_workers=1, metric_names=None):
     datasets = load_object(datasets, "datasets")
 
-    for dataset in datasets:
-        dataset.calculate_stereotype_statistics()
-        dataset.save_stereotype_statistics(output_dir)
+    # The stereotype statistics of all datasets are scheduled together, sharing the same worker pool. Only the requested
+    # metrics are calculated and saved; others are calculated if accessed later (e.g., by the visualizations).
+    datasets_statistics, datasets_pairwise = calculate_datasets_stereotype_metrics(datasets, num_workers, metric_names)
+
+    for dataset, statistics, pairwise in zip(datasets, datasets_statistics, datasets_pairwise):
+        dataset.set_stereotype_statistics(statistics, pairwise)
+        dataset.save_stereotype_statistics(output_dir, metric_names)
         dataset.calculate_invalid_stereotypes_metrics()
         dataset.save_invalid_stereotypes_metrics_to_csv(output_dir)
         dataset.calculate_analysis2()
         dataset.save_analysis2_to_csv(output_dir)
         dataset.general_validation()
+
+    return datasets
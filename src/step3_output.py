@@ -1,4 +1,7 @@
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Callable
 
 import numpy as np
 import pandas as pd
@@ -10,21 +13,67 @@ from matplotlib.lines import Line2D
 from src.utils import load_object, create_visualizations_out_dirs, append_chars_to_labels, bold_left_labels, color_text
 
 
-def generate_visualizations(datasets, output_dir):
+class FigureJob(NamedTuple):
+    """Figure to render: its name (for logging), its rendering function and the arguments passed to it."""
+    name: str
+    render: Callable
+    # Only small, pre-aggregated DataFrames (e.g., rank-frequency distributions), so jobs are cheap to send to workers
+    arguments: dict
+
+
+def generate_visualizations(datasets, output_dir, num_workers=1):
     datasets = load_object(datasets, "datasets")
 
+    # Step 1: Collect the figures of all datasets, with the data each one needs
     coverages = [0.9]
+    figure_jobs = []
     for dataset in datasets:
 
         if ("until" in dataset.name) or ("after" in dataset.name):
             continue
 
         for coverage in coverages:
-            plot_pareto_combined(dataset, output_dir, coverage)
-        execute_non_ontouml_analysis(dataset, output_dir)
+            figure_jobs.extend(collect_pareto_combined_jobs(dataset, output_dir, coverage))
+        figure_jobs.extend(collect_non_ontouml_analysis_jobs(dataset, output_dir))
+
+    # Step 2: Render them, in parallel when using several workers
+    render_figures(figure_jobs, num_workers)
+
+
+def render_figures(figure_jobs: list[FigureJob], num_workers: int = 1) -> None:
+    """
+    Render figure jobs, on a process pool when num_workers is greater than 1. Rendering is CPU-bound and each figure is
+    independent, so workers render one figure each at a time, with the non-interactive Agg backend.
+    """
+    start_time = time.perf_counter()
+
+    if num_workers > 1 and len(figure_jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(num_workers, len(figure_jobs)),
+                                 initializer=_initialize_render_worker) as executor:
+            outcomes = list(executor.map(_render_figure, figure_jobs))
+    else:
+        outcomes = [_render_figure(figure_job) for figure_job in figure_jobs]
+
+    for figure_job, (elapsed_time, worker_pid) in zip(figure_jobs, outcomes):
+        logger.debug(f"Figure '{figure_job.name}' rendered in {elapsed_time:.2f} s by process {worker_pid}.")
+
+    render_time = sum(elapsed_time for elapsed_time, _ in outcomes)
+    logger.info(f"{len(figure_jobs)} figures rendered in {time.perf_counter() - start_time:.2f} s using "
+                f"{num_workers} worker(s) ({render_time:.2f} s of rendering time).")
+
 
+def _initialize_render_worker() -> None:
+    plt.switch_backend('Agg')
 
-def plot_pareto_combined(dataset, output_dir: str, coverage_limit: float = None) -> None:
+
+def _render_figure(figure_job: FigureJob) -> tuple[float, int]:
+    """Worker function: render a figure, returning its rendering time and the process id."""
+    start_time = time.perf_counter()
+    figure_job.render(**figure_job.arguments)
+    return time.perf_counter() - start_time, os.getpid()
+
+
+def plot_pareto_combined(dataset, output_dir: str, coverage_limit: float = None, num_workers: int = 1) -> None:
     """
     Plot combined Pareto chart for occurrence-wise and group-wise stereotype frequencies from class and relation data
     (both raw and clean).
@@ -32,212 +81,235 @@ def plot_pareto_combined(dataset, output_dir: str, coverage_limit: float = None)
     :param dataset: Dataset object containing models and statistics.
     :param output_dir: Directory to save the generated Pareto charts.
     :param coverage_limit: Optional coverage limit value (between 0 and 1) to draw a vertical line on the plot.
+    :param num_workers: Number of worker processes rendering the charts.
     """
+    render_figures(collect_pareto_combined_jobs(dataset, output_dir, coverage_limit), num_workers)
+
+
+def collect_pareto_combined_jobs(dataset, output_dir: str, coverage_limit: float = None) -> list[FigureJob]:
+    """Create the output directories of the combined Pareto charts of a dataset and return their figure jobs."""
     # Create output directories
     class_clean_out, relation_clean_out = create_visualizations_out_dirs(output_dir,
                                                                          dataset.name)
 
-    # Define a helper function to create Pareto charts for a given dataset
-    def create_pareto_chart(data_occurrence, data_groupwise, output_path, coverage_limit=None):
-        # Calculate the percentage frequency for occurrence-wise and group-wise data
-        data_occurrence['Percentage Frequency'] = (data_occurrence['Frequency'] / data_occurrence[
-            'Frequency'].sum()) * 100
-        data_groupwise['Percentage Group-wise Frequency'] = (data_groupwise['Group-wise Frequency'] / data_groupwise[
-            'Group-wise Frequency'].sum()) * 100
-
-        # Ensure that group-wise data is ordered based on occurrence-wise data
-        data_groupwise = data_groupwise.set_index('Stereotype').reindex(data_occurrence['Stereotype']).reset_index()
-
-        # Calculate cumulative percentages for occurrence-wise and group-wise data
-        data_occurrence['Cumulative Percentage'] = data_occurrence['Percentage Frequency'].cumsum()
-        data_groupwise['Group-wise Cumulative Percentage'] = data_groupwise['Percentage Group-wise Frequency'].cumsum()
-
-        # Reset index to ensure integer indexing
-        data_occurrence = data_occurrence.reset_index(drop=True)
-        data_groupwise = data_groupwise.reset_index(drop=True)
-
-        # Create the plot
-        # fig, ax1 = plt.subplots(figsize=(16, 9), tight_layout=True)
-        fig, ax1 = plt.subplots(figsize=(8, 5), tight_layout=True)
-
-        # Set solid white background for the figure
-        fig.patch.set_alpha(1)  # Ensure complete figure background opacity
-        fig.patch.set_facecolor('white')  # Set background color to white
-
-        # Bar plot for occurrence-wise frequency
-        bar_width = 0.4
-        ax1.bar(data_occurrence['Stereotype'], data_occurrence['Percentage Frequency'], width=bar_width,
-                label='Aggregated Frequency (AF)', align='center', color='skyblue', zorder=2)
-
-        # Bar plot for group-wise frequency (shifted to the right)
-        ax1.bar(data_groupwise['Stereotype'], data_groupwise['Percentage Group-wise Frequency'], width=bar_width,
-                label='Model Coverage (MC)', align='edge', color='lightgreen', zorder=2)
-
-        # Calculate medians
-        median_occurrence = np.median(data_occurrence['Percentage Frequency'])
-        median_groupwise = np.median(data_groupwise['Percentage Group-wise Frequency'])
-
-        # Plot horizontal dashed lines for the medians (keep simple labels for the legend)
-        ax1.axhline(median_occurrence, color='blue', linestyle='--', linewidth=2.0, label='Aggregated Frequency Median', zorder=3)
-        ax1.axhline(median_groupwise, color='green', linestyle='--', linewidth=2.0, label='Model Coverage Median', zorder=3)
-
-        # Annotate the medians at the rightmost end of the lines
-        # Used (-7, 10) and (-50, 2) for relation
-
-        ax1.annotate(f'{median_occurrence:.2f}%', xy=(len(data_occurrence) - 1, median_occurrence), xytext=(-7, 2),
-                     textcoords='offset points', color='blue', fontsize=10, fontweight='bold', zorder=5)
-
-        ax1.annotate(f'{median_groupwise:.2f}%', xy=(len(data_groupwise) - 1, median_groupwise), xytext=(-7, 2),
-                     textcoords='offset points', color='green', fontsize=10, fontweight='bold', zorder=5)
-
-        # Set labels and title
-        ax1.set_ylabel('Stereotype AF & MC (%)', fontsize=12)
-        # Title omitted for the paper
-        # ax1.set_title(title, fontweight='bold', fontsize=14)
+    # Generate Pareto charts for class clean and relation clean datasets
+    figure_jobs = []
+    for variant, statistics, output_path in [('class_clean', dataset.class_statistics_clean, class_clean_out),
+                                             ('relation_clean', dataset.relation_statistics_clean, relation_clean_out)]:
+        figure_jobs.append(FigureJob(
+            f"{dataset.name} {variant} Pareto chart (coverage {coverage_limit})", create_pareto_chart,
+            {'data_occurrence': pd.DataFrame(statistics['rank_frequency_distribution']),
+             'data_groupwise': pd.DataFrame(statistics['rank_groupwise_frequency_distribution']),
+             'output_path': output_path, 'coverage_limit': coverage_limit}))
+
+    return figure_jobs
+
+
+def create_pareto_chart(data_occurrence, data_groupwise, output_path, coverage_limit=None):
+    """
+    Create the Pareto chart of the occurrence-wise and group-wise rank-frequency distributions of a stereotype variant.
+
+    :param data_occurrence: Rank-frequency distribution (occurrence-wise) of the variant.
+    :param data_groupwise: Group-wise rank-frequency distribution of the variant.
+    :param output_path: Directory where the chart is saved.
+    :param coverage_limit: Optional coverage limit value (between 0 and 1) to draw a vertical line on the plot.
+    """
+    # Calculate the percentage frequency for occurrence-wise and group-wise data
+    data_occurrence['Percentage Frequency'] = (data_occurrence['Frequency'] / data_occurrence[
+        'Frequency'].sum()) * 100
+    data_groupwise['Percentage Group-wise Frequency'] = (data_groupwise['Group-wise Frequency'] / data_groupwise[
+        'Group-wise Frequency'].sum()) * 100
+
+    # Ensure that group-wise data is ordered based on occurrence-wise data
+    data_groupwise = data_groupwise.set_index('Stereotype').reindex(data_occurrence['Stereotype']).reset_index()
+
+    # Calculate cumulative percentages for occurrence-wise and group-wise data
+    data_occurrence['Cumulative Percentage'] = data_occurrence['Percentage Frequency'].cumsum()
+    data_groupwise['Group-wise Cumulative Percentage'] = data_groupwise['Percentage Group-wise Frequency'].cumsum()
+
+    # Reset index to ensure integer indexing
+    data_occurrence = data_occurrence.reset_index(drop=True)
+    data_groupwise = data_groupwise.reset_index(drop=True)
+
+    # Create the plot
+    # fig, ax1 = plt.subplots(figsize=(16, 9), tight_layout=True)
+    fig, ax1 = plt.subplots(figsize=(8, 5), tight_layout=True)
+
+    # Set solid white background for the figure
+    fig.patch.set_alpha(1)  # Ensure complete figure background opacity
+    fig.patch.set_facecolor('white')  # Set background color to white
+
+    # Bar plot for occurrence-wise frequency
+    bar_width = 0.4
+    ax1.bar(data_occurrence['Stereotype'], data_occurrence['Percentage Frequency'], width=bar_width,
+            label='Aggregated Frequency (AF)', align='center', color='skyblue', zorder=2)
+
+    # Bar plot for group-wise frequency (shifted to the right)
+    ax1.bar(data_groupwise['Stereotype'], data_groupwise['Percentage Group-wise Frequency'], width=bar_width,
+            label='Model Coverage (MC)', align='edge', color='lightgreen', zorder=2)
+
+    # Calculate medians
+    median_occurrence = np.median(data_occurrence['Percentage Frequency'])
+    median_groupwise = np.median(data_groupwise['Percentage Group-wise Frequency'])
+
+    # Plot horizontal dashed lines for the medians (keep simple labels for the legend)
+    ax1.axhline(median_occurrence, color='blue', linestyle='--', linewidth=2.0, label='Aggregated Frequency Median', zorder=3)
+    ax1.axhline(median_groupwise, color='green', linestyle='--', linewidth=2.0, label='Model Coverage Median', zorder=3)
+
+    # Annotate the medians at the rightmost end of the lines
+    # Used (-7, 10) and (-50, 2) for relation
+
+    ax1.annotate(f'{median_occurrence:.2f}%', xy=(len(data_occurrence) - 1, median_occurrence), xytext=(-7, 2),
+                 textcoords='offset points', color='blue', fontsize=10, fontweight='bold', zorder=5)
+
+    ax1.annotate(f'{median_groupwise:.2f}%', xy=(len(data_groupwise) - 1, median_groupwise), xytext=(-7, 2),
+                 textcoords='offset points', color='green', fontsize=10, fontweight='bold', zorder=5)
+
+    # Set labels and title
+    ax1.set_ylabel('Stereotype AF & MC (%)', fontsize=12)
+    # Title omitted for the paper
+    # ax1.set_title(title, fontweight='bold', fontsize=14)
 
-        # Rotate the labels by 90 degrees for better readability
-        ax1.tick_params(axis='x', rotation=90)
+    # Rotate the labels by 90 degrees for better readability
+    ax1.tick_params(axis='x', rotation=90)
 
-        # Line plot for occurrence-wise cumulative percentage
-        ax2 = ax1.twinx()  # Create a second y-axis
+    # Line plot for occurrence-wise cumulative percentage
+    ax2 = ax1.twinx()  # Create a second y-axis
 
-        ax2.plot(range(len(data_occurrence)), data_occurrence['Cumulative Percentage'], color='blue', marker='o',
-                 label='Cumulative Aggregated Frequency', linestyle='-', linewidth=2, zorder=2)
+    ax2.plot(range(len(data_occurrence)), data_occurrence['Cumulative Percentage'], color='blue', marker='o',
+             label='Cumulative Aggregated Frequency', linestyle='-', linewidth=2, zorder=2)
 
-        # Line plot for group-wise cumulative percentage
-        ax2.plot(range(len(data_groupwise)), data_groupwise['Group-wise Cumulative Percentage'], color='green',
-                 marker='o', label='Cumulative Model Coverage', linestyle='-', linewidth=2, zorder=2)
+    # Line plot for group-wise cumulative percentage
+    ax2.plot(range(len(data_groupwise)), data_groupwise['Group-wise Cumulative Percentage'], color='green',
+             marker='o', label='Cumulative Model Coverage', linestyle='-', linewidth=2, zorder=2)
 
-        if coverage_limit is not None:
-            coverage_limit_percent = coverage_limit * 100
-            ax2.axhline(
-                y=coverage_limit_percent,
-                color='lightgrey',
-                linestyle=(0, (5, 5)),  # More spaced-out dashes
-                linewidth=1.0,
-                zorder=-5,  # Ensure it remains in the background
-                label='90% Coverage'
-            )
+    if coverage_limit is not None:
+        coverage_limit_percent = coverage_limit * 100
+        ax2.axhline(
+            y=coverage_limit_percent,
+            color='lightgrey',
+            linestyle=(0, (5, 5)),  # More spaced-out dashes
+            linewidth=1.0,
+            zorder=-5,  # Ensure it remains in the background
+            label='90% Coverage'
+        )
 
-            # Find the index where both cumulative percentages exceed the coverage limit
-            for i in range(len(data_occurrence)):
-                occurrence_cumulative = data_occurrence.loc[i, 'Cumulative Percentage']
-                groupwise_cumulative = data_groupwise.loc[i, 'Group-wise Cumulative Percentage']
-                if min(occurrence_cumulative, groupwise_cumulative) >= coverage_limit_percent:
-                    # Plot the vertical dashed line at this index
-                    ax1.axvline(x=i, color='red', linestyle='--', linewidth=2.0, label=f'Projected Cumulative ≥ {coverage_limit_percent:.1f}%')
+        # Find the index where both cumulative percentages exceed the coverage limit
+        for i in range(len(data_occurrence)):
+            occurrence_cumulative = data_occurrence.loc[i, 'Cumulative Percentage']
+            groupwise_cumulative = data_groupwise.loc[i, 'Group-wise Cumulative Percentage']
+            if min(occurrence_cumulative, groupwise_cumulative) >= coverage_limit_percent:
+                # Plot the vertical dashed line at this index
+                ax1.axvline(x=i, color='red', linestyle='--', linewidth=2.0, label=f'Projected Cumulative ≥ {coverage_limit_percent:.1f}%')
 
-                    # Annotate the occurrence-wise cumulative percentage, automatically adjusted
-                    ax2.annotate(f'{occurrence_cumulative:.1f}%', xy=(i, occurrence_cumulative),
-                                 textcoords='offset points', xytext=(3, 14), ha='left', va='top', fontsize=10,
-                                 color='blue')
+                # Annotate the occurrence-wise cumulative percentage, automatically adjusted
+                ax2.annotate(f'{occurrence_cumulative:.1f}%', xy=(i, occurrence_cumulative),
+                             textcoords='offset points', xytext=(3, 14), ha='left', va='top', fontsize=10,
+                             color='blue')
 
-                    # Annotate the group-wise cumulative percentage, automatically adjusted
-                    ax2.annotate(f'{groupwise_cumulative:.1f}%', xy=(i, groupwise_cumulative),
-                                 textcoords='offset points', xytext=(3, -5), ha='left', va='top', fontsize=10,
-                                 color='green')
+                # Annotate the group-wise cumulative percentage, automatically adjusted
+                ax2.annotate(f'{groupwise_cumulative:.1f}%', xy=(i, groupwise_cumulative),
+                             textcoords='offset points', xytext=(3, -5), ha='left', va='top', fontsize=10,
+                             color='green')
 
-                    red_line_index = i
-                    break
+                red_line_index = i
+                break
 
-        # Set the y-axis label and ticks for the cumulative percentage
-        ax2.set_ylabel('Cumulative AF & MC (%)', fontsize=12)
-        ax2.set_yticks(range(0, 101, 10))
+    # Set the y-axis label and ticks for the cumulative percentage
+    ax2.set_ylabel('Cumulative AF & MC (%)', fontsize=12)
+    ax2.set_yticks(range(0, 101, 10))
 
-        ax1.tick_params(axis='x', rotation=45)  # Rotate by 45 degrees
-        texts = ax1.get_xticklabels()  # Color specific x-axis labels
-        # Modify the labels with symbols
-        texts = append_chars_to_labels(texts, data_occurrence, data_groupwise, median_occurrence, median_groupwise)
+    ax1.tick_params(axis='x', rotation=45)  # Rotate by 45 degrees
+    texts = ax1.get_xticklabels()  # Color specific x-axis labels
+    # Modify the labels with symbols
+    texts = append_chars_to_labels(texts, data_occurrence, data_groupwise, median_occurrence, median_groupwise)
 
-        bold_left_labels(texts, red_line_index)
+    bold_left_labels(texts, red_line_index)
 
-        for label in texts:
-            # Align labels to the right, so the last character is near the corresponding tick
-            label.set_ha('right')
-            # Adjust the label positioning slightly if needed (use pad for further fine-tuning)
-            label.set_position(
-                (label.get_position()[0] - 0.02, label.get_position()[1]))  # Adjust the x-position slightly
+    for label in texts:
+        # Align labels to the right, so the last character is near the corresponding tick
+        label.set_ha('right')
+        # Adjust the label positioning slightly if needed (use pad for further fine-tuning)
+        label.set_position(
+            (label.get_position()[0] - 0.02, label.get_position()[1]))  # Adjust the x-position slightly
 
-        # Set the new x-tick labels
-        ax1.set_xticks(range(len(texts)))  # Make sure the number of ticks matches the number of labels
-        ax1.set_xticklabels(texts)  # Apply the new labels
+    # Set the new x-tick labels
+    ax1.set_xticks(range(len(texts)))  # Make sure the number of ticks matches the number of labels
+    ax1.set_xticklabels(texts)  # Apply the new labels
 
-        color_text(ax1.get_xticklabels())
+    color_text(ax1.get_xticklabels())
 
-        # Get the current x-tick positions
-        x_positions = range(len(texts))
+    # Get the current x-tick positions
+    x_positions = range(len(texts))
 
-        # Explicitly set the x-tick positions to match the number of labels
-        ax1.set_xticks(x_positions)
+    # Explicitly set the x-tick positions to match the number of labels
+    ax1.set_xticks(x_positions)
 
-        # Apply the updated labels back to the axis
-        ax1.set_xticklabels(texts)
+    # Apply the updated labels back to the axis
+    ax1.set_xticklabels(texts)
 
-        ax1.grid(False)
-        ax2.grid(False)
+    ax1.grid(False)
+    ax2.grid(False)
 
-        # Extract handles and labels from both axes
-        handles1, labels1 = ax1.get_legend_handles_labels()  # Bar plot legend info (ax1)
-        handles2, labels2 = ax2.get_legend_handles_labels()  # Line plot legend info (ax2)
+    # Extract handles and labels from both axes
+    handles1, labels1 = ax1.get_legend_handles_labels()  # Bar plot legend info (ax1)
+    handles2, labels2 = ax2.get_legend_handles_labels()  # Line plot legend info (ax2)
 
-        # Combine the handles and labels from both legends
-        combined_handles = handles1 + handles2
-        combined_labels = labels1 + labels2
+    # Combine the handles and labels from both legends
+    combined_handles = handles1 + handles2
+    combined_labels = labels1 + labels2
 
-        # Reordering legend elements
-        combined_handles = [combined_handles[3], combined_handles[4], combined_handles[5],
-                            combined_handles[6], combined_handles[0], combined_handles[1],combined_handles[2]]
-        combined_labels = [combined_labels[3], combined_labels[4], combined_labels[5],
-                            combined_labels[6], combined_labels[0], combined_labels[1],combined_labels[2]]
+    # Reordering legend elements
+    combined_handles = [combined_handles[3], combined_handles[4], combined_handles[5],
+                        combined_handles[6], combined_handles[0], combined_handles[1],combined_handles[2]]
+    combined_labels = [combined_labels[3], combined_labels[4], combined_labels[5],
+                        combined_labels[6], combined_labels[0], combined_labels[1],combined_labels[2]]
 
 
-        combined_legend = ax2.legend(combined_handles, combined_labels, loc='center right', bbox_to_anchor=(1, 0.5),
-                                     frameon=True, facecolor='white', edgecolor='black', framealpha=1, shadow=True)
+    combined_legend = ax2.legend(combined_handles, combined_labels, loc='center right', bbox_to_anchor=(1, 0.5),
+                                 frameon=True, facecolor='white', edgecolor='black', framealpha=1, shadow=True)
 
 
-        # Set the zorder of the combined legend higher than other elements
-        combined_legend.set_zorder(10)
-        plt.draw()  # Force re-rendering of the plot, ensuring legend is drawn last
+    # Set the zorder of the combined legend higher than other elements
+    combined_legend.set_zorder(10)
+    plt.draw()  # Force re-rendering of the plot, ensuring legend is drawn last
 
-        # Customize the title: left-align and make it bold
-        combined_legend.get_title().set_fontweight('bold')  # Make the title bold
-
-        # Create proxy artists for the symbols
-        legend_elements = [Line2D([0], [0], marker='+', color='black', linestyle='None', markersize=7,
-                                  label='Stereotype ≥ median (AF)'),
-                           Line2D([0], [0], marker='$*$', color='black', linestyle='None', markersize=7,
-                                  label='Stereotype ≥ median (MC)')]
+    # Customize the title: left-align and make it bold
+    combined_legend.get_title().set_fontweight('bold')  # Make the title bold
 
-        # Add these proxies to the existing legend
-        ax2.legend(handles=combined_handles + legend_elements,  # Combine previous handles with new ones
-                   loc='center right', bbox_to_anchor=(1, 0.5), frameon=True, facecolor='white', edgecolor='black',
-                   framealpha=1, shadow=True, handletextpad=1, borderaxespad=1, borderpad=0.5, fontsize=8)
+    # Create proxy artists for the symbols
+    legend_elements = [Line2D([0], [0], marker='+', color='black', linestyle='None', markersize=7,
+                              label='Stereotype ≥ median (AF)'),
+                       Line2D([0], [0], marker='$*$', color='black', linestyle='None', markersize=7,
+                              label='Stereotype ≥ median (MC)')]
 
-        # Save the plot
-        fig_name = f"pareto_combined_cov_{coverage_limit}.png"
-        # Ensure tight layout for the figure before saving
-        plt.tight_layout()
-        fig.savefig(os.path.join(output_path, fig_name), dpi=300, bbox_inches='tight')
+    # Add these proxies to the existing legend
+    ax2.legend(handles=combined_handles + legend_elements,  # Combine previous handles with new ones
+               loc='center right', bbox_to_anchor=(1, 0.5), frameon=True, facecolor='white', edgecolor='black',
+               framealpha=1, shadow=True, handletextpad=1, borderaxespad=1, borderpad=0.5, fontsize=8)
 
-        logger.success(f"Figure {fig_name} successfully saved in {output_path}.")
-        plt.close(fig)
+    # Save the plot
+    fig_name = f"pareto_combined_cov_{coverage_limit}.png"
+    # Ensure tight layout for the figure before saving
+    plt.tight_layout()
+    fig.savefig(os.path.join(output_path, fig_name), dpi=300, bbox_inches='tight')
 
-    # Now generate Pareto charts for class clean and relation clean datasets
-    create_pareto_chart(pd.DataFrame(dataset.class_statistics_clean['rank_frequency_distribution']),
-                        pd.DataFrame(dataset.class_statistics_clean['rank_groupwise_frequency_distribution']),
-                        class_clean_out, coverage_limit)
+    logger.success(f"Figure {fig_name} successfully saved in {output_path}.")
+    plt.close(fig)
 
-    create_pareto_chart(pd.DataFrame(dataset.relation_statistics_clean['rank_frequency_distribution']),
-                        pd.DataFrame(dataset.relation_statistics_clean['rank_groupwise_frequency_distribution']),
-                        relation_clean_out, coverage_limit)
 
+def execute_non_ontouml_analysis(dataset, out_dir_path, num_workers: int = 1):
+    render_figures(collect_non_ontouml_analysis_jobs(dataset, out_dir_path), num_workers)
 
-def execute_non_ontouml_analysis(dataset, out_dir_path):
+
+def collect_non_ontouml_analysis_jobs(dataset, out_dir_path) -> list[FigureJob]:
+    """Create the output directories of the non-OntoUML charts of a dataset and return their figure jobs."""
     st_types = ['class', 'relation']
     st_norms = ['yearly']
 
     years_start = [2015]
 
+    figure_jobs = []
     for st_type in st_types:
         final_out_dir = os.path.join(out_dir_path, dataset.name, f"{st_type}_raw")
 
@@ -249,8 +321,13 @@ def execute_non_ontouml_analysis(dataset, out_dir_path):
             df_modelwise = dataset.years_stereotypes_data[f'{st_type}_mw_{st_norm}']
 
             for year_start in years_start:
-                generate_non_ontouml_combined_visualization(df_occurrence, df_modelwise, final_out_dir,
-                                                            f'{st_type}_{st_norm}_{year_start}', year_start=year_start)
+                figure_jobs.append(FigureJob(
+                    f"{dataset.name} {st_type}_raw non-OntoUML chart ({st_norm}, from {year_start})",
+                    generate_non_ontouml_combined_visualization,
+                    {'df_occurrence': df_occurrence, 'df_modelwise': df_modelwise, 'out_dir_path': final_out_dir,
+                     'file_name': f'{st_type}_{st_norm}_{year_start}', 'year_start': year_start}))
+
+    return figure_jobs
 
 
 def generate_non_ontouml_combined_visualization(df_occurrence, df_modelwise, out_dir_path, file_name, year_start=None,
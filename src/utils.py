@@ -1,7 +1,10 @@
 # Utility function to save to CSV
 import gzip
+import hashlib
+import importlib.util
 import os
 import pickle
+from pathlib import Path
 from typing import Optional, Union
 
 import pandas as pd
@@ -75,6 +78,67 @@ def save_to_csv(data, filepath, message):
         logger.error(f"Failed to save {filepath}: {e}")
 
 
+# Formats in which save_table can write the statistics tables. CSV is the default; Parquet requires pyarrow.
+TABLE_FORMATS = ["csv", "parquet"]
+_table_format = "csv"
+
+
+def set_table_format(table_format: str) -> None:
+    """Select the format of the tables written by save_table."""
+    global _table_format
+
+    if table_format not in TABLE_FORMATS:
+        raise ValueError(f"Invalid table format '{table_format}'. Must be one of {TABLE_FORMATS}.")
+    if table_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise ImportError("Saving tables as Parquet requires pyarrow. Install it with 'pip install pyarrow'.")
+
+    _table_format = table_format
+
+
+def get_table_format() -> str:
+    return _table_format
+
+
+def save_table(data, filepath, message, index=False, **csv_options):
+    """
+    Save a DataFrame in the selected table format (see set_table_format) with error handling.
+
+    CSV files are written to filepath with the given to_csv options. Parquet files replace the extension of filepath
+    with '.parquet' and keep the columns' dtypes, storing missing values as nulls instead of placeholder strings.
+    Errors are logged and raised.
+    """
+    try:
+        df = pd.DataFrame(data)
+        if _table_format == "parquet":
+            filepath = str(Path(filepath).with_suffix(".parquet"))
+            _prepare_parquet_dataframe(df).to_parquet(filepath, index=index)
+        else:
+            df.to_csv(filepath, index=index, **csv_options)
+        logger.success(message)
+    except Exception as e:
+        logger.error(f"Failed to save {filepath}: {e}")
+        raise
+
+
+def _prepare_parquet_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adapt a DataFrame to Parquet's requirements: string column names, lists instead of tuples (pairs), and real dtypes
+    instead of object columns (e.g., tables built with dtype=object to keep integers next to missing values). Object
+    columns become nullable integer, float, boolean or string columns, inferred from the types of their values, so
+    integral floats stay floats.
+    """
+    df = df.copy()
+    df.columns = [str(column) for column in df.columns]
+    for column in df.columns:
+        if df[column].dtype != object:
+            continue
+        if df[column].map(lambda value: isinstance(value, tuple)).any():
+            df[column] = df[column].map(lambda value: list(value) if isinstance(value, tuple) else value)
+        else:
+            df[column] = pd.array(df[column].to_numpy(), copy=False)
+    return df
+
+
 def append_unique_preserving_order(existing_list, new_keys):
     """Append keys to the list, preserving the original order and ensuring no duplicates."""
     for key in new_keys:
@@ -129,9 +193,16 @@ def create_visualizations_out_dirs(output_dir, dataset_name):
 def load_object(input_source: Union[object, str], description: Optional[str] = None) -> object:
     """
     Loads an object from a given source. If the input source is a string, it is assumed to be a file path to
-    a serialized (pickled and gzipped) object, which will be deserialized. If the input is already an object,
-    it is returned as-is.
+    a serialized (pickled and gzipped) object, which will be deserialized, or to a datasets snapshot directory. If the
+    input is already an object, it is returned as-is.
     """
+    # Imported here because snapshots depend on Dataset, which depends on this module
+    from src.snapshot import is_snapshot, load_datasets_snapshot
+
+    if isinstance(input_source, str) and is_snapshot(input_source):
+        logger.info(f"Loading {description or 'datasets'} snapshot from {input_source}.")
+        return load_datasets_snapshot(input_source)
+
     if isinstance(input_source, str):
         # Deserialize (unpickle) the object from the provided file path
         description = description or "object"
@@ -146,3 +217,40 @@ def load_object(input_source: Union[object, str], description: Optional[str] = N
             raise
 
     return input_source
+
+
+def compute_path_hash(path: Union[str, Path], pattern: str = "*") -> str:
+    """
+    Compute a SHA-256 hash over the content of a file or, for a directory, over the relative names and contents of all
+    files inside it matching pattern (e.g., "*.py" to ignore the compiled files in __pycache__).
+    """
+    path = Path(path)
+    files_hash = hashlib.sha256()
+
+    if path.is_file():
+        files_hash.update(path.read_bytes())
+        return files_hash.hexdigest()
+
+    for file_path in sorted(file for file in path.rglob(pattern) if file.is_file()):
+        files_hash.update(file_path.relative_to(path).as_posix().encode("utf-8"))
+        files_hash.update(file_path.read_bytes())
+
+    return files_hash.hexdigest()
+
+
+def compute_path_fingerprint(path: Union[str, Path]) -> str:
+    """
+    Compute a SHA-256 hash over the relative names, sizes and modification times of a file or of all files inside a
+    directory, without reading their contents. It is much cheaper than compute_path_hash for large inputs (e.g., a
+    catalog), but also changes when a file is rewritten with the same content.
+    """
+    path = Path(path)
+    files_hash = hashlib.sha256()
+
+    file_paths = [path] if path.is_file() else sorted(file for file in path.rglob("*") if file.is_file())
+    for file_path in file_paths:
+        file_stat = file_path.stat()
+        relative_name = file_path.name if file_path == path else file_path.relative_to(path).as_posix()
+        files_hash.update(f"{relative_name}\0{file_stat.st_size}\0{file_stat.st_mtime_ns}\0".encode("utf-8"))
+
+    return files_hash.hexdigest()